@@ -111,6 +111,17 @@ def get_arguments_parser():
         type=treat_romberg_arg,
         help='Bypass detection and force a value in the triangle. Must be of the form `k;m`.')
 
+    arguments_parser.add_argument(
+        '-e', '--engine', choices=baking.ENGINES, default='components',
+        help='engine used to perform the numerical differentiation')
+
+    arguments_parser.add_argument(
+        '-j', '--workers', type=int, default=1,
+        help='number of processes used to perform the numerical differentiation')
+
+    arguments_parser.add_argument(
+        '-J', '--report', type=str, help='Write a report (in JSON) of the numerical differentiations in that file')
+
     arguments_parser.add_argument(
         '-a', '--append', action='store_true', help='Append to existing H5 file')
 
@@ -149,6 +160,7 @@ def main():
     storage.read(args.data)
 
     original_cf = None
+    previous_hashes = None
     if args.append:
         with open(args.output) as f:
             try:
@@ -157,6 +169,8 @@ def main():
             except BadChemistryDataFile as e:
                 return exit_failure('Cannot append data to `{}`: {}'.format(args.output, e))
 
+        previous_hashes = baking.load_bake_hashes(args.output)
+
     # go and bake
     baker = baking.Baker(recipe, storage, directory=recipe_directory, original_cf=original_cf)
     only = None
@@ -172,11 +186,20 @@ def main():
             copy_zero_field_basis=not args.do_not_steal,
             verbosity_level=args.verbose,
             only=only,
-            force_choice=args.romberg
+            force_choice=args.romberg,
+            engine=args.engine,
+            workers=args.workers,
+            record_details=args.report is not None,
+            previous_hashes=previous_hashes,
+            with_hashes=True
         )
     except baking.BadBaking as e:
         return exit_failure('error while baking: {}'.format(str(e)))
 
+    if args.report:
+        with open(args.report, 'w') as f:
+            baker.write_report(f)
+
     if args.project:
         hessian = None
         if args.hessian:
@@ -191,6 +214,7 @@ def main():
                         print('!! {} hessian to perform projection (and geometry)'.format(
                             'replacing' if 'GG' in cf.derivatives else 'adding'))
                     cf.derivatives['GG'] = hessian
+                    baker.hashes.pop('GG', None)
                     recipe.geometry = args.hessian.molecule
             except (PropertyNotDefined, PropertyNotPresent):
                 return exit_failure('error: file does not contain any hessian (or it cannot find it)')
@@ -211,6 +235,8 @@ def main():
     with open(args.output, 'w') as f:
         cf.write(f)
 
+    baking.save_bake_hashes(args.output, baker.hashes)
+
 
 if __name__ == '__main__':
     main()
@@ -37,6 +37,18 @@ def get_arguments_parser():
 
     arguments_parser.add_argument('directories', nargs='*', type=is_dir, help='directory where to look for QM results')
 
+    arguments_parser.add_argument(
+        '-j', '--workers', type=int, default=1, help='number of processes used to read the QM results')
+
+    arguments_parser.add_argument(
+        '-C', '--cache', type=str,
+        help='Cache of the results read from the QM outputs (h5 file, created if needed), so that unchanged files '
+             'are not read again')
+
+    arguments_parser.add_argument(
+        '-m', '--manifest', type=argparse.FileType('r'),
+        help='Manifest of nachos_prepare (nachos_manifest.json): only cook the outputs that it lists')
+
     arguments_parser.add_argument(
         '--gaussian-logs', action='store_true', help='Use Gaussian LOGs instead of FCHKs (... but why in the world?!?)')
 
@@ -65,11 +77,48 @@ def main():
     if len(args.directories) != 0:
         directories = args.directories
 
+    cache = None
+    if args.cache:
+        cache = cooking.CookCache(recipe)
+        if os.path.exists(args.cache):
+            try:
+                cache.read(args.cache)
+            except cooking.BadCooking as e:
+                return exit_failure('error while reading cache: {}'.format(str(e)))
+
+    manifest = None
+    if args.manifest:
+        manifest = preparing.Manifest()
+        try:
+            manifest.read(args.manifest)
+            _, missing_outputs = cooker.outputs_from_manifest(
+                manifest, directories, use_gaussian_logs=args.gaussian_logs)
+        except (preparing.BadPreparation, cooking.BadCooking) as e:
+            return exit_failure('error while reading manifest: {}'.format(str(e)))
+
+        if len(missing_outputs) != 0:
+            errors = ''
+            for entry in missing_outputs:
+                errors += '- Missing output for {} (field: {})\n'.format(', '.join(entry['inputs']), ','.join(
+                    preparing.Preparer.nonzero_fields(entry['fields'], recipe.geometry, recipe['type'])))
+            errors += '-' * 32 + '\n'
+            errors += 'Total: {} missing output(s)'.format(len(missing_outputs))
+            return exit_failure('Errors:\n{}'.format(errors))
+
     try:
-        storage = cooker.cook(directories, verbosity_level=args.verbose, use_gaussian_logs=args.gaussian_logs)
+        storage = cooker.cook(
+            directories,
+            verbosity_level=args.verbose,
+            use_gaussian_logs=args.gaussian_logs,
+            workers=args.workers,
+            cache=cache,
+            manifest=manifest)
     except cooking.BadCooking as e:
         return exit_failure('error while cooking inputs: {}'.format(str(e)))
 
+    if cache is not None:
+        cache.write(args.cache)
+
     missing_fields, missing_derivatives = storage.check()
 
     if len(missing_fields) != 0 or len(missing_derivatives) != 0:
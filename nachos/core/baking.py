@@ -1,12 +1,21 @@
 import os
 import sys
+import json
+import math
+import hashlib
+import collections
+import concurrent.futures
+import multiprocessing.util
+from multiprocessing import shared_memory
+
+import h5py
 import numpy
 
-from qcip_tools import derivatives
+from qcip_tools import derivatives, derivatives_e
 from qcip_tools.chemistry_files import chemistry_datafile
 
 from nachos.core import compute_numerical_derivative_of_tensor, fancy_output_derivative, \
-    fancy_output_component_of_derivative
+    fancy_output_component_of_derivative, files
 
 
 class BadBaking(Exception):
@@ -21,6 +30,667 @@ def _equal_molecules_or_raise(mol1, mol2):
         raise BadBaking('not the same geometries: atomic symbols are different')
 
 
+#: Engines for the numerical differentiation: ``components`` differentiates the base tensors component per component,
+#: while ``arrays`` differentiates the whole base tensors at once.
+ENGINES = ('components', 'arrays')
+
+#: Stencils extracted by :func:`finite_difference_stencils`, per recipe parameters
+_STENCILS = {}
+
+
+def finite_difference_stencils(recipe, diff_derivative):
+    """Get the fields and their weights that give the first column of the Romberg triangles (the finite differences
+    computed with the different amplitudes, :math:`H_{k,0}`).
+
+    They are obtained from ``qcip_tools``: since the finite differences are linear in the values of the function,
+    a function that is 1 for a given field and 0 elsewhere gives the weight of this field.
+    This is done once (per set of parameters) on a small representative differentiation, which contains all the
+    possible patterns of repeated coordinates (e.g. ``(0, 0, 1)`` for the :math:`\\partial^3/\\partial x^2\\partial y`
+    and equivalent ones).
+
+    :param recipe: recipe
+    :type recipe: nachos.core.files.Recipe
+    :param diff_derivative: the differentiation
+    :type diff_derivative: qcip_tools.derivatives.Derivative
+    :return: for each pattern, a list (one element per amplitude) of weights per field
+    :rtype: dict
+    """
+
+    order = diff_derivative.order()
+    key = (recipe['type'], order, recipe['k_max'], recipe['min_field'], recipe['ratio'], recipe['accuracy_level'])
+
+    if key not in _STENCILS:
+        probe_derivative = derivatives.Derivative(recipe['type'] * order, spacial_dof=3 * ((order + 2) // 3))
+        energy = derivatives.Derivative('')
+        stencils = collections.OrderedDict(
+            (pattern if type(pattern) is tuple else (pattern, ), []) for pattern in probe_derivative.smart_iterator())
+
+        fields_used = []
+        probed_field = [None]
+
+        def probe(fields, *args, **kwargs):
+            f = tuple(int(a) for a in fields)
+            if probed_field[0] is None:
+                if f not in fields_used:
+                    fields_used.append(f)
+                return .0
+
+            return 1. if f == probed_field[0] else .0
+
+        for k in range(recipe['k_max']):
+            # amplitude k only uses fields that are available when k_max = k + 1
+            probe_recipe = {
+                'k_max': k + 1,
+                'min_field': recipe['min_field'],
+                'ratio': recipe['ratio'],
+                'accuracy_level': recipe['accuracy_level']
+            }
+
+            probed_field[0] = None
+            fields_used.clear()
+            compute_numerical_derivative_of_tensor(probe_recipe, energy, probe_derivative, probe, dry_run=True)
+
+            weights = dict((pattern, collections.OrderedDict()) for pattern in stencils)
+            for field in list(fields_used):
+                probed_field[0] = field
+                t, _ = compute_numerical_derivative_of_tensor(
+                    probe_recipe, energy, probe_derivative, probe, force_choice=(k, 0))
+
+                for pattern in stencils:
+                    if t.components[pattern] != .0:
+                        weights[pattern][field] = t.components[pattern]
+
+            for pattern in stencils:
+                stencils[pattern].append(weights[pattern])
+
+        _STENCILS[key] = stencils
+
+    return _STENCILS[key]
+
+
+def romberg_triangles(columns, ratio, r=2):
+    """Build many Romberg triangles at once, from their first columns (the finite differences :math:`H_{k,0}`).
+
+    The recursion, :math:`H_{k,m} = (a^{rm}\\,H_{k,m-1}-H_{k+1,m-1}) / (a^{rm}-1)`, is the one of
+    ``qcip_tools.numerical_differentiation.RombergTriangle``, but applied to all the triangles at each iteration.
+
+    :param columns: first columns of the triangles, of shape ``(..., k_max)``
+    :type columns: numpy.ndarray
+    :param ratio: the ratio between two amplitudes
+    :type ratio: float
+    :param r: the order of the error
+    :type r: int
+    :return: the triangles, of shape ``(..., k_max, k_max)`` (indexed by ``k`` and ``m``, with zeroes where
+      :math:`k+m \\geq k_{max}`)
+    :rtype: numpy.ndarray
+    """
+
+    side = columns.shape[-1]
+    triangles = numpy.zeros(columns.shape + (side, ))
+    triangles[..., 0] = columns
+
+    for m in range(1, side):
+        p = ratio ** (r * m)
+        triangles[..., :side - m, m] = \
+            (p * triangles[..., :side - m, m - 1] - triangles[..., 1:side - m + 1, m - 1]) / (p - 1)
+
+    return triangles
+
+
+def minimal_amplitude_errors(triangles):
+    """Find, for each iteration :math:`m` of each Romberg triangle, the amplitude :math:`k` for which the amplitude
+    error, :math:`|H_{k+1,m}-H_{k,m}|`, is minimal.
+
+    :param triangles: the triangles (see ``romberg_triangles()``), of shape ``(..., k_max, k_max)``
+    :type triangles: numpy.ndarray
+    :return: the amplitudes and the minimal amplitude errors, both of shape ``(..., k_max - 1)``
+    :rtype: tuple
+    """
+
+    side = triangles.shape[-1]
+    errors = numpy.abs(numpy.diff(triangles, axis=-2))[..., :side - 1]
+    errors[..., numpy.add.outer(numpy.arange(side - 1), numpy.arange(side - 1)) > side - 2] = numpy.inf
+
+    amplitudes = numpy.argmin(errors, axis=-2)
+    return amplitudes, numpy.take_along_axis(errors, amplitudes[..., numpy.newaxis, :], axis=-2)[..., 0, :]
+
+
+def find_best_values(triangles, force_choice=None):
+    """Find the best values in many Romberg triangles at once: for each iteration :math:`m`, the amplitude with the
+    minimal amplitude error is selected (see ``minimal_amplitude_errors()``), and the best value is the one of the
+    iteration for which this error is the smallest (the first one, in case of a tie).
+    The error on the best value is this amplitude error.
+
+    :param triangles: the triangles (see ``romberg_triangles()``), of shape ``(..., k_max, k_max)``
+    :type triangles: numpy.ndarray
+    :param force_choice: force the choice (``(k, m)``) in the Romberg triangles
+    :type force_choice: tuple
+    :return: the amplitudes, the iterations, the values and the errors, all of shape ``(...)``
+    :rtype: tuple
+    """
+
+    side = triangles.shape[-1]
+    shape = triangles.shape[:-2]
+
+    if force_choice is not None:
+        k, m = force_choice
+        errors = numpy.zeros(shape)
+        if k + m < side - 1:
+            errors = numpy.abs(triangles[..., k + 1, m] - triangles[..., k, m])
+
+        return numpy.full(shape, k), numpy.full(shape, m), triangles[..., k, m], errors
+
+    if side < 2:
+        return numpy.zeros(shape, dtype=int), numpy.zeros(shape, dtype=int), triangles[..., 0, 0], numpy.zeros(shape)
+
+    amplitudes, errors = minimal_amplitude_errors(triangles)
+    iterations = numpy.argmin(errors, axis=-1)
+    amplitudes = numpy.take_along_axis(amplitudes, iterations[..., numpy.newaxis], axis=-1)[..., 0]
+    errors = numpy.take_along_axis(errors, iterations[..., numpy.newaxis], axis=-1)[..., 0]
+
+    values = numpy.take_along_axis(
+        triangles.reshape(shape + (side * side, )), (amplitudes * side + iterations)[..., numpy.newaxis], axis=-1)
+
+    return amplitudes, iterations, values[..., 0], errors
+
+
+class ArrayRombergTriangle:
+    """A Romberg triangle built by ``romberg_triangles()``, with its best value (see ``find_best_values()``).
+    It can be outputted in the same way as a ``qcip_tools.numerical_differentiation.RombergTriangle``.
+
+    :param romberg_triangle: the triangle
+    :type romberg_triangle: numpy.ndarray
+    :param best_value: position, value and error of the best value
+    :type best_value: tuple
+    """
+
+    def __init__(self, romberg_triangle, best_value):
+        self.romberg_triangle = romberg_triangle
+        self.best_value = best_value
+
+    def __call__(self):
+        return self.best_value
+
+    def romberg_triangle_repr(self, with_decoration=False):
+        """Get a representation of the triangle
+
+        :param with_decoration: add the iterations and amplitudes
+        :type with_decoration: bool
+        :rtype: str
+        """
+
+        side = self.romberg_triangle.shape[0]
+        r = ''
+
+        if with_decoration:
+            r += '      ' + ''.join('{:^22}'.format('m={}'.format(m)) for m in range(side)) + '\n'
+
+        for k in range(side):
+            if with_decoration:
+                r += 'k={:<3} '.format(k)
+            r += ' '.join('{: .14e}'.format(self.romberg_triangle[k, m]) for m in range(side - k)) + '\n'
+
+        return r
+
+
+def _get_component(tensor, initial_derivative, diff_derivative, d_coo, b_coo):
+    """Get the (first) component of ``tensor`` that correspond to ``d_coo`` and ``b_coo``
+    """
+
+    e = next(iter(initial_derivative.inverse_smart_iterator(b_coo)))
+    ex = next(iter(diff_derivative.inverse_smart_iterator(d_coo)))
+
+    if initial_derivative.representation() != '':
+        if 'G' in diff_derivative.representation():
+            return tensor.components[ex][e]
+        else:
+            return tensor.components[e][ex]
+    else:
+        return tensor.components[ex]
+
+
+def _amplitude_errors_repr(minimal_amplitudes, minimal_errors):
+    """Describe the minimal amplitude error of each iteration of a Romberg triangle (see
+    ``minimal_amplitude_errors()``)
+    """
+
+    return ''.join(
+        'm={}: minimal amplitude error is {:.5e} (k={})\n'.format(m, error, k)
+        for m, (k, error) in enumerate(zip(minimal_amplitudes, minimal_errors)) if numpy.isfinite(error))
+
+
+def _set_component(tensor, initial_derivative, diff_derivative, d_coo, b_coo, value):
+    """Set ``value`` to all the components of ``tensor`` that correspond to ``d_coo`` and ``b_coo``
+    """
+
+    for e in initial_derivative.inverse_smart_iterator(b_coo):
+        for ex in diff_derivative.inverse_smart_iterator(d_coo):
+            if initial_derivative.representation() != '':
+                if 'G' in diff_derivative.representation():
+                    tensor.components[ex][e] = value
+                else:
+                    tensor.components[e][ex] = value
+            else:
+                tensor.components[ex] = value
+
+
+def _direction_fields(recipe, diff_derivative, d_coo):
+    """Get the fields along the direction of ``d_coo``, with amplitudes from ``-k_max`` to ``k_max``
+    """
+
+    field = [0] * (3 if recipe['type'] == 'F' else diff_derivative.spacial_dof)
+    for b in d_coo:
+        field[b] = 1
+
+    return [tuple(x * k for x in field) for k in range(-recipe['k_max'], recipe['k_max'] + 1)]
+
+
+class DifferentiationDetails:
+    """Details of a numerical differentiation, captured while it is performed: the values of the base tensor in the
+    fields along each direction of differentiation, the Romberg triangles and the best value found in each of them
+    (and, eventually, the decision process that lead to it).
+
+    :param with_decisions: also capture the decision process to find the best values
+    :type with_decisions: bool
+    """
+
+    def __init__(self, with_decisions=False):
+        self.with_decisions = with_decisions
+
+        self.field_values = collections.OrderedDict()
+        self.romberg_triangles = collections.OrderedDict()
+        self.best_values = collections.OrderedDict()
+        self.decisions = collections.OrderedDict()
+
+    def add_triangle(self, d_coo, b_coo, triangle, value, force_choice=None):
+        """Add a Romberg triangle, in which ``value`` was chosen as the best value: its position is found back in the
+        triangle (which is not searched again)
+
+        :param d_coo: component of the differentiation
+        :type d_coo: tuple
+        :param b_coo: component of the base tensor
+        :type b_coo: tuple
+        :param triangle: the Romberg triangle
+        :type triangle: qcip_tools.numerical_differentiation.RombergTriangle
+        :param value: the best value
+        :type value: float
+        :param force_choice: the choice that is forced in the Romberg triangle
+        :type force_choice: tuple
+        :return: position, value and error of the best value
+        :rtype: tuple
+        """
+
+        side = triangle.romberg_triangle.shape[0]
+
+        if force_choice is not None:
+            position = tuple(force_choice)
+        else:
+            in_triangle = numpy.add.outer(numpy.arange(side), numpy.arange(side)) < side
+            position = tuple(int(a) for a in numpy.argwhere((triangle.romberg_triangle == value) & in_triangle)[0])
+
+        error = find_best_values(triangle.romberg_triangle, force_choice=position)[-1]
+        best_value = (position, value, float(error))
+
+        decisions = ''
+        if self.with_decisions:
+            if force_choice is not None:
+                decisions = 'The choice is forced to ({}).\n'.format(','.join(str(a) for a in force_choice))
+            elif side > 1:
+                decisions = _amplitude_errors_repr(*minimal_amplitude_errors(triangle.romberg_triangle))
+                decisions += 'The best value is found for k={}, m={}.\n'.format(*position)
+
+        self.add(d_coo, b_coo, triangle, best_value, decisions)
+        return best_value
+
+    def add(self, d_coo, b_coo, triangle, best_value, decisions=''):
+        """Add a Romberg triangle, and the best value that was found in it
+
+        :param d_coo: component of the differentiation
+        :type d_coo: tuple
+        :param b_coo: component of the base tensor
+        :type b_coo: tuple
+        :param triangle: the Romberg triangle
+        :type triangle: qcip_tools.numerical_differentiation.RombergTriangle|ArrayRombergTriangle
+        :param best_value: position, value and error of the best value
+        :type best_value: tuple
+        :param decisions: the decision process
+        :type decisions: str
+        """
+
+        if d_coo not in self.romberg_triangles:
+            self.romberg_triangles[d_coo] = collections.OrderedDict()
+            self.best_values[d_coo] = collections.OrderedDict()
+            self.decisions[d_coo] = collections.OrderedDict()
+
+        self.romberg_triangles[d_coo][b_coo] = triangle
+        self.best_values[d_coo][b_coo] = best_value
+        self.decisions[d_coo][b_coo] = decisions
+
+
+def compute_numerical_derivative_of_tensor_by_components(
+        recipe, storage, basis, diff_derivative, frequency=None, force_choice=None, with_details=False,
+        with_decisions=False):
+    """Use :func:`nachos.core.compute_numerical_derivative_of_tensor` to differentiate the base tensors component
+    per component, and eventually capture the details.
+
+    The values that are accessed during the differentiation are kept, so that the values in the fields along each
+    direction are (mostly) not read again.
+    The best values in the Romberg triangles are found by ``qcip_tools`` without giving their position, which is
+    thus found back from the values of the tensor (the triangles are not searched again).
+
+    :param recipe: recipe
+    :type recipe: nachos.core.files.Recipe
+    :param storage: storage of results
+    :type storage: nachos.core.files.ComputationalResults
+    :param basis: basis of differentiation (representation for the base tensors)
+    :type basis: qcip_tools.derivatives.Derivative
+    :param diff_derivative: the differentiation
+    :type diff_derivative: qcip_tools.derivatives.Derivative
+    :param frequency: frequency if electrical derivative
+    :type frequency: float|str
+    :param force_choice: force the choice in the Romberg triangle
+    :type force_choice: tuple
+    :param with_details: capture the details
+    :type with_details: bool
+    :param with_decisions: also capture the decision process to find the best values
+    :type with_decisions: bool
+    :return: tensor and details (``None`` if not requested)
+    :rtype: qcip_tools.derivatives.Tensor, DifferentiationDetails
+    """
+
+    if not with_details:
+        tensor, _ = compute_numerical_derivative_of_tensor(
+            recipe, basis, diff_derivative, storage.tensor_element_access, frequency=frequency,
+            force_choice=force_choice)
+
+        return tensor, None
+
+    accessed = {}
+
+    def tensor_access(fields, min_field, basis, component, frequency, recipe):
+        key = (tuple(fields), component)
+        if key not in accessed:
+            accessed[key] = storage.tensor_element_access(fields, min_field, basis, component, frequency, recipe)
+
+        return accessed[key]
+
+    tensor, romberg_triangles = compute_numerical_derivative_of_tensor(
+        recipe, basis, diff_derivative, tensor_access, frequency=frequency, force_choice=force_choice)
+
+    details = DifferentiationDetails(with_decisions)
+    for d_coo, triangles in romberg_triangles.items():
+        details.field_values[d_coo] = numpy.array([
+            [tensor_access(field, 0, basis, b_coo, frequency, recipe) for b_coo in triangles]
+            for field in _direction_fields(recipe, diff_derivative, d_coo)])
+
+        for b_coo, triangle in triangles.items():
+            details.add_triangle(
+                d_coo, b_coo, triangle, _get_component(tensor, basis, diff_derivative, d_coo, b_coo), force_choice)
+
+    return tensor, details
+
+
+def compute_numerical_derivative_of_tensor_by_arrays(
+        recipe, storage, basis, diff_derivative, frequency=None, force_choice=None, with_details=False,
+        with_decisions=False):
+    """Same as :func:`nachos.core.compute_numerical_derivative_of_tensor`, but the base tensors are differentiated as
+    a whole: the values of all the components are stacked (one row per field), so that the finite differences are
+    computed for all the components at once.
+    The Romberg triangles of all the components are then built at once, and their best values are found with array
+    operations (see ``find_best_values()``).
+
+    If the details are requested, the values in the fields along each direction are read together with the others.
+
+    :param recipe: recipe
+    :type recipe: nachos.core.files.Recipe
+    :param storage: storage of results
+    :type storage: nachos.core.files.ComputationalResults
+    :param basis: basis of differentiation (representation for the base tensors)
+    :type basis: qcip_tools.derivatives.Derivative
+    :param diff_derivative: the differentiation
+    :type diff_derivative: qcip_tools.derivatives.Derivative
+    :param frequency: frequency if electrical derivative
+    :type frequency: float|str
+    :param force_choice: force the choice in the Romberg triangle
+    :type force_choice: tuple
+    :param with_details: capture the details
+    :type with_details: bool
+    :param with_decisions: also capture the decision process to find the best values
+    :type with_decisions: bool
+    :return: tensor and details (``None`` if not requested)
+    :rtype: qcip_tools.derivatives.Tensor, DifferentiationDetails
+    """
+
+    stencils = finite_difference_stencils(recipe, diff_derivative)
+    fields_size = 3 if recipe['type'] == 'F' else diff_derivative.spacial_dof
+
+    rows = {}
+
+    def row(field):
+        if field not in rows:
+            rows[field] = len(rows)
+
+        return rows[field]
+
+    # gather the fields (and their weights) for each component of the differentiation and each amplitude
+    d_coos = list(diff_derivative.smart_iterator())
+    indices = []
+    weights = []
+    offsets = []
+
+    for d_coo in d_coos:
+        coordinates = sorted(set(d_coo if type(d_coo) is tuple else (d_coo, )))
+        pattern = tuple(coordinates.index(c) for c in (d_coo if type(d_coo) is tuple else (d_coo, )))
+
+        for weights_per_field in stencils[pattern]:
+            offsets.append(len(indices))
+            for probe_field, weight in weights_per_field.items():
+                field = [0] * fields_size
+                for i, q in enumerate(probe_field):
+                    if q != 0:
+                        field[coordinates[i]] = q
+
+                indices.append(row(tuple(field)))
+                weights.append(weight)
+
+    details = None
+    direction_rows = {}
+    if with_details:
+        details = DifferentiationDetails(with_decisions)
+        for d_coo in d_coos:
+            direction_rows[d_coo] = [row(field) for field in _direction_fields(recipe, diff_derivative, d_coo)]
+
+    # finite differences, for all components at once
+    b_coos = list(basis.smart_iterator())
+
+    try:
+        values = storage.tensors_access(list(rows), basis, frequency=frequency, components=b_coos)
+    except files.BadResult as e:
+        raise BadBaking(str(e))
+
+    columns = numpy.add.reduceat(numpy.array(weights)[:, numpy.newaxis] * values[indices], offsets, axis=0)
+    columns = columns.reshape(len(d_coos), recipe['k_max'], len(b_coos))
+
+    # Romberg triangles, of shape (d_coos, b_coos, k, m)
+    triangles = romberg_triangles(numpy.moveaxis(columns, 1, -1), recipe['ratio'], r=2)
+    amplitudes, iterations, best_values, errors = find_best_values(triangles, force_choice=force_choice)
+
+    if details is not None and details.with_decisions and force_choice is None and recipe['k_max'] > 1:
+        minimal_amplitudes, minimal_errors = minimal_amplitude_errors(triangles)
+
+    final_derivative = basis.differentiate(diff_derivative.representation())
+    tensor = derivatives.Tensor(final_derivative, spacial_dof=final_derivative.spacial_dof, frequency=frequency)
+
+    for i, d_coo in enumerate(d_coos):
+        if details is not None:
+            details.field_values[d_coo] = values[direction_rows[d_coo]]
+
+        for j, b_coo in enumerate(b_coos):
+            _set_component(tensor, basis, diff_derivative, d_coo, b_coo, best_values[i, j])
+
+            if details is not None:
+                best_value = ((amplitudes[i, j], iterations[i, j]), best_values[i, j], errors[i, j])
+                decisions = ''
+                if details.with_decisions:
+                    if force_choice is not None:
+                        decisions = 'The choice is forced to ({}).\n'.format(','.join(str(a) for a in force_choice))
+                    elif recipe['k_max'] > 1:
+                        decisions = _amplitude_errors_repr(minimal_amplitudes[i, j], minimal_errors[i, j])
+                        decisions += 'The smallest one is found for m={}.\n'.format(iterations[i, j])
+
+                details.add(d_coo, b_coo, ArrayRombergTriangle(triangles[i, j], best_value), best_value, decisions)
+
+    return tensor, details
+
+
+def _differentiate(
+        recipe, storage, initial_derivative, diff_derivative, frequency, force_choice, engine, with_details=False,
+        with_decisions=False):
+    """Differentiate the base tensors (see :meth:`Baker.differentiate`)
+    """
+
+    if engine == 'arrays':
+        compute = compute_numerical_derivative_of_tensor_by_arrays
+    else:
+        compute = compute_numerical_derivative_of_tensor_by_components
+
+    return compute(
+        recipe,
+        storage,
+        initial_derivative,
+        diff_derivative,
+        frequency=frequency,
+        force_choice=force_choice,
+        with_details=with_details,
+        with_decisions=with_decisions)
+
+
+class DifferentiationRecord:
+    """Record of a numerical differentiation, from which the output and the report are rendered (without any
+    further computation).
+
+    If the details of the differentiation are given, they are recorded: the values of the base tensor in the
+    fields along each direction, the best value found in each Romberg triangle (and, eventually, the decision
+    process), the uncertainties and the checks of the Kleinman conditions.
+
+    :param recipe: the recipe
+    :type recipe: nachos.core.files.Recipe
+    :param initial_derivative: starting point
+    :type initial_derivative: qcip_tools.derivatives.Derivative
+    :param diff_derivative: differentiation
+    :type diff_derivative: qcip_tools.derivatives.Derivative
+    :param result: what was computed
+    :type result: qcip_tools.derivatives.Tensor
+    :param details: the details captured during the differentiation (if any)
+    :type details: DifferentiationDetails
+    """
+
+    def __init__(self, recipe, initial_derivative, diff_derivative, result, details=None):
+
+        self.initial_derivative = initial_derivative
+        self.diff_derivative = diff_derivative
+        self.result = result
+        self.details = details
+
+        self.fields = []
+        self.kleinman = []
+        self.uncertainties = None
+        self.relative_uncertainties = None
+
+        if details is not None:
+            self._record_details(recipe)
+
+    @property
+    def has_details(self):
+        return self.details is not None
+
+    @property
+    def romberg_triangles(self):
+        return self.details.romberg_triangles if self.details is not None else None
+
+    @property
+    def field_values(self):
+        return self.details.field_values if self.details is not None else collections.OrderedDict()
+
+    @property
+    def best_values(self):
+        return self.details.best_values if self.details is not None else collections.OrderedDict()
+
+    @property
+    def decisions(self):
+        return self.details.decisions if self.details is not None else collections.OrderedDict()
+
+    def _record_details(self, recipe):
+        k_max = recipe['k_max']
+
+        for k in range(-k_max, k_max + 1):
+            self.fields.append(
+                0 if k == 0 else recipe['min_field'] * recipe['ratio'] ** (abs(k) - 1) * (-1 if k < 0 else 1))
+
+        uncertainties = derivatives.Tensor(
+            self.result.representation, spacial_dof=self.result.spacial_dof, frequency=self.result.frequency)
+
+        for d_coo, best_values in self.best_values.items():
+            for b_coo, best_value in best_values.items():
+                _set_component(
+                    uncertainties, self.initial_derivative, self.diff_derivative, d_coo, b_coo, best_value[-1])
+
+        self.uncertainties = uncertainties
+        self.relative_uncertainties = derivatives.Tensor(
+            uncertainties.representation,
+            components=(uncertainties.components / self.result.components) * 100,
+            spacial_dof=uncertainties.spacial_dof,
+            frequency=uncertainties.frequency
+        )
+
+        # Kleinman conditions
+        if self.initial_derivative != '':
+            representation = self.result.representation
+            for i in representation.smart_iterator():
+                values = list(self.result.components[j] for j in representation.inverse_smart_iterator(i))
+                if len(values) > 1:
+                    self.kleinman.append((i, numpy.mean(values), numpy.std(values)))
+
+    def to_dict(self):
+        """Get a representation of the record that can be serialized (e.g. in JSON)
+
+        :rtype: dict
+        """
+
+        d = {
+            'basis': self.initial_derivative.representation(),
+            'differentiation': self.diff_derivative.representation(),
+            'derivative': self.result.representation.representation(),
+            'frequency': self.result.frequency,
+            'components': numpy.asarray(self.result.components).tolist()
+        }
+
+        if self.has_details:
+            d['fields'] = [float(a) for a in self.fields]
+            d['uncertainties'] = numpy.asarray(self.uncertainties.components).tolist()
+            d['romberg'] = []
+
+            for d_coo, best_values in self.best_values.items():
+                for j, (b_coo, best_value) in enumerate(best_values.items()):
+                    position, value, error = best_value
+                    d['romberg'].append({
+                        'differentiation_component': [int(a) for a in d_coo],
+                        'basis_component': [int(a) for a in (b_coo if type(b_coo) is tuple else (b_coo, ))],
+                        'values': [float(a) for a in self.field_values[d_coo][:, j]],
+                        'k': int(position[0]),
+                        'm': int(position[1]),
+                        'value': float(value),
+                        'error': float(error),
+                        'uncertainty': float(error)
+                    })
+
+            d['kleinman'] = [
+                {'component': [int(a) for a in i], 'mean': float(mean), 'std': float(std)}
+                for i, mean, std in self.kleinman]
+
+        return d
+
+
 class Baker:
     """Baker class to finally perform the numerical differentiation
 
@@ -54,9 +724,29 @@ class Baker:
         if self.storage.check() != ([], []):
             raise BadBaking('The storage (h5 file) does not fulfill the recipe!')
 
-    def bake(self, only=None, out=sys.stdout, verbosity_level=0, copy_zero_field_basis=False, force_choice=None):
+        self.records = []
+        self.hashes = {}
+        self.storage_hashes = {}
+
+    def bake(
+            self,
+            only=None,
+            out=sys.stdout,
+            verbosity_level=0,
+            copy_zero_field_basis=False,
+            force_choice=None,
+            engine='components',
+            workers=1,
+            record_details=False,
+            previous_hashes=None,
+            with_hashes=False):
         """Perform the numerical differentiation
 
+        If requested (or if ``previous_hashes`` is given), the fingerprint of the inputs of each differentiation is
+        stored in ``self.hashes`` (see ``fingerprint()``).
+        If it matches the one given in ``previous_hashes`` and the derivative is already in the original chemistry
+        file, the differentiation is not performed again and the original tensor is kept.
+
         :param only: list of derivatives to perform (None = all of them)
         :type only: list
         :param out: output if information is needed to be outputed
@@ -67,9 +757,26 @@ class Baker:
         :type copy_zero_field_basis: bool
         :param force_choice: force the choice in the Romberg triangle
         :type force_choice: tuple
+        :param engine: engine for the numerical differentiation (see ``ENGINES``)
+        :type engine: str
+        :param workers: number of processes used to perform the numerical differentiation
+        :type workers: int
+        :param record_details: record the details of the differentiations in ``self.records`` (see
+          ``DifferentiationRecord``), even if they are not outputted
+        :type record_details: bool
+        :param previous_hashes: fingerprints of a previous bake, which produced the original chemistry file
+        :type previous_hashes: dict
+        :param with_hashes: compute the fingerprints, even if ``previous_hashes`` is not given (to save them)
+        :type with_hashes: bool
         :rtype: qcip_tools.chemistry_files.chemistry_datafile.ChemistryDataFile
         """
 
+        if engine not in ENGINES:
+            raise BadBaking('unknown engine {}'.format(engine))
+
+        if workers < 1:
+            raise BadBaking('number of workers should be larger than 0')
+
         if not only:
             bases = [a for a in self.recipe.bases()]
         else:
@@ -94,11 +801,21 @@ class Baker:
         f = self.original_cf
         dof = 3 * len(self.recipe.geometry)
 
+        with_hashes = with_hashes or previous_hashes is not None
+        previous_hashes = previous_hashes if previous_hashes is not None else {}
+        previous_derivatives = dict(f.derivatives)
+        self.hashes = dict(previous_hashes)
+        self.storage_hashes = {}
+
         if copy_zero_field_basis:
             zero_field = tuple([0] * (dof if self.recipe['type'] == 'G' else 3))
             for b in self.storage.results[zero_field]:
                 f.derivatives[b] = self.storage.results[zero_field][b]
 
+                # the tensor is not the result of a differentiation anymore
+                for key in [k for k in self.hashes if k.split('@')[0] == b]:
+                    del self.hashes[key]
+
         # print fields (by request of Benoit)
         if verbosity_level > 1:
             fields = []
@@ -113,62 +830,140 @@ class Baker:
             out.write('! Thus, fields used (a.u.) during differentiation are: {}.\n\n'.format(
                 ', '.join('{}'.format(i) for i in fields)))
 
+        # list what should be computed (one task per frequency, if any), except if it was already
+        groups = []
+        tasks = []
+        unchanged = {}
+
         for initial_derivative, level in bases:
             for diff_order in range(1, level + 1):
                 diff_derivative = derivatives.Derivative(self.recipe['type'] * diff_order, spacial_dof=dof)
                 final_derivative = initial_derivative.differentiate(diff_derivative.representation())
 
                 if derivatives.is_electrical(initial_derivative) or self.recipe['type'] == 'F':
-                    results_per_frequency = {}
-
                     freqs = []
                     if 'D' in initial_derivative.representation():
                         freqs.extend(self.recipe['frequencies'])
                     else:
                         freqs = ['static']
 
-                    for freq in freqs:
-                        r, trigs = compute_numerical_derivative_of_tensor(
-                            self.recipe,
-                            initial_derivative,
-                            diff_derivative,
-                            self.storage.tensor_element_access,
-                            frequency=freq,
-                            force_choice=force_choice)
-                        results_per_frequency[freq] = r
-                        Baker.output_information(
-                            self.recipe,
-                            initial_derivative,
-                            diff_derivative,
-                            r,
-                            trigs,
-                            self.storage.tensor_element_access,
-                            out,
-                            verbosity_level)
-
-                    f.derivatives[final_derivative.representation()] = results_per_frequency
+                    groups.append((initial_derivative, diff_derivative, freqs))
+                    g_tasks = [(initial_derivative, diff_derivative, freq, force_choice) for freq in freqs]
                 else:
-                    r, trigs = compute_numerical_derivative_of_tensor(
-                        self.recipe,
-                        initial_derivative,
-                        diff_derivative,
-                        self.storage.tensor_element_access)
-                    f.derivatives[final_derivative.representation()] = r
+                    groups.append((initial_derivative, diff_derivative, None))
+                    g_tasks = [(initial_derivative, diff_derivative, None, None)]
+
+                for task in g_tasks:
+                    if not with_hashes:
+                        tasks.append(task)
+                        continue
+
+                    key = Baker.hash_key(final_derivative, task[2])
+                    self.hashes[key] = self.fingerprint(*task)
+
+                    if previous_hashes.get(key) == self.hashes[key]:
+                        tensor = Baker._previous_tensor(previous_derivatives, final_derivative, task[2])
+                        if tensor is not None:
+                            unchanged[initial_derivative.representation(), diff_derivative.representation(), task[2]] \
+                                = tensor
+                            continue
+
+                    tasks.append(task)
+
+        with_details = verbosity_level > 1 or record_details
+        with_decisions = verbosity_level > 2
+
+        if workers > 1 and len(tasks) > 1:
+            computed = iter(self._differentiate_in_parallel(tasks, workers, engine, with_details, with_decisions))
+        else:
+            computed = (
+                self.differentiate(
+                    initial_derivative,
+                    diff_derivative,
+                    frequency=freq,
+                    force_choice=fc,
+                    engine=engine,
+                    with_details=with_details,
+                    with_decisions=with_decisions)
+                for initial_derivative, diff_derivative, freq, fc in tasks)
+
+        self.records = []
+
+        for initial_derivative, diff_derivative, freqs in groups:
+            final_derivative = initial_derivative.differentiate(diff_derivative.representation())
+            results = collections.OrderedDict()
+
+            for freq in (freqs if freqs is not None else [None]):
+                u_key = (initial_derivative.representation(), diff_derivative.representation(), freq)
+                if u_key in unchanged:
+                    results[freq] = unchanged[u_key]
+                    if verbosity_level > 0:
+                        out.write('!! {}{} is unchanged, not differentiated again\n\n'.format(
+                            final_derivative.representation(), ' (w={})'.format(freq) if freq is not None else ''))
+                    continue
+
+                r, details = next(computed)
+                record = DifferentiationRecord(self.recipe, initial_derivative, diff_derivative, r, details=details)
+
+                self.records.append(record)
+                results[freq] = r
+                Baker.output_information(self.recipe, record, out, verbosity_level)
+
+            if freqs is not None:
+                f.derivatives[final_derivative.representation()] = dict(results)
+            else:
+                f.derivatives[final_derivative.representation()] = results[None]
 
-                    Baker.output_information(
-                        self.recipe,
-                        initial_derivative,
-                        diff_derivative,
-                        r,
-                        trigs,
-                        self.storage.tensor_element_access,
-                        out,
-                        verbosity_level)
         return f
 
+    def differentiate(
+            self,
+            initial_derivative,
+            diff_derivative,
+            frequency=None,
+            force_choice=None,
+            engine='components',
+            with_details=False,
+            with_decisions=False):
+        """Differentiate the base tensors
+
+        :param initial_derivative: starting point
+        :type initial_derivative: qcip_tools.derivatives.Derivative
+        :param diff_derivative: differentiation
+        :type diff_derivative: qcip_tools.derivatives.Derivative
+        :param frequency: the frequency (if any)
+        :type frequency: str|float
+        :param force_choice: force the choice in the Romberg triangle
+        :type force_choice: tuple
+        :param engine: engine for the numerical differentiation (see ``ENGINES``)
+        :type engine: str
+        :param with_details: capture the details of the differentiation (see ``DifferentiationDetails``)
+        :type with_details: bool
+        :param with_decisions: also capture the decision process to find the best values
+        :type with_decisions: bool
+        :return: tensor and details (``None`` if not requested)
+        :rtype: qcip_tools.derivatives.Tensor, DifferentiationDetails
+        """
+
+        return _differentiate(
+            self.recipe,
+            self.storage,
+            initial_derivative,
+            diff_derivative,
+            frequency,
+            force_choice,
+            engine,
+            with_details=with_details,
+            with_decisions=with_decisions)
+
     @staticmethod
     def make_uncertainty_tensor(romberg_triangles, initial_derivative, diff_derivative, frequency):
-        """
+        """Make the tensor of the uncertainties (the errors on the best values of the Romberg triangles).
+
+        .. note::
+
+            When baking, the uncertainties are recorded in ``DifferentiationRecord.uncertainties`` (without
+            searching the Romberg triangles again).
 
         :param romberg_triangles: the different Romberg triangles
         :type romberg_triangles: collections.OrderedDict
@@ -186,34 +981,208 @@ class Baker:
 
         for d_coo in romberg_triangles:
             for b_coo in romberg_triangles[d_coo]:
-                total_coo = list(d_coo if type(d_coo) is tuple else (d_coo, ))
-                if final_derivative.basis != '':
-                    total_coo.extend(b_coo if type(b_coo) is tuple else (b_coo, ))
-
-                uncertainty = romberg_triangles[d_coo][b_coo]()[-1]
-
-                for e in initial_derivative.inverse_smart_iterator(b_coo):
-                    for ex in diff_derivative.inverse_smart_iterator(d_coo):
-                        if initial_derivative.representation() != '':
-                            if 'G' in diff_derivative.representation():
-                                t.components[ex][e] = uncertainty
-                            else:
-                                t.components[e][ex] = uncertainty
-                        else:
-                            t.components[ex] = uncertainty
+                _set_component(
+                    t, initial_derivative, diff_derivative, d_coo, b_coo, romberg_triangles[d_coo][b_coo]()[-1])
 
         return t
 
+    def fingerprint(self, initial_derivative, diff_derivative, frequency=None, force_choice=None):
+        """Compute a fingerprint of the inputs of a differentiation: the recipe, the base tensors (for all fields,
+        see ``storage_fingerprint()``) and the settings of the Romberg triangle.
+
+        :param initial_derivative: starting point
+        :type initial_derivative: qcip_tools.derivatives.Derivative
+        :param diff_derivative: differentiation
+        :type diff_derivative: qcip_tools.derivatives.Derivative
+        :param frequency: the frequency (if any)
+        :type frequency: str|float
+        :param force_choice: force the choice in the Romberg triangle
+        :type force_choice: tuple
+        :rtype: str
+        """
+
+        h = hashlib.sha1(numpy.asarray(
+            files.ComputationalResults.get_recipe_check_data(self.recipe) + [self.recipe['accuracy_level']],
+            dtype=float).tobytes())
+
+        h.update('{}:{}:{}:{}:{}'.format(
+            initial_derivative.representation(),
+            diff_derivative.representation(),
+            frequency,
+            force_choice,
+            self.storage_fingerprint(initial_derivative, frequency)).encode())
+
+        return h.hexdigest()
+
+    def storage_fingerprint(self, basis, frequency=None):
+        """Compute a fingerprint of the base tensors (for all fields), independent of the order in which the results
+        were stored. It is only computed once per bake (and kept in ``self.storage_hashes``).
+
+        :param basis: representation of the base tensors
+        :type basis: qcip_tools.derivatives.Derivative
+        :param frequency: the frequency (if any)
+        :type frequency: str|float
+        :return: the fingerprint (empty if the base tensors are not in the storage)
+        :rtype: str
+        """
+
+        key = (basis.representation(), frequency)
+
+        if key not in self.storage_hashes:
+            compiled = self.storage.compiled()
+
+            try:
+                array_key = compiled.key(basis.representation(), frequency)
+            except files.BadResult:
+                self.storage_hashes[key] = ''
+                return ''
+
+            fields = sorted(compiled.rows)
+            order = [compiled.rows[x] for x in fields]
+
+            h = hashlib.sha1(numpy.array(fields, dtype=float).tobytes())
+            h.update(compiled.available[array_key][order].tobytes())
+            h.update(numpy.ascontiguousarray(compiled.arrays[array_key][order]).tobytes())
+
+            self.storage_hashes[key] = h.hexdigest()
+
+        return self.storage_hashes[key]
+
     @staticmethod
-    def output_information(
-            recipe,
-            initial_derivative,
-            diff_derivative,
-            final_result,
-            romberg_triangles,
-            tensor_access,
-            out=sys.stdout,
-            verbosity_level=0):
+    def hash_key(final_derivative, frequency=None):
+        """Get the key under which the fingerprint of a differentiation is stored
+
+        :param final_derivative: the resulting derivative
+        :type final_derivative: qcip_tools.derivatives.Derivative
+        :param frequency: the frequency (if any)
+        :type frequency: str|float
+        :rtype: str
+        """
+
+        if frequency is None:
+            return final_derivative.representation()
+
+        return '{}@{}'.format(final_derivative.representation(), frequency)
+
+    @staticmethod
+    def _previous_tensor(previous_derivatives, final_derivative, frequency=None):
+        """Get a tensor from the original chemistry file, if any
+
+        :param previous_derivatives: derivatives of the original chemistry file
+        :type previous_derivatives: dict
+        :param final_derivative: the resulting derivative
+        :type final_derivative: qcip_tools.derivatives.Derivative
+        :param frequency: the frequency (if any)
+        :type frequency: str|float
+        :rtype: qcip_tools.derivatives.Tensor
+        """
+
+        value = previous_derivatives.get(final_derivative.representation(), None)
+        if value is None or frequency is None:
+            return value if type(value) is not dict else None
+
+        if type(value) is not dict:
+            return None
+
+        if frequency in value:
+            return value[frequency]
+
+        # the frequencies may have been converted (to atomic units) when the file was written
+        try:
+            w = derivatives_e.convert_frequency_from_string(str(frequency))
+            return next(
+                (v for k, v in value.items()
+                 if math.isclose(derivatives_e.convert_frequency_from_string(str(k)), w, abs_tol=1e-8)), None)
+        except ValueError:
+            return None
+
+    def write_report(self, fp):
+        """Write a report of the last bake (in JSON), from the records (see ``DifferentiationRecord``)
+
+        :param fp: output
+        :type fp: file
+        """
+
+        json.dump({
+            'recipe': {
+                'type': self.recipe['type'],
+                'min_field': self.recipe['min_field'],
+                'ratio': self.recipe['ratio'],
+                'k_max': self.recipe['k_max'],
+                'accuracy_level': self.recipe['accuracy_level']
+            },
+            'derivatives': [record.to_dict() for record in self.records]
+        }, fp, indent=1)
+
+    def _differentiate_in_parallel(self, tasks, workers, engine='components', with_details=False, with_decisions=False):
+        """Perform the numerical differentiations in a pool of processes.
+
+        The compiled results of the storage are copied once in shared memory, and read from there by the workers.
+        The results are given in the same order as the tasks.
+
+        :param tasks: list of ``(initial_derivative, diff_derivative, frequency, force_choice)``
+        :type tasks: list
+        :param workers: number of processes
+        :type workers: int
+        :param engine: engine for the numerical differentiation (see ``ENGINES``)
+        :type engine: str
+        :param with_details: also get back the details (otherwise, ``None`` is given instead)
+        :type with_details: bool
+        :param with_decisions: also capture the decision process to find the best values
+        :type with_decisions: bool
+        :return: list of tensor and details
+        :rtype: list
+        """
+
+        compiled = self.storage.compiled()
+        shared_memories = []
+        shared_arrays = {}
+
+        if engine == 'arrays':  # extract the stencils only once
+            for _, diff_derivative, _, _ in tasks:
+                finite_difference_stencils(self.recipe, diff_derivative)
+
+        try:
+            for key, array in compiled.arrays.items():
+                shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+                shared_memories.append(shm)
+                numpy.ndarray(array.shape, dtype=float, buffer=shm.buf)[:] = array
+                shared_arrays[key] = (shm.name, array.shape)
+
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(
+                        self.recipe,
+                        shared_arrays,
+                        compiled.rows,
+                        compiled.electrical,
+                        compiled.available,
+                        _STENCILS)) as executor:
+
+                futures = [
+                    executor.submit(
+                        _differentiate_in_worker,
+                        initial_derivative.representation(),
+                        diff_derivative.representation(),
+                        frequency,
+                        force_choice,
+                        engine,
+                        with_details,
+                        with_decisions)
+                    for initial_derivative, diff_derivative, frequency, force_choice in tasks
+                ]
+
+                results = [future.result() for future in futures]
+        finally:
+            for shm in shared_memories:
+                shm.close()
+                shm.unlink()
+
+        return results
+
+    @staticmethod
+    def output_information(recipe, record, out=sys.stdout, verbosity_level=0):
         """Output information about what was computed
 
         .. note::
@@ -225,127 +1194,304 @@ class Baker:
             - **>1:** output Romberg triangle and best value ;
             - **>2:** output decision process to find best value in Romberg triangle.
 
-            Therefore, it triggers once again the computation of the best value in Romberg triangle
-            if verbosity_level is > 2.
+            Everything is rendered from ``record``, which must contain the details if verbosity level is > 1 (and
+            the decision process if verbosity level is > 2).
 
         :param recipe: the corresponding recipe
         :type recipe: nachos.core.files.Recipe
-        :param initial_derivative: starting point
-        :type initial_derivative: qcip_tools.derivatives.Derivative
-        :param final_result: what was computed
-        :type final_result: qcip_tools.derivatives.Tensor
-        :param romberg_triangles: the different Romberg triangles
-        :type romberg_triangles: collections.OrderedDict
+        :param record: what was computed
+        :type record: DifferentiationRecord
         :param out: output
         :type out: file
         :param verbosity_level: how far should we print information
         :type verbosity_level: int
         """
 
-        if verbosity_level >= 1:
-            basis_name = fancy_output_derivative(initial_derivative)
-            out.write('*** {} derivative of {} to get {}:\n'.format(
-                'geometrical' if recipe['type'] == 'G' else 'electrical',
-                basis_name,
-                fancy_output_derivative(final_result.representation, final_result.frequency)))
-
-            if verbosity_level >= 2:
-                out.write('** Romberg triangles:\n')
-                for d_coo in romberg_triangles:
-                    out.write('\n* computing {} / {}:\n'.format(
-                        fancy_output_derivative(initial_derivative, final_result.frequency),
-                        ' '.join(
-                            derivatives.representation_to_operator(recipe['type'], a, recipe.geometry) for a in d_coo)
-                    ))
-
-                    # generate fields
-                    if 'G' in diff_derivative.representation():
-                        field = [0] * diff_derivative.spacial_dof
-                    else:
-                        field = [0] * 3
+        if verbosity_level < 1:
+            return
+
+        initial_derivative = record.initial_derivative
+        final_result = record.result
 
-                    for b in d_coo:
-                        field[b] = 1
+        basis_name = fancy_output_derivative(initial_derivative)
+        out.write('*** {} derivative of {} to get {}:\n'.format(
+            'geometrical' if recipe['type'] == 'G' else 'electrical',
+            basis_name,
+            fancy_output_derivative(final_result.representation, final_result.frequency)))
 
-                    all_fields = [[0] * len(field)]
-                    for i in range(1, recipe['k_max'] + 1):
-                        all_fields.append(list(x * i for x in field))
-                        all_fields.insert(0, list(-x * i for x in field))
+        if verbosity_level >= 2:
+            out.write('** Romberg triangles:\n')
+            for d_coo in record.romberg_triangles:
+                out.write('\n* computing {} / {}:\n'.format(
+                    fancy_output_derivative(initial_derivative, final_result.frequency),
+                    ' '.join(
+                        derivatives.representation_to_operator(recipe['type'], a, recipe.geometry) for a in d_coo)
+                ))
 
-                    for b_coo in romberg_triangles[d_coo]:
-                        if initial_derivative != '':
-                            out.write('\n# component {} of {}:\n'.format(
-                                fancy_output_component_of_derivative(initial_derivative, b_coo, recipe.geometry),
-                                basis_name))
+                for j, b_coo in enumerate(record.romberg_triangles[d_coo]):
+                    if initial_derivative != '':
+                        out.write('\n# component {} of {}:\n'.format(
+                            fancy_output_component_of_derivative(initial_derivative, b_coo, recipe.geometry),
+                            basis_name))
 
-                        out.write('\n------------------------------------------------------\n')
-                        out.write(' F          V(F)                  V(F)-V(0)\n')
-                        out.write('------------------------------------------------------\n')
-                        zero_field_val = tensor_access(
-                            [0] * len(field), 0, initial_derivative, b_coo, final_result.frequency, recipe)
+                    out.write('\n------------------------------------------------------\n')
+                    out.write(' F          V(F)                  V(F)-V(0)\n')
+                    out.write('------------------------------------------------------\n')
 
-                        for i, c in enumerate(all_fields):
-                            k = i - recipe['k_max']
+                    values = record.field_values[d_coo][:, j]
+                    zero_field_val = values[recipe['k_max']]
+                    for field_val, val in zip(record.fields, values):
+                        out.write('{: .7f} {: .14e} {: .14e}\n'.format(field_val, val, val - zero_field_val))
 
-                            field_val = 0
-                            if k != 0:
-                                field_val = recipe['min_field'] * recipe['ratio'] ** (abs(k) - 1) * (-1 if k < 0 else 1)
+                    out.write('------------------------------------------------------\n\n')
 
-                            val = tensor_access(
-                                c, 0, initial_derivative, b_coo, final_result.frequency, recipe)
-                            dV = val - zero_field_val
-                            out.write(
-                                '{: .7f} {: .14e} {: .14e}\n'.format(
-                                    field_val,
-                                    val, dV))
+                    out.write(record.romberg_triangles[d_coo][b_coo].romberg_triangle_repr(with_decoration=True))
 
-                        out.write('------------------------------------------------------\n\n')
+                    if verbosity_level >= 3:
+                        out.write(record.decisions[d_coo][b_coo])
+                        out.write('\n')
 
-                        romberg_triangle = romberg_triangles[d_coo][b_coo]
-                        out.write(romberg_triangle.romberg_triangle_repr(with_decoration=True))
+                    vals = record.best_values[d_coo][b_coo]
+                    out.write('({}) = {:.5e} (error = {:.5e})\n'.format(
+                        ','.join(str(a) for a in vals[0]), vals[1], vals[2]))
 
-                        vals = romberg_triangle.find_best_value(verbose=verbosity_level >= 3, out=out)
-                        if verbosity_level >= 3:
-                            out.write('\n')
+        if verbosity_level >= 2:
+            out.write('\n** Final result:\n')
+
+        out.write(final_result.to_string(molecule=recipe.geometry))
+        out.write('\n')
 
-                        out.write('({}) = {:.5e} (error = {:.5e})\n'.format(
-                            ','.join(str(a) for a in vals[0]), vals[1], vals[2]))
+        if verbosity_level >= 2 and initial_derivative != '':
+            out.write('\n** Checking Kleinman conditions:\n')
+            for i, mean, std in record.kleinman:
+                out.write('- {}: '.format(fancy_output_component_of_derivative(final_result.representation, i)))
+                out.write('{: .5e} ± {:.5e}'.format(mean, std))
+                out.write('\n')
 
-            if verbosity_level >= 2:
-                out.write('\n** Final result:\n')
+        if verbosity_level >= 2:
+            out.write('\n** Estimated uncertainties:\n')
+            out.write('*** Values:\n')
 
-            out.write(final_result.to_string(molecule=recipe.geometry))
+            out.write(record.uncertainties.to_string(molecule=recipe.geometry, threshold=1e-8))
             out.write('\n')
 
-            if verbosity_level >= 2 and initial_derivative != '':
-                out.write('\n** Checking Kleinman conditions:\n')
-                for i in final_result.representation.smart_iterator():
-                    values = list(
-                        final_result.components[j] for j in final_result.representation.inverse_smart_iterator(i))
-                    if len(values) > 1:
-                        out.write('- {}: '.format(fancy_output_component_of_derivative(final_result.representation, i)))
-                        out.write('{: .5e} ± {:.5e}'.format(numpy.mean(values), numpy.std(values)))
-                        out.write('\n')
+            out.write('*** Ratio (%):\n')
+            out.write(record.relative_uncertainties.to_string(molecule=recipe.geometry))
+            out.write('\n')
 
-            if verbosity_level >= 2:
-                out.write('\n** Estimated uncertainties:\n')
-                out.write('*** Values:\n')
 
-                u = Baker.make_uncertainty_tensor(
-                    romberg_triangles, initial_derivative, diff_derivative, final_result.frequency)
+class _SharedResults(files.ComputationalResults):
+    """Storage used in the worker processes, which reads the compiled results in shared memory blocks (created by
+    :meth:`Baker._differentiate_in_parallel`).
 
-                out.write(u.to_string(molecule=recipe.geometry, threshold=1e-8))
-                out.write('\n')
+    :param recipe: the recipe
+    :type recipe: nachos.core.files.Recipe
+    :param shared_arrays: name of the shared memory block and shape, per key of the compiled results
+    :type shared_arrays: dict
+    :param rows: row of each fields
+    :type rows: dict
+    :param electrical: whether each derivative is electrical
+    :type electrical: dict
+    :param available: where each array is available
+    :type available: dict
+    """
 
-                out.write('*** Ratio (%):\n')
-                ru = derivatives.Tensor(
-                    u.representation, components=(u.components / final_result.components) * 100,
-                    spacial_dof=u.spacial_dof,
-                    frequency=u.frequency
-                )
+    def __init__(self, recipe, shared_arrays, rows, electrical, available):
+        self.recipe = recipe
+        self.directory = '.'
+        self.results = {}
+        self.field_index = {}
+        self.fields_needed_by_recipe = []
+
+        self.shared_memories = []
+        self._compiled = files.CompiledResults({})
+        self._compiled.rows = rows
+        self._compiled.electrical = electrical
+        self._compiled.available = available
+
+        for key, (name, shape) in shared_arrays.items():
+            shm = shared_memory.SharedMemory(name=name)
+            self.shared_memories.append(shm)
+            self._compiled.arrays[key] = numpy.ndarray(shape, dtype=float, buffer=shm.buf)
+
+    def close(self):
+        """Close the shared memory blocks (they are unlinked by the main process). The arrays that use them are
+        dropped first, since a block cannot be closed while they exist.
+        """
 
-                out.write(ru.to_string(molecule=recipe.geometry))
-                out.write('\n')
+        self._compiled.arrays = {}
+
+        for shm in self.shared_memories:
+            shm.close()
+
+        self.shared_memories = []
+
+
+#: recipe and storage of the worker process (see ``_init_worker()``)
+_worker_recipe = None
+_worker_storage = None
+
+
+def _init_worker(recipe, shared_arrays, rows, electrical, available, stencils):
+    """Initialize a worker process.
+    The shared memory blocks are closed when the process exits.
+
+    :param recipe: the recipe
+    :type recipe: nachos.core.files.Recipe
+    :param shared_arrays: name of the shared memory block and shape, per key of the compiled results
+    :type shared_arrays: dict
+    :param rows: row of each fields
+    :type rows: dict
+    :param electrical: whether each derivative is electrical
+    :type electrical: dict
+    :param available: where each array is available
+    :type available: dict
+    :param stencils: stencils already extracted (see ``finite_difference_stencils()``)
+    :type stencils: dict
+    """
+
+    global _worker_recipe, _worker_storage
+    _worker_recipe = recipe
+    _worker_storage = _SharedResults(recipe, shared_arrays, rows, electrical, available)
+    _STENCILS.update(stencils)
+
+    # the worker processes exit without calling the ``atexit`` functions, but they run these finalizers
+    multiprocessing.util.Finalize(None, _worker_storage.close, exitpriority=0)
+
+
+def _differentiate_in_worker(
+        initial_representation, diff_representation, frequency, force_choice, engine, with_details, with_decisions):
+    """Perform a numerical differentiation in a worker process.
+
+    :param initial_representation: representation of the starting point
+    :type initial_representation: str
+    :param diff_representation: representation of the differentiation
+    :type diff_representation: str
+    :param frequency: the frequency (if any)
+    :type frequency: str|float
+    :param force_choice: force the choice in the Romberg triangle
+    :type force_choice: tuple
+    :param engine: engine for the numerical differentiation (see ``ENGINES``)
+    :type engine: str
+    :param with_details: also capture the details
+    :type with_details: bool
+    :param with_decisions: also capture the decision process to find the best values
+    :type with_decisions: bool
+    :rtype: tuple
+    """
+
+    dof = _worker_recipe.dof
+    return _differentiate(
+        _worker_recipe,
+        _worker_storage,
+        derivatives.Derivative(initial_representation, spacial_dof=dof),
+        derivatives.Derivative(diff_representation, spacial_dof=dof),
+        frequency,
+        force_choice,
+        engine,
+        with_details=with_details,
+        with_decisions=with_decisions)
+
+
+def save_bake_hashes(path, hashes):
+    """Save the fingerprints of the differentiations (see ``Baker.fingerprint()``) in an h5 file
+
+    :param path: path to the h5 file
+    :type path: str
+    :param hashes: the fingerprints
+    :type hashes: dict
+    """
+
+    with h5py.File(path, 'a') as f:
+        if '/derivatives/' not in f:
+            f.create_group('derivatives')
+
+        if 'bake_hashes' in f['derivatives']:
+            del f['derivatives']['bake_hashes']
+
+        hashes_group = f['derivatives'].create_group('bake_hashes')
+        for key, value in hashes.items():
+            hashes_group.attrs[key] = value
+
+
+def load_bake_hashes(path):
+    """Load the fingerprints of the differentiations from an h5 file
+
+    :param path: path to the h5 file
+    :type path: str
+    :rtype: dict
+    """
+
+    with h5py.File(path, 'r') as f:
+        if '/derivatives/bake_hashes' not in f:
+            return {}
+
+        return dict(
+            (key, value.decode() if type(value) is bytes else str(value))
+            for key, value in f['derivatives']['bake_hashes'].attrs.items())
+
+
+class NormalModesProjector:
+    """Project geometrical derivatives over the normal modes, in batch.
+
+    The transformation from the cartesian coordinates to the normal modes is computed once (by projecting the unit
+    vectors with qcip_tools, so that the conventions are the same), then applied to the tensors with one contraction
+    per geometrical index. The tensors of all frequencies are stacked and projected at once.
+
+    :param mass_weighted_hessian: the mass weighted hessian
+    :type mass_weighted_hessian: qcip_tools.derivatives_g.MassWeightedHessian
+    """
+
+    def __init__(self, mass_weighted_hessian):
+        self.dof = mass_weighted_hessian.dof
+
+        g = derivatives.Derivative('G', spacial_dof=self.dof)
+        self.transformation = numpy.array([
+            derivatives.Tensor(g, spacial_dof=self.dof, components=e).project_over_normal_modes(
+                mass_weighted_hessian).components for e in numpy.eye(self.dof)]).T
+
+    def project_components(self, representation, components):
+        """Project the components of (stacked) tensors
+
+        :param representation: representation of the derivative
+        :type representation: str
+        :param components: components, with an extra first axis (e.g. the frequencies)
+        :type components: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        projected = components
+        for i, c in enumerate(representation):
+            if c == 'G':
+                projected = numpy.moveaxis(
+                    numpy.tensordot(self.transformation, projected, axes=([1], [i + 1])), 0, i + 1)
+
+        return projected
+
+    def project(self, tensors):
+        """Project a tensor, or tensors for different frequencies
+
+        :param tensors: tensor, or tensor per frequency
+        :type tensors: qcip_tools.derivatives.Tensor|dict
+        :rtype: qcip_tools.derivatives.Tensor|dict
+        """
+
+        per_frequency = tensors if type(tensors) is dict else {None: tensors}
+        keys = list(per_frequency)
+
+        d_repr = per_frequency[keys[0]].representation.representation()
+        if 'G' not in d_repr:
+            raise ValueError('{} is not a geometrical derivative'.format(d_repr))
+
+        projected = self.project_components(d_repr, numpy.array([per_frequency[k].components for k in keys]))
+        n_derivative = derivatives.Derivative(d_repr.replace('G', 'N'), spacial_dof=self.dof)
+
+        results = dict(
+            (k, derivatives.Tensor(
+                n_derivative, spacial_dof=self.dof, frequency=per_frequency[k].frequency, components=projected[i]))
+            for i, k in enumerate(keys))
+
+        return results if type(tensors) is dict else results[None]
 
 
 def project_geometrical_derivatives(recipe, datafile, mass_weighted_hessian, out=sys.stdout, verbosity_level=0):
@@ -366,6 +1512,8 @@ def project_geometrical_derivatives(recipe, datafile, mass_weighted_hessian, out
     if mass_weighted_hessian.dof != recipe.dof:
         raise ValueError('displacement shape does not match')
 
+    projector = None
+
     for basis, level in recipe.bases():
         b_repr = basis.representation()
 
@@ -378,34 +1526,16 @@ def project_geometrical_derivatives(recipe, datafile, mass_weighted_hessian, out
                 d_repr = derivative.representation()
                 n_repr = d_repr.replace('G', 'N')
                 if d_repr in datafile.derivatives and n_repr not in datafile.derivatives:
-                    if derivatives.is_electrical(derivative):
-                        x = {}
-                        for freq in datafile.derivatives[d_repr]:
-                            r = __project_tensor(
-                                datafile.derivatives[d_repr][freq], mass_weighted_hessian)
-                            __output_nm_derivatives(recipe, r, out, verbosity_level, datafile.trans_plus_rot_dof)
-                            x[freq] = r
-                    else:
-                        r = __project_tensor(datafile.derivatives[d_repr], mass_weighted_hessian)
+                    if projector is None:
+                        projector = NormalModesProjector(mass_weighted_hessian)
+
+                    x = projector.project(datafile.derivatives[d_repr])
+                    for r in (x.values() if type(x) is dict else [x]):
                         __output_nm_derivatives(recipe, r, out, verbosity_level, datafile.trans_plus_rot_dof)
-                        x = r
 
                     datafile.derivatives[n_repr] = x
 
 
-def __project_tensor(data, mwh):
-    """Project tensor over displacements to get their normal derivative equivalent
-
-    :param data: the data
-    :type data: qcip_tools.derivatives.Tensor
-    :param mwh: mass weighted hessian
-    :type mwh: qcip_tools.derivatives_g.MassWeightedHessian
-    :rtype: qcip_tools.derivatives.Tensor
-    """
-
-    return data.project_over_normal_modes(mwh)
-
-
 def __output_nm_derivatives(recipe, final_result, out, verbosity_level=0, trans_plus_rot_dof=0):
     if verbosity_level >= 1:
         out.write('\n*** projected ')
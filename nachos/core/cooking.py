@@ -1,14 +1,32 @@
+import io
 import os
 import glob
+import fnmatch
+import json
 import math
+import h5py
 import numpy
 import sys
+import tarfile
+import concurrent.futures
 
 from qcip_tools import quantities, derivatives, derivatives_e
-from qcip_tools.chemistry_files import helpers, PropertyNotPresent, PropertyNotDefined
+from qcip_tools.chemistry_files import helpers, chemistry_datafile, gaussian, dalton, PropertyNotPresent, \
+    PropertyNotDefined
 
-from nachos.core import files, preparing, GAUSSIAN_DOUBLE_HYBRIDS
-from nachos.qcip_tools_ext import gaussian, qchem  # noqa
+from nachos.core import files, GAUSSIAN_DOUBLE_HYBRIDS
+from nachos.qcip_tools_ext import gaussian as gaussian_ext, qchem, dalton as dalton_ext  # noqa
+
+
+#: Readers of the QM output files, per flavor and extension
+READERS = {
+    'gaussian': {'.fchk': gaussian.FCHK, '.log': gaussian.Output},
+    'dalton': {'.tar.gz': dalton.ArchiveOutput, '.out': dalton.Output},
+    'qchem': {'.log': qchem.QChemLogFile}
+}
+
+#: Number of characters read at the beginning of a QM output file to identify it
+IDENTIFICATION_PREFIX_SIZE = 65536
 
 
 class BadCooking(Exception):
@@ -31,10 +49,13 @@ class Cooker:
             raise BadCooking('{} is not a directory'.format(directory))
 
         self.directory = directory
-        self.fields_needed_by_recipe = preparing.fields_needed_by_recipe(self.recipe)
-        self.fields_needed = [a[0] for a in self.fields_needed_by_recipe]
+        self.field_index = self.recipe.field_index()
+        self.fields_needed_by_recipe = self.recipe.fields_needed()
+        self._reference = None
 
-    def cook(self, directories, out=sys.stdout, verbosity_level=0, use_gaussian_logs=False):
+    def cook(
+            self, directories, out=sys.stdout, verbosity_level=0, use_gaussian_logs=False, workers=1, cache=None,
+            manifest=None):
         """Cook files in directories, all together in a storage file
 
         :param directories: directories where QM results should be looked for
@@ -45,11 +66,94 @@ class Cooker:
         :type verbosity_level: bool
         :param use_gaussian_logs: use Gaussian LOGs instead of FCHKs. But don't ;)
         :type use_gaussian_logs: bool
+        :param workers: number of processes used to read the files (the results are added to the storage in the
+          same order as with a single process)
+        :type workers: int
+        :param cache: cache of the results extracted from the files: the files that did not change are not read
+          again, and the cache is updated with the others (but not written)
+        :type cache: CookCache
+        :param manifest: manifest of the preparer: if given, only the outputs that it lists are cooked, and their
+          fields are taken from it (see ``outputs_from_manifest()``)
+        :type manifest: nachos.core.preparing.Manifest
         :rtype: nachos.core.files.ComputationalResults
         """
 
+        if workers < 1:
+            raise BadCooking('number of workers should be larger than 0')
+
         storage = files.ComputationalResults(self.recipe, directory=self.directory)
 
+        fields_of = {}
+        if manifest is not None:
+            found, _ = self.outputs_from_manifest(manifest, directories, use_gaussian_logs=use_gaussian_logs)
+            paths = [path for path, _ in found]
+            fields_of = dict(found)
+        else:
+            paths = []
+            for directory in directories:
+                if not os.path.isdir(directory):
+                    raise BadCooking('{} is no directory!'.format(directory))
+
+                for line in self.look_for(use_gaussian_logs):
+                    paths.extend(glob.glob('{}/{}'.format(directory, line)))
+
+        cached = {}
+        if cache is not None:
+            for i in paths:
+                try:
+                    cached[i] = cache.get(i)
+                except KeyError:
+                    continue
+
+        to_extract = [i for i in paths if i not in cached]
+
+        executor = None
+        if workers > 1 and len(to_extract) > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(self, ))
+            extracted = executor.map(
+                _extract_in_worker, to_extract, [fields_of.get(i) for i in to_extract],
+                chunksize=max(1, len(to_extract) // (4 * workers)))
+        else:
+            extracted = (self.extract_from_path(i, fields_of.get(i)) for i in to_extract)
+
+        try:
+            for i in paths:
+                if verbosity_level >= 1:
+                    out.write('* cooking with {} ... '.format(i))
+
+                if i in cached:
+                    e = cached[i]
+                else:
+                    e = next(extracted)
+                    if cache is not None:
+                        cache.set(i, e)
+
+                if e is None:
+                    if verbosity_level >= 1:
+                        out.write('skipped\n')
+                    continue
+
+                obtained, results = e
+                Cooker.add_results(storage, results)
+
+                if verbosity_level >= 1:
+                    out.write('({}) ... {}\n'.format(', '.join(obtained), 'ok' if i not in cached else 'cached')
+                              if len(obtained) != 0 else 'empty\n')
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        return storage
+
+    def look_for(self, use_gaussian_logs=False):
+        """Get the patterns of the QM output files, depending on the flavor
+
+        :param use_gaussian_logs: use Gaussian LOGs instead of FCHKs
+        :type use_gaussian_logs: bool
+        :rtype: list of str
+        """
+
         if self.recipe['flavor'] == 'gaussian':
             look_for = ['*.fchk']
             if use_gaussian_logs:
@@ -63,30 +167,266 @@ class Cooker:
         else:
             look_for = []
 
+        return look_for
+
+    def outputs_from_manifest(self, manifest, directories, use_gaussian_logs=False):
+        """Find the QM outputs listed in the manifest of the preparer (only the ones matching ``look_for()``), without
+        opening them.
+
+        :param manifest: the manifest
+        :type manifest: nachos.core.preparing.Manifest
+        :param directories: directories where QM results should be looked for
+        :type directories: list of str
+        :param use_gaussian_logs: use Gaussian LOGs instead of FCHKs
+        :type use_gaussian_logs: bool
+        :return: the outputs that were found, as a list of ``(path, fields)``, and the entries of the manifest for
+          which (some of) the outputs are missing
+        :rtype: tuple
+        """
+
         for directory in directories:
             if not os.path.isdir(directory):
                 raise BadCooking('{} is no directory!'.format(directory))
 
-            for line in look_for:
-                for i in glob.glob('{}/{}'.format(directory, line)):
-                    if verbosity_level >= 1:
-                        out.write('* cooking with {} ... '.format(i))
-
-                    with open(i) as f:
-                        try:
-                            fx = helpers.open_chemistry_file(f)
-                            obtained = self.cook_from_file(fx, i, storage)
-                            if verbosity_level >= 1:
-                                out.write(
-                                    '({}) ... ok\n'.format(', '.join(obtained))
-                                    if len(obtained) != 0 else 'empty\n')
-
-                        except helpers.ProbablyNotAChemistryFile:
-                            if verbosity_level >= 1:
-                                out.write('skipped\n')
-                            continue
+        look_for = self.look_for(use_gaussian_logs)
+        found = []
+        missing = []
 
-        return storage
+        for entry in manifest.entries:
+            fields = list(entry['fields'])
+            if tuple(fields) not in self.field_index:
+                raise BadCooking('fields {} of the manifest are not part of the recipe'.format(fields))
+
+            paths = []
+            for name in entry['outputs']:
+                if not any(fnmatch.fnmatch(name, pattern) for pattern in look_for):
+                    continue
+
+                path = next(
+                    (os.path.join(d, name) for d in directories if os.path.exists(os.path.join(d, name))), None)
+
+                if path is None:
+                    missing.append(entry)
+                    break
+
+                paths.append((path, fields))
+            else:
+                found.extend(paths)
+
+        return found, missing
+
+    def extract_from_path(self, path, fields=None):
+        """Open a file and extract the results that it contains (see ``extract_from_file()``).
+
+        The file is identified on its beginning (see ``identify()``), and then read with the corresponding reader.
+        Only if it is not identified that way, qcip_tools tries all the possible readers (on the whole file).
+        Dalton archives are streamed, and only the members that are needed are read (see ``archive_members()``).
+
+        :param path: path to the file
+        :type path: str
+        :param fields: fields of the file, if known (otherwise, they are obtained from the file)
+        :type fields: list
+        :return: what was obtained and the results, or ``None`` if this is not a chemistry file
+        :rtype: tuple
+        """
+
+        reader = self.reader_for(path)
+
+        if reader is dalton.ArchiveOutput:
+            try:
+                fx = dalton_ext.read_archive(path, self.archive_members(fields))
+            except tarfile.ReadError:
+                return None  # not an archive
+
+            return self.extract_from_file(fx, path, fields)
+
+        with open(path) as f:
+            if fields is None:
+                # only used to skip the file: the fields are then obtained (and checked) from the whole file
+                prescanned_fields = self.prescan(f, reader)
+                if prescanned_fields is not None and tuple(prescanned_fields) not in self.field_index:
+                    return [], []  # not part of this calculation
+
+                f.seek(0)
+
+            try:
+                identified_reader = self.identify(io.StringIO(f.read(IDENTIFICATION_PREFIX_SIZE)), reader)
+                f.seek(0)
+
+                if identified_reader is not None:
+                    fx = identified_reader()
+                    fx.read(f)
+                else:  # let qcip_tools find out
+                    fx = helpers.open_chemistry_file(f)
+
+                return self.extract_from_file(fx, path, fields)
+            except helpers.ProbablyNotAChemistryFile:
+                return None
+
+    def identify(self, prefix, reader=None):
+        """Identify a QM output file from its beginning (see ``IDENTIFICATION_PREFIX_SIZE``): the reader corresponding
+        to its extension (if any) is tried first, then the other readers of the flavor.
+
+        :param prefix: the beginning of the file
+        :type prefix: io.StringIO
+        :param reader: class that reads the file according to its extension (see ``reader_for()``)
+        :type reader: type
+        :return: the class that reads the file, or ``None`` if it is not identified
+        :rtype: type
+        """
+
+        readers = [reader] if reader is not None else []
+        for r in READERS.get(self.recipe['flavor'], {}).values():
+            if r not in readers and r is not dalton.ArchiveOutput:  # archives are binary
+                readers.append(r)
+
+        for r in readers:
+            prefix.seek(0)
+            if r.attempt_identification(prefix):
+                return r
+
+        return None
+
+    def prescan(self, f, reader):
+        """Get the fields of a QM output file by only reading the part that is needed, so that the files which are not
+        part of this calculation are not fully read.
+        Since the rest of the file is not checked (e.g. the atoms of the molecule), these fields are only used to skip
+        files, not to extract the results of the other ones.
+
+        For the moment, this is only possible with Gaussian FCHKs (from the ``External E-field`` or the
+        ``Current cartesian coordinates`` records) and QChem outputs (from the multipole field, if any).
+
+        :param f: file
+        :type f: file
+        :param reader: class that reads the file (see ``reader_for()``)
+        :type reader: type
+        :return: the fields, or ``None`` if they cannot be obtained that way
+        :rtype: list
+        """
+
+        try:
+            if reader is gaussian.FCHK:
+                if self.recipe['type'] == 'F':
+                    record = Cooker.read_fchk_records(f, ['External E-field']).get('External E-field')
+                    if record is None:
+                        return None
+
+                    # Gaussian computes actually for the opposite field!
+                    real_fields = list(-x for x in record[1:4])
+                else:
+                    record = Cooker.read_fchk_records(
+                        f, ['Current cartesian coordinates']).get('Current cartesian coordinates')
+                    if record is None or len(record) != 3 * len(self.recipe.geometry):
+                        return None
+
+                    return self.fields_from_coordinates(numpy.array(record)).tolist()
+
+            elif reader is qchem.QChemLogFile and self.recipe['type'] == 'F':
+                real_fields = Cooker.read_qchem_field(f)
+                if real_fields is None:
+                    return None
+            else:
+                return None
+
+        except (ValueError, IndexError, StopIteration, UnicodeDecodeError):
+            return None
+
+        return Cooker.real_fields_to_fields(real_fields, self.recipe['min_field'], self.recipe['ratio'])
+
+    @staticmethod
+    def read_fchk_records(f, titles):
+        """Read some records of a FCHK, and stop as soon as they are all found.
+
+        :param f: file
+        :type f: file
+        :param titles: titles of the records
+        :type titles: list of str
+        :return: the records that were found (list of values)
+        :rtype: dict
+        """
+
+        records = {}
+        lines = iter(f)
+
+        for line in lines:
+            if len(records) == len(titles):
+                break
+
+            title = line[:43].strip()
+            if title not in titles:
+                continue
+
+            convert = float if line[43] == 'R' else int
+
+            if line[47:49] == 'N=':
+                size = int(line[49:])
+                values = []
+                while len(values) < size:
+                    values.extend(convert(x) for x in next(lines).split())
+                records[title] = values
+            else:
+                records[title] = [convert(line[49:])]
+
+        return records
+
+    @staticmethod
+    def read_qchem_field(f):
+        """Read the input electric field of a QChem output (see
+        ``nachos.qcip_tools_ext.qchem.qchem__log__property__input_electric_field``), and stop at the end of the
+        introduction.
+
+        :param f: file
+        :type f: file
+        :return: the field, or ``None`` if the end of the introduction is not found
+        :rtype: list
+        """
+
+        lines = iter(f)
+
+        for line in lines:
+            if 'Cartesian multipole field' in line:
+                next(lines)
+                next(lines)
+                return [float(next(lines)[16:].strip()) for _ in range(3)]
+            elif any(x in line for x in
+                     ['General SCF calculation program', 'CCMAN2:', 'Orbital Energies (a.u.) and Symmetries']):
+                return [.0, .0, .0]
+
+        return None
+
+    def archive_members(self, fields=None):
+        """Get the members of the Dalton archives that are needed: ``DALTON.BAS`` (for the molecule), and
+        ``DALTON.PROP`` (for the energy and the electrical derivatives) if the bases require it.
+
+        :param fields: fields of the archive, if known (then, only the bases of its level are considered)
+        :type fields: list
+        :rtype: list of str
+        """
+
+        level_min = -1
+        if fields is not None and tuple(fields) in self.field_index:
+            level_min = self.field_index[tuple(fields)][1]
+
+        members = ['DALTON.BAS']
+        if any(b[0] == '' or derivatives.is_electrical(b[0]) for b in self.recipe.bases(level_min=level_min)):
+            members.append('DALTON.PROP')
+
+        return members
+
+    def reader_for(self, path):
+        """Get the class that reads a QM output file, from the flavor of the recipe and the extension of the file.
+
+        :param path: path to the file
+        :type path: str
+        :return: the class, or ``None`` if there is no reader for this extension
+        :rtype: type
+        """
+
+        for extension, reader in READERS.get(self.recipe['flavor'], {}).items():
+            if path.endswith(extension):
+                return reader
+
+        return None
 
     def cook_from_file(self, f, name, storage):
         """
@@ -101,35 +441,67 @@ class Cooker:
         :rtype: list
         """
 
+        obtained, results = self.extract_from_file(f, name)
+        Cooker.add_results(storage, results)
+
+        return obtained
+
+    @staticmethod
+    def add_results(storage, results):
+        """Add the results extracted from a file to the storage
+
+        :param storage: storage object
+        :type storage: nachos.core.files.ComputationalResults
+        :param results: list of ``(fields, derivative, value, allow_replace)``
+        :type results: list
+        """
+
+        for fields, derivative, value, allow_replace in results:
+            storage.add_result(fields, derivative, value, allow_replace=allow_replace)
+
+    def extract_from_file(self, f, name, fields=None):
+        """Extract the results that a file contains (without adding them to a storage)
+
+        :param f: file
+        :type f: qcip_tools.chemistry_files.ChemistryFile
+        :param name: path to the file
+        :type name: str
+        :param fields: fields of the file, if known (otherwise, they are obtained from the file)
+        :type fields: list
+        :return: what was obtained, and the results, as a list of ``(fields, derivative, value, allow_replace)``
+        :rtype: tuple
+        """
+
         def almost_the_same(a, b, threshold=1e-3):
             return math.fabs(a - b) < threshold
 
         obtained = []
+        results = []
+        # catch field (if not known)
+        if fields is None:
+            if self.recipe['type'] == 'F':
+                try:
+                    real_fields = f.property('n:input_electric_field')[1:4]
 
-        # catch field
-        if self.recipe['type'] == 'F':
-            try:
-                real_fields = f.property('n:input_electric_field')[1:4]
-
-                if f.file_type in ['GAUSSIAN_FCHK', 'GAUSSIAN_LOG']:
-                    # Gaussian computes actually for the opposite field!
-                    real_fields = list(-x for x in real_fields)
+                    if f.file_type in ['GAUSSIAN_FCHK', 'GAUSSIAN_LOG']:
+                        # Gaussian computes actually for the opposite field!
+                        real_fields = list(-x for x in real_fields)
 
-            except PropertyNotPresent:
-                raise BadCooking('F derivative but not electric field for {}'.format(name))
-        else:
-            try:
-                real_fields = Cooker.real_fields_from_geometry(
-                    self.recipe.geometry, f.property('molecule'), threshold=.5 * self.recipe['min_field'])
-            except (PropertyNotDefined, PropertyNotPresent) as e:
-                raise BadCooking('G derivative but unable to get geometry from {} ({})'.format(name, str(e)))
+                except PropertyNotPresent:
+                    raise BadCooking('F derivative but not electric field for {}'.format(name))
 
-        fields = Cooker.real_fields_to_fields(real_fields, self.recipe['min_field'], self.recipe['ratio'])
+                fields = Cooker.real_fields_to_fields(real_fields, self.recipe['min_field'], self.recipe['ratio'])
+            else:
+                try:
+                    fields = self.fields_from_geometries([f.property('molecule')])[0].tolist()
+                except (PropertyNotDefined, PropertyNotPresent) as e:
+                    raise BadCooking('G derivative but unable to get geometry from {} ({})'.format(name, str(e)))
 
-        if fields not in self.fields_needed:
-            return []  # not part of this calculation
+        t_fields = tuple(fields)
+        if t_fields not in self.field_index:
+            return obtained, results  # not part of this calculation
 
-        level = next(a[1] for a in self.fields_needed_by_recipe if a[0] == fields)
+        level = self.field_index[t_fields][1]
         derivatives_per_level = self.recipe.bases(level_min=level)
         derivatives_in_level = [a[0] for a in derivatives_per_level]
 
@@ -156,11 +528,7 @@ class Cooker:
                     energy = energies['total']
                     obtained.append('energy')
 
-                storage.add_result(
-                    fields,
-                    '',
-                    derivatives.Tensor('', components=numpy.array((energy,))),
-                    allow_replace=True)
+                results.append((fields, '', derivatives.Tensor('', components=numpy.array((energy,))), True))
 
             except (PropertyNotPresent, PropertyNotDefined, KeyError):
                 pass
@@ -184,12 +552,8 @@ class Cooker:
 
                     obtained.append(d)
 
-                    storage.add_result(
-                        fields,
-                        d,
-                        e_deriv,
-                        # NOTE: frequency calculations compute electrical deriv as well, so replace them if any:
-                        allow_replace=d in ['F', 'FF', 'FFF'])
+                    # NOTE: frequency calculations compute electrical deriv as well, so replace them if any:
+                    results.append((fields, d, e_deriv, d in ['F', 'FF', 'FFF']))
         except (PropertyNotPresent, PropertyNotDefined):
             pass
 
@@ -197,34 +561,265 @@ class Cooker:
             geometrical_derivatives = f.property('geometrical_derivatives')
             for d in geometrical_derivatives:
                 if d in derivatives_in_level:
-                    storage.add_result(fields, d, geometrical_derivatives[d])
+                    results.append((fields, d, geometrical_derivatives[d], False))
         except (PropertyNotPresent, PropertyNotDefined):
             pass
-        return obtained
+
+        return obtained, results
+
+    def reference_coordinates(self):
+        """Get the coordinates (in bohr) and the symbols of the atoms of the reference geometry (computed once)
+
+        :return: the coordinates, as a ``(3N,)`` array, and the symbols
+        :rtype: tuple
+        """
+
+        if self._reference is None:
+            coordinates = numpy.array([a.position for a in self.recipe.geometry], dtype=float).flatten()
+            self._reference = (
+                coordinates / quantities.AuToAngstrom, tuple(a.symbol for a in self.recipe.geometry))
+
+        return self._reference
+
+    def fields_from_coordinates(self, coordinates):
+        """Get the fields from the coordinates (in bohr) of one or more deformed geometries.
+
+        :param coordinates: the coordinates, as a ``(3N,)`` or a ``(M, 3N)`` array
+        :type coordinates: numpy.ndarray
+        :return: the fields (same shape)
+        :rtype: numpy.ndarray
+        """
+
+        reference, _ = self.reference_coordinates()
+
+        real_fields = coordinates - reference
+        real_fields[numpy.abs(real_fields) < .5 * self.recipe['min_field']] = .0
+
+        return Cooker.real_fields_to_fields_array(real_fields, self.recipe['min_field'], self.recipe['ratio'])
+
+    def fields_from_geometries(self, geometries):
+        """Get the fields from a batch of deformed geometries
+
+        :param geometries: the geometries
+        :type geometries: list of qcip_tools.molecule.Molecule
+        :return: the fields, as a ``(M, 3N)`` array
+        :rtype: numpy.ndarray
+        """
+
+        reference, symbols = self.reference_coordinates()
+
+        for geometry in geometries:
+            if len(geometry) != len(symbols) or tuple(a.symbol for a in geometry) != symbols:
+                raise ValueError('geometries does not contain the same atoms')
+
+        coordinates = numpy.array(
+            [[a.position for a in geometry] for geometry in geometries], dtype=float).reshape(
+            (len(geometries), reference.shape[0])) / quantities.AuToAngstrom
+
+        return self.fields_from_coordinates(coordinates)
 
     @staticmethod
-    def real_fields_to_fields(real_field, min_field, ratio):
-        fields = []
-        for val in real_field:
-            if val == .0:
-                fields.append(0)
-            else:
-                sgn = -1 if val < 0 else 1
-                i = round(math.log(math.fabs(val) / min_field) / math.log(ratio)) + 1
-                fields.append(sgn * i)
+    def real_fields_to_fields_array(real_fields, min_field, ratio):
+        """Get the fields (in units of the minimal field) from the real fields
+
+        :param real_fields: the real fields, of any shape
+        :type real_fields: numpy.ndarray
+        :param min_field: minimal field
+        :type min_field: float
+        :param ratio: ratio
+        :type ratio: float
+        :return: the fields (same shape)
+        :rtype: numpy.ndarray
+        """
+
+        real_fields = numpy.asarray(real_fields, dtype=float)
+        fields = numpy.zeros(real_fields.shape, dtype=int)
+
+        nonzero = real_fields != .0
+        values = real_fields[nonzero]
+        fields[nonzero] = numpy.sign(values) * (
+            numpy.rint(numpy.log(numpy.abs(values) / min_field) / math.log(ratio)) + 1)
 
         return fields
 
+    @staticmethod
+    def real_fields_to_fields(real_field, min_field, ratio):
+        return Cooker.real_fields_to_fields_array(real_field, min_field, ratio).tolist()
+
     @staticmethod
     def real_fields_from_geometry(geometry, deformed_geometry, threshold=1e-4):
-        if len(geometry) != len(deformed_geometry) or str(geometry) != str(deformed_geometry):
-            raise ValueError('geometries does not contain the same number of atoms')
+        if len(geometry) != len(deformed_geometry) or \
+                any(a.symbol != b.symbol for a, b in zip(geometry, deformed_geometry)):
+            raise ValueError('geometries does not contain the same atoms')
+
+        real_fields = (numpy.array([a.position for a in deformed_geometry], dtype=float).flatten() - numpy.array(
+            [a.position for a in geometry], dtype=float).flatten()) / quantities.AuToAngstrom
+        real_fields[numpy.abs(real_fields) < threshold] = 0
+
+        return real_fields.tolist()
+
+
+class CookCache:
+    """Cache of the results extracted from the QM output files (see ``Cooker.extract_from_file()``), stored in an h5
+    file. A file is considered unchanged if its size and modification time are the same.
 
-        real_fields = [0] * (3 * len(geometry))
+    The cache is only valid for a given recipe: if the recipe changes, the cache is emptied.
 
-        for index, a in enumerate(deformed_geometry):
-            for i in range(3):
-                diff_value = (a.position[i] - geometry[index].position[i]) / quantities.AuToAngstrom
-                real_fields[index * 3 + i] = 0 if math.fabs(diff_value) < threshold else diff_value
+    :param recipe: a recipe
+    :type recipe: nachos.core.files.Recipe
+    """
+
+    file_type = 'NACHOS_CC'
+    version = 1
+
+    def __init__(self, recipe):
+        self.recipe = recipe
+        self.entries = {}
+
+    def recipe_data(self):
+        """Get the data of the recipe that should not change for the cache to be valid
+
+        :rtype: str
+        """
+
+        return json.dumps(self.recipe.recipe, sort_keys=True, default=str)
+
+    @staticmethod
+    def stat(path):
+        """Get the information about a file which should not change for its cached results to be valid
+
+        :param path: path to the file
+        :type path: str
+        :rtype: tuple
+        """
+
+        s = os.stat(path)
+        return os.path.abspath(path), s.st_size, s.st_mtime_ns
+
+    def get(self, path):
+        """Get the results extracted from a file, if it did not change
+
+        :param path: path to the file
+        :type path: str
+        :return: what was obtained and the results (or ``None`` if that was not a chemistry file)
+        :rtype: tuple
+        :raise KeyError: if the file is not in the cache, or if it changed
+        """
+
+        key, size, mtime = CookCache.stat(path)
+        entry = self.entries[key]
+
+        if entry[0] != size or entry[1] != mtime:
+            raise KeyError(path)
+
+        return entry[2]
+
+    def set(self, path, extracted):
+        """Set the results extracted from a file
+
+        :param path: path to the file
+        :type path: str
+        :param extracted: what was obtained and the results (or ``None`` if that was not a chemistry file)
+        :type extracted: tuple
+        """
+
+        key, size, mtime = CookCache.stat(path)
+        self.entries[key] = (size, mtime, extracted)
+
+    def write(self, path):
+        """Write in h5 file
+
+        :param path: path to the file
+        :type path: str
+        """
+
+        dof = 3 * len(self.recipe.geometry)
+
+        with h5py.File(path, 'w') as f:
+            dset = f.create_dataset('version', (1,), dtype='i', data=self.version)
+            dset.attrs['type'] = self.file_type
+            dset.attrs['recipe'] = self.recipe_data()
+
+            files_group = f.create_group('files')
+
+            for i, (key, (size, mtime, extracted)) in enumerate(self.entries.items()):
+                subgroup = files_group.create_group(str(i))
+                subgroup.attrs['path'] = key
+                subgroup.attrs['size'] = size
+                subgroup.attrs['mtime'] = mtime
+
+                if extracted is None:
+                    subgroup.attrs['skipped'] = True
+                    continue
+
+                obtained, results = extracted
+                subgroup.attrs['skipped'] = False
+                subgroup.attrs['obtained'] = json.dumps(obtained)
+                subgroup.attrs['results'] = json.dumps(
+                    [[list(fields), derivative, allow_replace] for fields, derivative, _, allow_replace in results])
+
+                chemistry_datafile.ChemistryDataFile.write_derivatives_in_group(
+                    subgroup.create_group('derivatives'),
+                    dict((derivative, value) for _, derivative, value, _ in results),
+                    dof)
+
+    def read(self, path):
+        """Read in h5 file. If the file is not a cache for this recipe, nothing is read.
+
+        :param path: path to the file
+        :type path: str
+        """
+
+        dof = 3 * len(self.recipe.geometry)
+        self.entries = {}
+
+        with h5py.File(path, 'r') as f:
+            if 'version' not in f or f['version'][0] != self.version:
+                raise BadCooking('{} is not a cache (or version > 1)'.format(path))
+
+            if 'type' not in f['version'].attrs or f['version'].attrs['type'] != self.file_type:
+                raise BadCooking('type of {} is incorrect'.format(path))
+
+            if f['version'].attrs.get('recipe', '') != self.recipe_data():
+                return
+
+            for subgroup in f['files'].values():
+                extracted = None
+
+                if not subgroup.attrs['skipped']:
+                    derivatives_in_file = chemistry_datafile.ChemistryDataFile.read_derivatives_from_group(
+                        subgroup['derivatives'], dof)
+
+                    extracted = (json.loads(subgroup.attrs['obtained']), [
+                        (fields, derivative, derivatives_in_file[derivative], allow_replace)
+                        for fields, derivative, allow_replace in json.loads(subgroup.attrs['results'])])
+
+                self.entries[subgroup.attrs['path']] = (
+                    int(subgroup.attrs['size']), int(subgroup.attrs['mtime']), extracted)
+
+
+_worker_cooker = None
+
+
+def _init_worker(cooker):
+    """Initialize a worker process.
+
+    :param cooker: the cooker
+    :type cooker: Cooker
+    """
+
+    global _worker_cooker
+    _worker_cooker = cooker
+
+
+def _extract_in_worker(path, fields=None):
+    """Extract the results of a file, in a worker process.
+
+    :param path: path to the file
+    :type path: str
+    :param fields: fields of the file, if known
+    :type fields: list
+    :rtype: tuple
+    """
 
-        return real_fields
+    return _worker_cooker.extract_from_path(path, fields)
@@ -60,6 +60,7 @@ class Recipe:
         self.directory = directory
         self.max_differentiation = 1
         self.dof = 0
+        self._field_index = None
         self.recipe.update(**DEFAULT_RECIPE)
         self.recipe.update(**kwargs)
         self._update(kwargs)
@@ -221,6 +222,52 @@ class Recipe:
 
         return bases
 
+    def field_index(self):
+        """Get the index of the fields needed by the recipe: gives the row (position in ``fields_needed()``) and the
+        level of each fields (as a tuple).
+
+        It is computed once, and computed again only if the parameters that define the fields change.
+
+        :rtype: dict
+        """
+
+        key = self._fields_key()
+
+        if self._field_index is None or self._field_index[0] != key:
+            self._field_index = (key, dict(
+                (fields, (row, level))
+                for row, (fields, level) in enumerate(preparing.generate_fields_needed(*key).items())))
+
+        return self._field_index[1]
+
+    def number_of_fields(self):
+        """Get the number of fields needed by the recipe (thus, the number of calculations to perform), without
+        generating them if it was not done already
+
+        :rtype: int
+        """
+
+        if self._field_index is not None and self._field_index[0] == self._fields_key():
+            return len(self._field_index[1])
+
+        return preparing.count_fields_needed(*self._fields_key())
+
+    def _fields_key(self):
+        """Get the parameters that define the fields needed by the recipe
+
+        :rtype: tuple
+        """
+
+        return self['type'], self.dof, self['k_max'], self.max_differentiation, self['accuracy_level']
+
+    def fields_needed(self):
+        """Get the fields needed by the recipe, with their level (see ``field_index()``)
+
+        :rtype: list
+        """
+
+        return [(list(fields), level) for fields, (row, level) in self.field_index().items()]
+
     def maximum_derivatives(self):
         """Get the different derivatives performed by the recipe
 
@@ -249,6 +296,77 @@ class BadResult(Exception):
     pass
 
 
+class CompiledResults:
+    """Compiled view of the results: one contiguous array per derivative (and frequency), whose first axis is the
+    "field index" (the row of a given field is in ``rows``).
+
+    Fields for which a derivative is not available are marked as such in ``available``.
+
+    :param results: results, per fields
+    :type results: dict
+    """
+
+    def __init__(self, results):
+        self.rows = dict((fields, i) for i, fields in enumerate(results))
+        self.electrical = {}
+        self.arrays = {}
+        self.available = {}
+
+        for fields, i in self.rows.items():
+            for b_repr, value in results[fields].items():
+                self.electrical[b_repr] = type(value) is dict
+                tensors = value.items() if type(value) is dict else [(None, value)]
+
+                for frequency, tensor in tensors:
+                    key = (b_repr, frequency)
+                    if key not in self.arrays:
+                        self.arrays[key] = numpy.zeros((len(self.rows), ) + numpy.shape(tensor.components))
+                        self.available[key] = numpy.zeros(len(self.rows), dtype=bool)
+
+                    self.arrays[key][i] = tensor.components
+                    self.available[key][i] = True
+
+    def error(self, fields, b_repr, frequency):
+        """Get the error corresponding to a value that is not available
+
+        :param fields: the fields
+        :type fields: tuple
+        :param b_repr: representation of the derivative
+        :type b_repr: str
+        :param frequency: frequency
+        :type frequency: str|float
+        :rtype: BadResult
+        """
+
+        if fields not in self.rows:
+            return BadResult('fields {} is not available'.format(list(fields)))
+
+        row = self.rows[fields]
+        if not any(self.available[k][row] for k in self.arrays if k[0] == b_repr):
+            return BadResult('derivative {} is not available for {}'.format(b_repr, list(fields)))
+
+        return BadResult('frequency {} is not available for {} of {}'.format(frequency, b_repr, list(fields)))
+
+    def key(self, b_repr, frequency):
+        """Get the key of the array corresponding to a derivative (and frequency, if electrical)
+
+        :param b_repr: representation of the derivative
+        :type b_repr: str
+        :param frequency: frequency
+        :type frequency: str|float
+        :rtype: tuple
+        """
+
+        if b_repr not in self.electrical:
+            raise BadResult('derivative {} is not available'.format(b_repr))
+
+        key = (b_repr, frequency if self.electrical[b_repr] else None)
+        if key not in self.arrays:
+            raise BadResult('frequency {} is not available for {}'.format(frequency, b_repr))
+
+        return key
+
+
 class ComputationalResults:
     """A class to store all the results obtained from the cooking process
 
@@ -268,8 +386,10 @@ class ComputationalResults:
         self.directory = directory
 
         self.results = {}
-        self.fields_needed_by_recipe = preparing.fields_needed_by_recipe(self.recipe)
-        self.fields_needed = [a[0] for a in self.fields_needed_by_recipe]
+        self.field_index = self.recipe.field_index()
+        self.fields_needed_by_recipe = self.recipe.fields_needed()
+
+        self._compiled = None
 
     def add_result(self, fields, derivative, value, allow_replace=False):
         """Add result for a given derivative in given fields
@@ -284,19 +404,31 @@ class ComputationalResults:
         :type allow_replace: bool
         """
 
-        if fields not in self.fields_needed:
-            raise FieldsNotNeeded(fields)
-
         t_fields = tuple(fields)
 
+        if t_fields not in self.field_index:
+            raise FieldsNotNeeded(fields)
+
         if t_fields not in self.results:
             self.results[t_fields] = {}
 
         if derivative not in self.results[t_fields] or allow_replace:
             self.results[t_fields][derivative] = value
+            self._compiled = None
         else:
             raise DerivativeAlreadyDefined(fields, derivative)
 
+    def compiled(self):
+        """Get the compiled view of the results (built at first call, and after each change of the results)
+
+        :rtype: CompiledResults
+        """
+
+        if self._compiled is None:
+            self._compiled = CompiledResults(self.results)
+
+        return self._compiled
+
     def check(self):
         """Check that, according to the recipe, everything is present
 
@@ -370,35 +502,69 @@ class ComputationalResults:
             fields_group = f['/fields']
 
             for i in fields_group:
-                fields = [int(a) for a in i.split(',')]
-                if fields in self.fields_needed:
-                    t_fields = tuple(fields)
+                t_fields = tuple(int(a) for a in i.split(','))
+                if t_fields in self.field_index:
                     self.results[t_fields] = chemistry_datafile.ChemistryDataFile.read_derivatives_from_group(
                         fields_group[i], dof)
 
+        self._compiled = None
+
     def tensor_element_access(self, fields, min_field, basis, component, frequency, recipe):
+        compiled = self.compiled()
         t_fields = tuple(fields)
-        if t_fields not in self.results:
-            raise BadResult('fields {} is not available'.format(fields))
-
-        results = self.results[t_fields]
         b_repr = basis.representation()
-        if b_repr not in results:
-            raise BadResult('derivative {} is not available for {}'.format(b_repr, fields))
-
-        results = results[b_repr]
 
-        if derivatives.is_electrical(basis):
-            if frequency not in results:
-                raise BadResult('frequency {} is not available for {} of {}'.format(frequency, b_repr, fields))
-
-            results = results[frequency]
+        row = compiled.rows.get(t_fields)
+        key = (b_repr, frequency if compiled.electrical.get(b_repr, False) else None)
+        if row is None or key not in compiled.arrays or not compiled.available[key][row]:
+            raise compiled.error(t_fields, b_repr, frequency)
 
+        array = compiled.arrays[key]
         if b_repr != '':
-            if len(component) != results.representation.order():
+            if len(component) != array.ndim - 1:
                 raise BadResult('shape does not match for {}'.format(b_repr))
 
-        return results.components[component]
+        return array[row][component]
+
+    def tensors_access(self, fields, basis, frequency=None, components=None):
+        """Get the values of a derivative in many fields at once
+
+        :param fields: list of fields
+        :type fields: list
+        :param basis: the derivative
+        :type basis: qcip_tools.derivatives.Derivative
+        :param frequency: frequency (if electrical)
+        :type frequency: str|float
+        :param components: list of components (if None, the whole tensors are returned)
+        :type components: list
+        :return: an array of shape ``(len(fields), ...)``, where ``...`` is either the shape of the tensors,
+          or ``len(components)``
+        :rtype: numpy.ndarray
+        """
+
+        compiled = self.compiled()
+        key = compiled.key(basis.representation(), frequency)
+
+        rows = numpy.array([compiled.rows.get(tuple(f), -1) for f in fields], dtype=int)
+        available = compiled.available[key][rows] & (rows >= 0)
+
+        if not numpy.all(available):
+            raise compiled.error(tuple(fields[numpy.argmin(available)]), key[0], frequency)
+
+        array = compiled.arrays[key]
+        if components is None:
+            return array[rows]
+
+        flat_indices = numpy.arange(numpy.prod(array.shape[1:], dtype=int)).reshape(array.shape[1:])
+        flat_components = []
+
+        for component in components:
+            index = numpy.ravel(flat_indices[component])
+            if len(index) != 1:
+                raise BadResult('shape does not match for {}'.format(key[0]))
+            flat_components.append(index[0])
+
+        return array.reshape(array.shape[0], -1)[rows[:, numpy.newaxis], flat_components]
 
     @staticmethod
     def get_recipe_check_data(recipe):
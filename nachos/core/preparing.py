@@ -1,6 +1,8 @@
 import copy
+import json
 import math
 import os
+import collections
 
 import numpy
 from qcip_tools import derivatives, derivatives_e, quantities, numerical_differentiation
@@ -9,38 +11,194 @@ from qcip_tools.chemistry_files import gaussian, dalton
 from nachos.core import compute_numerical_derivative_of_tensor
 
 
-def fields_needed_by_recipe(recipe):
+_FIELDS_SEQUENCES = {}
+
+
+def _fields_sequences(diff_type, order, k_max, accuracy_level):
+    """For each pattern of repeated coordinates (e.g. ``(0, 0, 1)`` for :math:`\\partial^3/\\partial x^2\\partial y`) of
+    a differentiation of a given order, get the fields used to compute the corresponding components, in the order in
+    which they are used. The fields are given by their values on the (different) coordinates of the pattern.
+
+    This is done once (per set of parameters) by a dry run on a small space, which contains all the possible
+    patterns (for electrical differentiations, the space of the electric field). A basis with three components is
+    used, so that the fields used for each component of the differentiation are delimited by the return to the first
+    component of the basis.
+
+    :param diff_type: type of differentiation (``F`` or ``G``)
+    :type diff_type: str
+    :param order: order of the differentiation
+    :type order: int
+    :param k_max: number of amplitudes
+    :type k_max: int
+    :param accuracy_level: accuracy level
+    :type accuracy_level: int
+    :return: the fields per pattern, or ``None`` if they cannot be obtained that way
+    :rtype: dict
     """
 
-    :param recipe: recipe
-    :type recipe: nachos.core.files.Recipe
-    :rtype: list
+    key = (diff_type, order, k_max, accuracy_level)
+
+    if key not in _FIELDS_SEQUENCES:
+        size = 3 if diff_type == 'F' else 3 * ((order + 2) // 3)
+        probe_derivative = derivatives.Derivative(diff_type * order, spacial_dof=size)
+        calls = []
+
+        def collect_fields(fields, min_field, basis, component, *args, **kwargs):
+            calls.append((tuple(int(a) for a in fields), component))
+            return .0
+
+        # the value of the minimal field and of the ratio do not change the fields (in units of the minimal field)
+        probe_recipe = {'k_max': k_max, 'min_field': .001, 'ratio': 2, 'accuracy_level': accuracy_level}
+
+        compute_numerical_derivative_of_tensor(
+            probe_recipe, derivatives.Derivative('F'), probe_derivative, collect_fields, dry_run=True)
+
+        # split per component of the differentiation
+        blocks = []
+        previous_component = None
+        for fields, component in calls:
+            if component == calls[0][1]:
+                if previous_component != component:
+                    blocks.append([])
+                blocks[-1].append(fields)
+            previous_component = component
+
+        d_coos = list(probe_derivative.smart_iterator())
+        sequences = {}
+
+        if len(blocks) == len(d_coos):
+            for d_coo, block in zip(d_coos, blocks):
+                d_coo = d_coo if type(d_coo) is tuple else (d_coo, )
+                coordinates = sorted(set(d_coo))
+                pattern = tuple(coordinates.index(c) for c in d_coo)
+
+                if any(f[i] != 0 for f in block for i in range(size) if i not in coordinates):
+                    sequences = None
+                    break
+
+                sequence = [tuple(f[c] for c in coordinates) for f in block]
+                if sequences.setdefault(pattern, sequence) != sequence:
+                    sequences = None
+                    break
+        else:
+            sequences = None
+
+        _FIELDS_SEQUENCES[key] = sequences
+
+    return _FIELDS_SEQUENCES[key]
+
+
+def generate_fields_needed(diff_type, dof, k_max, max_differentiation, accuracy_level):
+    """Generate the fields needed to differentiate up to ``max_differentiation``, with their level (the smallest order
+    of differentiation that needs them). The zero field is the first one, and the others are given in the order in
+    which they are used by the differentiations.
+
+    The fields used by a component only depend on its pattern of repeated coordinates, so that they are obtained once
+    (see ``_fields_sequences()``) and then placed on the coordinates of each component. If they cannot be obtained
+    that way, a dry run of the differentiation is performed.
+
+    :param diff_type: type of differentiation (``F`` or ``G``)
+    :type diff_type: str
+    :param dof: number of degrees of freedom (for geometrical differentiation)
+    :type dof: int
+    :param k_max: number of amplitudes
+    :type k_max: int
+    :param max_differentiation: maximum order of differentiation
+    :type max_differentiation: int
+    :param accuracy_level: accuracy level
+    :type accuracy_level: int
+    :rtype: collections.OrderedDict
+    """
+
+    size = 3 if diff_type == 'F' else dof
+    fields_needed = collections.OrderedDict()
+    fields_needed[(0, ) * size] = 1  # with zero field
+
+    for order in range(1, max_differentiation + 1):
+        diff_derivative = derivatives.Derivative(diff_type * order, spacial_dof=dof)
+        sequences = _fields_sequences(diff_type, order, k_max, accuracy_level)
+
+        if sequences is None:
+            def collect_fields(fields, *args, **kwargs):
+                f = tuple(int(a) for a in fields)
+                if f not in fields_needed:
+                    fields_needed[f] = order
+                return .0
+
+            probe_recipe = {'k_max': k_max, 'min_field': .001, 'ratio': 2, 'accuracy_level': accuracy_level}
+            compute_numerical_derivative_of_tensor(
+                probe_recipe, derivatives.Derivative(''), diff_derivative, collect_fields, dry_run=True)
+            continue
+
+        for d_coo in diff_derivative.smart_iterator():
+            d_coo = d_coo if type(d_coo) is tuple else (d_coo, )
+            coordinates = sorted(set(d_coo))
+
+            for values in sequences[tuple(coordinates.index(c) for c in d_coo)]:
+                f = [0] * size
+                for c, v in zip(coordinates, values):
+                    f[c] = v
+
+                t_fields = tuple(f)
+                if t_fields not in fields_needed:
+                    fields_needed[t_fields] = order
+
+    return fields_needed
+
+
+def count_fields_needed(diff_type, dof, k_max, max_differentiation, accuracy_level):
+    """Count the fields needed to differentiate up to ``max_differentiation`` (and thus the number of calculations),
+    without generating them: the number of ways to place the values of the fields of each pattern of repeated
+    coordinates (see ``_fields_sequences()``) on the coordinates is counted.
+    Note that if these values cannot be obtained for a pattern, the fields are generated (and then counted).
+
+    :param diff_type: type of differentiation (``F`` or ``G``)
+    :type diff_type: str
+    :param dof: number of degrees of freedom (for geometrical differentiation)
+    :type dof: int
+    :param k_max: number of amplitudes
+    :type k_max: int
+    :param max_differentiation: maximum order of differentiation
+    :type max_differentiation: int
+    :param accuracy_level: accuracy level
+    :type accuracy_level: int
+    :rtype: int
     """
 
-    diffs = recipe.maximum_derivatives()
+    size = 3 if diff_type == 'F' else dof
+    all_values = set()
 
-    fields_needed = [
-        [0] * (3 if recipe['type'] == 'F' else recipe.dof)  # with zero field
-    ]
+    for order in range(1, max_differentiation + 1):
+        sequences = _fields_sequences(diff_type, order, k_max, accuracy_level)
+        if sequences is None:
+            return len(generate_fields_needed(diff_type, dof, k_max, max_differentiation, accuracy_level))
 
-    fields_needed_with_level = [
-        (fields_needed[0], 1)
-    ]
+        for sequence in sequences.values():
+            for values in sequence:
+                all_values.add(tuple(sorted(a for a in values if a != 0)))
 
-    def collect_fields(fields, *args, **kwargs):
-        f = list(int(a) for a in fields)
-        if f not in fields_needed:
-            fields_needed.append(f)
-            fields_needed_with_level.append((f, kwargs['level']))
-        return .0
+    # number of different ways to put the values on the coordinates
+    count = 1  # zero field
+    for values in all_values:
+        if 0 < len(values) <= size:
+            arrangements = math.factorial(len(values))
+            for v in set(values):
+                arrangements //= math.factorial(values.count(v))
+            count += math.comb(size, len(values)) * arrangements
 
-    e = derivatives.Derivative('')
+    return count
 
-    for d in diffs:
-        compute_numerical_derivative_of_tensor(
-            recipe, e, d, collect_fields, dry_run=True, level=d.order())
 
-    return fields_needed_with_level
+def fields_needed_by_recipe(recipe):
+    """Get the fields needed by the recipe, with their level (see ``Recipe.fields_needed()``, which computes them
+    once)
+
+    :param recipe: recipe
+    :type recipe: nachos.core.files.Recipe
+    :rtype: list
+    """
+
+    return recipe.fields_needed()
 
 
 class BadPreparation(Exception):
@@ -95,6 +253,71 @@ $end
 """
 
 
+class Manifest:
+    """Manifest of the inputs created by the preparer, with the fields to which they correspond and the names of the
+    output files which are expected out of them, so that the cooker does not have to get back the fields from the
+    outputs. It is stored in a JSON file.
+    """
+
+    file_type = 'NACHOS_MANIFEST'
+    version = 1
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, fields, level, bases, inputs, outputs):
+        """Add an entry
+
+        :param fields: the fields
+        :type fields: list
+        :param level: level of the fields
+        :type level: int
+        :param bases: the bases that are computed
+        :type bases: list of str
+        :param inputs: name of the input files
+        :type inputs: list of str
+        :param outputs: name of the output files that are expected
+        :type outputs: list of str
+        """
+
+        self.entries.append({
+            'fields': list(fields),
+            'level': level,
+            'bases': list(bases),
+            'inputs': list(inputs),
+            'outputs': list(outputs)
+        })
+
+    def write(self, f):
+        """Write in a file
+
+        :param f: file
+        :type f: file
+        """
+
+        json.dump({'type': self.file_type, 'version': self.version, 'entries': self.entries}, f, indent=1)
+
+    def read(self, f):
+        """Read from a file
+
+        :param f: file
+        :type f: file
+        """
+
+        try:
+            content = json.load(f)
+        except ValueError as e:
+            raise BadPreparation('{} is not a manifest ({})'.format(f.name, str(e)))
+
+        if not isinstance(content, dict) or content.get('type', '') != self.file_type:
+            raise BadPreparation('{} is not a manifest'.format(f.name))
+
+        if content.get('version', 0) != self.version:
+            raise BadPreparation('version of {} is incorrect'.format(f.name))
+
+        self.entries = content['entries']
+
+
 class Preparer:
     """Prepare the input files
 
@@ -109,17 +332,25 @@ class Preparer:
             raise BadPreparation('{} is not a directory'.format(directory))
 
         self.directory = directory
-        self.fields_needed_by_recipe = fields_needed_by_recipe(self.recipe)
+        self.fields_needed_by_recipe = self.recipe.fields_needed()
+        self.manifest = Manifest()
 
     def prepare(self, dry_run=False):
-        """Create the different input files in the directory
+        """Create the different input files in the directory, and the manifest (``nachos_manifest.json``)
 
         :param dry_run: do not create the files
         :type dry_run: bool
         :rtype: list
         """
 
-        return getattr(self, 'prepare_{}_inputs'.format(self.recipe['flavor']))(dry_run=dry_run)
+        self.manifest = Manifest()
+        files_created = getattr(self, 'prepare_{}_inputs'.format(self.recipe['flavor']))(dry_run=dry_run)
+
+        if not dry_run:
+            with open('{}/nachos_manifest.json'.format(self.directory), 'w') as f:
+                self.manifest.write(f)
+
+        return files_created
 
     def prepare_gaussian_inputs(self, dry_run=False):
         """Create inputs for gaussian
@@ -311,6 +542,9 @@ class Preparer:
 
                 files_created.append((
                     fields, list(str(a[0]) for a in bases if derivatives.is_electrical(a[0])), file_name))
+                self.manifest.add(
+                    fields, level, files_created[-1][1], [os.path.basename(file_name)],
+                    Preparer.gaussian_outputs(file_name))
                 fi.input_card.pop(-1)
                 fi.other_blocks.pop(0)
 
@@ -330,6 +564,9 @@ class Preparer:
 
                 files_created.append((
                     fields, list(str(a[0]) for a in bases if not derivatives.is_electrical(a[0])), file_name))
+                self.manifest.add(
+                    fields, level, files_created[-1][1], [os.path.basename(file_name)],
+                    Preparer.gaussian_outputs(file_name))
 
         return files_created
 
@@ -653,6 +890,9 @@ class Preparer:
             for bases_repr in bases_reprs:
                 inputs_matching += '{} {}\n'.format(dal_files[bases_repr], mol_path)
                 files_created.append((fields, bases_repr, mol_path))
+                self.manifest.add(
+                    fields, level, bases_repr, [dal_files[bases_repr], mol_path],
+                    Preparer.dalton_outputs(dal_files[bases_repr], mol_path))
 
         if not dry_run:
             with open('{}/inputs_matching.txt'.format(self.directory), 'w') as f:
@@ -709,9 +949,39 @@ class Preparer:
                             *real_fields))
 
             files_created.append((fields, ['energy', ], file_name))
+            self.manifest.add(
+                fields, level, files_created[-1][1], [os.path.basename(file_name)],
+                [os.path.splitext(os.path.basename(file_name))[0] + '.log'])
 
         return files_created
 
+    @staticmethod
+    def gaussian_outputs(input_path):
+        """Get the name of the outputs that are expected from a Gaussian input (the FCHK and the LOG)
+
+        :param input_path: path to the input
+        :type input_path: str
+        :rtype: list of str
+        """
+
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        return [name + '.fchk', name + '.log']
+
+    @staticmethod
+    def dalton_outputs(dal_path, mol_path):
+        """Get the name of the outputs that are expected from a Dalton calculation (the archive and the OUT)
+
+        :param dal_path: path to the dal file
+        :type dal_path: str
+        :param mol_path: path to the mol file
+        :type mol_path: str
+        :rtype: list of str
+        """
+
+        name = '{}_{}'.format(
+            os.path.splitext(os.path.basename(dal_path))[0], os.path.splitext(os.path.basename(mol_path))[0])
+        return [name + '.tar.gz', name + '.out']
+
     @staticmethod
     def deform_geometry(geometry, real_fields, geometry_in_angstrom=True):
         """Create an input for gaussian
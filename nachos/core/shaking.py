@@ -1,7 +1,15 @@
+import collections
 import itertools
+import functools
+import hashlib
 import math
 import sys
+import concurrent.futures
+import multiprocessing.util
+from multiprocessing import shared_memory
+
 import h5py
+import numpy
 
 from nachos.core import fancy_output_derivative
 
@@ -17,6 +25,374 @@ def _merge_dict_of_tensors(b, a):
         b[k].components += a[k].components
 
 
+@functools.lru_cache(maxsize=None)
+def _unique_permutations(pattern):
+    """Get the permutations of ``pattern`` which give different results, as index arrays (the first permutation
+    giving a given result is kept, in the order of ``itertools.permutations()``).
+    Since only equalities matter, it is memoized per pattern.
+
+    :param pattern: a tuple of hashable elements
+    :type pattern: tuple
+    :return: the multiplicity of each unique permutation, and the indices of the permutations
+    :rtype: (float, tuple)
+    """
+
+    unique_elements = set()
+    indices = []
+
+    for permutation in itertools.permutations(range(len(pattern))):
+        permuted = tuple(pattern[i] for i in permutation)
+        if permuted not in unique_elements:
+            unique_elements.add(permuted)
+            indices.append(permutation)
+
+    return math.factorial(len(pattern)) / len(indices), tuple(indices)
+
+
+@functools.lru_cache(maxsize=4096)
+def _iterator(coordinates, input_fields):
+    """Memoized version of :meth:`Shaker.get_iterator`.
+
+    :param coordinates: coordinates
+    :type coordinates: tuple
+    :param input_fields: the input fields
+    :type input_fields: tuple
+    :rtype: (float, tuple)
+    """
+
+    shuflable = [(coordinates[0], -sum(input_fields))]
+    for i in range(1, len(coordinates)):
+        shuflable.append((coordinates[i], input_fields[i - 1]))
+
+    # only equalities between (coordinate, field) pairs matter, so the permutations are computed per pattern
+    multiplier, indices = _unique_permutations(tuple(shuflable.index(e) for e in shuflable))
+
+    return multiplier, tuple(tuple(shuflable[i] for i in permutation) for permutation in indices)
+
+
+@functools.lru_cache(maxsize=None)
+def _fields_permutations(fields):
+    """Group all the permutations of ``fields`` by the permuted fields they lead to. For each of them, the inverse
+    permutations (to use with ``transpose()``) are given.
+
+    :param fields: the fields
+    :type fields: tuple
+    :rtype: tuple
+    """
+
+    groups = {}
+
+    for permutation in itertools.permutations(range(len(fields))):
+        permuted_fields = tuple(fields[i] for i in permutation)
+        if permuted_fields not in groups:
+            groups[permuted_fields] = []
+
+        groups[permuted_fields].append(tuple(numpy.argsort(permutation)))
+
+    return tuple((permuted_fields, tuple(inverses)) for permuted_fields, inverses in groups.items())
+
+
+class _ScreenedCubicForceField:
+    """Screened cubic force field, stored as a list of its non-zero elements, so that the contractions cost
+    :math:`\\mathcal{O}(N_{nz})` rather than :math:`\\mathcal{O}(N^3)`.
+
+    :param t_nnn: ``NNN`` components (symmetric)
+    :type t_nnn: numpy.ndarray
+    """
+
+    def __init__(self, t_nnn):
+        self.n = t_nnn.shape[0]
+        self.a, self.b, self.c = numpy.nonzero(t_nnn)
+        self.values = t_nnn[self.a, self.b, self.c]
+
+        # elements are sorted by (a, b), so that the contraction over c is a reduction over consecutive elements
+        ab = self.a * self.n + self.b
+        self.starts = numpy.flatnonzero(numpy.r_[True, ab[1:] != ab[:-1]]) if ab.size > 0 else ab
+        self.ab = ab[self.starts]
+
+        diagonal = self.a == self.b
+        self.diagonal_a = self.a[diagonal]
+        self.diagonal_c = self.c[diagonal]
+        self.diagonal_values = self.values[diagonal]
+
+    @property
+    def nbytes(self):
+        return sum(x.nbytes for x in (
+            self.a, self.b, self.c, self.values, self.starts, self.ab,
+            self.diagonal_a, self.diagonal_c, self.diagonal_values))
+
+    def contract(self, u):
+        """Compute :math:`\\sum_c F_{abc}\\,u_{c\\ldots}`
+
+        :param u: tensor of which the first axis runs over the modes
+        :type u: numpy.ndarray
+        :return: a tensor, with axes ``a``, ``b`` and then the other ones of ``u``
+        :rtype: numpy.ndarray
+        """
+
+        u_ = u.reshape((self.n, -1))
+        values = numpy.zeros((self.n * self.n, u_.shape[1]))
+
+        if self.values.size > 0:
+            values[self.ab] = numpy.add.reduceat(self.values[:, numpy.newaxis] * u_[self.c], self.starts, axis=0)
+
+        return values.reshape((self.n, self.n) + u.shape[1:])
+
+    def trace(self, w):
+        """Compute :math:`\\sum_a F_{aab}\\,w_a`
+
+        :param w: vector over the modes
+        :type w: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        return numpy.bincount(
+            self.diagonal_c, weights=self.diagonal_values * w[self.diagonal_a], minlength=self.n)
+
+
+class _ShiftedCubicForceField:
+    """Cubic force field to which the same value is added to all the elements, without storing it (see
+    :meth:`Shaker.screening_bound`).
+
+    :param t_nnn: ``NNN`` components
+    :type t_nnn: numpy.ndarray|_ScreenedCubicForceField
+    :param shift: the value
+    :type shift: float
+    """
+
+    def __init__(self, t_nnn, shift):
+        self.t_nnn = t_nnn
+        self.shift = shift
+
+    def contract(self, u):
+        """Compute :math:`\\sum_c F_{abc}\\,u_{c\\ldots}`
+
+        :param u: tensor of which the first axis runs over the modes
+        :type u: numpy.ndarray
+        :return: a tensor, with axes ``a``, ``b`` and then the other ones of ``u``
+        :rtype: numpy.ndarray
+        """
+
+        return _contract_nnn(self.t_nnn, u) + self.shift * numpy.sum(u, axis=0)
+
+    def trace(self, w):
+        """Compute :math:`\\sum_a F_{aab}\\,w_a`
+
+        :param w: vector over the modes
+        :type w: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        return _trace_nnn(self.t_nnn, w) + self.shift * numpy.sum(w)
+
+
+def _contract_nnn(t_nnn, u):
+    """Compute :math:`\\sum_c F_{abc}\\,u_{c\\ldots}`, for a dense, screened or shifted cubic force field.
+
+    :param t_nnn: ``NNN`` components
+    :type t_nnn: numpy.ndarray|_ScreenedCubicForceField|_ShiftedCubicForceField
+    :param u: tensor of which the first axis runs over the modes
+    :type u: numpy.ndarray
+    :rtype: numpy.ndarray
+    """
+
+    if isinstance(t_nnn, (_ScreenedCubicForceField, _ShiftedCubicForceField)):
+        return t_nnn.contract(u)
+
+    return numpy.tensordot(t_nnn, u, axes=(2, 0))
+
+
+def _trace_nnn(t_nnn, w):
+    """Compute :math:`\\sum_a F_{aab}\\,w_a`, for a dense, screened or shifted cubic force field.
+
+    :param t_nnn: ``NNN`` components
+    :type t_nnn: numpy.ndarray|_ScreenedCubicForceField|_ShiftedCubicForceField
+    :param w: vector over the modes
+    :type w: numpy.ndarray
+    :rtype: numpy.ndarray
+    """
+
+    if isinstance(t_nnn, (_ScreenedCubicForceField, _ShiftedCubicForceField)):
+        return t_nnn.trace(w)
+
+    return numpy.einsum('aab,a->b', t_nnn, w)
+
+
+def _split_in_chunks(sequence, n):
+    """Split ``sequence`` in (at most) ``n`` contiguous chunks of similar size."""
+
+    n = max(1, min(n, len(sequence)))
+    size, remainder = divmod(len(sequence), n)
+    chunks = []
+    start = 0
+
+    for i in range(n):
+        end = start + size + (1 if i < remainder else 0)
+        chunks.append(list(sequence[start:end]))
+        start = end
+
+    return chunks
+
+
+def _scale_modes(t, s):
+    """Multiply each slice of ``t`` along its first axis (the normal modes) by the corresponding element of ``s``."""
+    return t * s.reshape((-1, ) + (1, ) * (t.ndim - 1))
+
+
+def _scale_modes_per_frequency(t, s, batched=False):
+    """Same as ``_scale_modes()``, for each frequency: ``s`` is of shape ``(frequencies, modes)``, and the result has
+    a leading axis over the frequencies. If ``batched``, ``t`` already has that axis (and its second one runs over the
+    modes)."""
+
+    if batched:
+        return t * s.reshape(s.shape + (1, ) * (t.ndim - 2))
+
+    return t[numpy.newaxis] * s.reshape(s.shape + (1, ) * (t.ndim - 1))
+
+
+def _contract_modes_per_frequency(a, b):
+    """Compute :math:`\\sum_x a_{\\omega x\\ldots}\\,b_{\\omega x\\ldots}` for each frequency :math:`\\omega`
+
+    :param a: tensor with axes over the frequencies, the modes, then the other ones
+    :type a: numpy.ndarray
+    :param b: tensor with axes over the frequencies, the modes, then the other ones
+    :type b: numpy.ndarray
+    :return: a tensor, with axes over the frequencies, then the other ones of ``a`` and ``b``
+    :rtype: numpy.ndarray
+    """
+
+    n_frequencies, n = a.shape[:2]
+    values = numpy.matmul(a.reshape(n_frequencies, n, -1).transpose(0, 2, 1), b.reshape(n_frequencies, n, -1))
+
+    return values.reshape(a.shape[:1] + a.shape[2:] + b.shape[2:])
+
+
+def _frequency_from_string(frequency):
+    """Convert back a frequency stored as a string."""
+
+    try:
+        return float(frequency)
+    except ValueError:
+        return frequency
+
+
+class ModeDecomposition:
+    """Decomposition of a vibrational contribution which is a sum of one term per normal mode (see
+    :meth:`VibrationalContribution.is_additive`) into the parts of each mode, per frequency.
+
+    The contribution for any set of included modes is then the sum of the parts of those modes, so that only the
+    parts of the modes that were never included have to be computed when the list of included modes changes.
+
+    :param fingerprint: fingerprint of the data from which the parts are computed (see :meth:`Shaker.fingerprint`)
+    :type fingerprint: str
+    :param dof: number of normal modes
+    :type dof: int
+    """
+
+    def __init__(self, fingerprint, dof):
+        self.fingerprint = fingerprint
+        self.dof = dof
+
+        self.parts = {}
+        self.available = {}
+
+    def missing(self, frequency, modes):
+        """Get the modes for which the part is not available (yet)
+
+        :param frequency: the frequency
+        :type frequency: float|str
+        :param modes: the modes
+        :type modes: list
+        :rtype: list
+        """
+
+        if frequency not in self.available:
+            return list(modes)
+
+        return [a for a in modes if not self.available[frequency][a]]
+
+    def update(self, frequency, modes, parts):
+        """Set the parts of some modes
+
+        :param frequency: the frequency
+        :type frequency: float|str
+        :param modes: the modes
+        :type modes: list
+        :param parts: the parts, of shape ``(len(modes), ) + shape of the derivative``
+        :type parts: numpy.ndarray
+        """
+
+        if frequency not in self.parts:
+            self.parts[frequency] = numpy.zeros((self.dof, ) + parts.shape[1:])
+            self.available[frequency] = numpy.zeros(self.dof, dtype=bool)
+
+        self.parts[frequency][modes] = parts
+        self.available[frequency][modes] = True
+
+    def total(self, frequency, modes):
+        """Sum the parts of the given modes
+
+        :param frequency: the frequency
+        :type frequency: float|str
+        :param modes: the modes
+        :type modes: list
+        :rtype: numpy.ndarray
+        """
+
+        if self.missing(frequency, modes):
+            raise BadShaking('part of some modes are not available for {}'.format(frequency))
+
+        return self.parts[frequency][list(modes)].sum(axis=0)
+
+    def write_in_dataset(self, group, name):
+        """Write in an h5py dataset (of shape ``(number of frequencies, dof) + shape of the derivative``)
+
+        :param group: the group
+        :type group: h5py.Group
+        :param name: name of the dataset
+        :type name: str
+        """
+
+        frequencies = list(self.parts)
+
+        if name in group:
+            del group[name]
+
+        dataset = group.create_dataset(name, data=numpy.array([self.parts[f] for f in frequencies]))
+        dataset.attrs['frequencies'] = ','.join(str(f) for f in frequencies)
+        dataset.attrs['fingerprint'] = self.fingerprint
+        dataset.attrs['available'] = numpy.array([self.available[f] for f in frequencies], dtype='i1')
+
+    @staticmethod
+    def read_from_dataset(dataset):
+        """Read from an h5py dataset (see :meth:`write_in_dataset`)
+
+        :param dataset: the dataset
+        :type dataset: h5py.Dataset
+        :rtype: ModeDecomposition
+        """
+
+        for k in ('frequencies', 'fingerprint', 'available'):
+            if k not in dataset.attrs:
+                raise ValueError('no {} field for the decomposition in {}'.format(k, dataset.name))
+
+        data = dataset[()]
+        decomposition = ModeDecomposition(dataset.attrs['fingerprint'], data.shape[1])
+
+        frequencies = dataset.attrs['frequencies'].split(',')
+        available = numpy.asarray(dataset.attrs['available'], dtype=bool)
+
+        if len(frequencies) != data.shape[0] or available.shape != data.shape[:2]:
+            raise ValueError('inconsistent decomposition in {}'.format(dataset.name))
+
+        for i, f in enumerate(frequencies):
+            frequency = _frequency_from_string(f)
+            decomposition.parts[frequency] = data[i]
+            decomposition.available[frequency] = available[i]
+
+        return decomposition
+
+
 class VibrationalContributionsData:
     """Store the different vibrational contributions for a given derivative
 
@@ -42,13 +418,17 @@ class VibrationalContributionsData:
 
         self.total_vibrational = {}
 
-    def add_contribution(self, vc, values):
+        self.per_mode = {}
+
+    def add_contribution(self, vc, values, decomposition=None):
         """add a contribution
 
         :param vc: vibrational contribution
         :type vc: VibrationalContribution
         :param values: values (per frequencies)
         :type values: dict
+        :param decomposition: eventual decomposition of the contribution per mode
+        :type decomposition: ModeDecomposition
         """
 
         t = 'zpva' if vc.zpva else 'pv'
@@ -72,6 +452,9 @@ class VibrationalContributionsData:
         self.per_type[t].append(vc)
         self.vibrational_contributions[vc.to_string()] = values
 
+        if decomposition is not None:
+            self.per_mode[vc.to_string()] = decomposition
+
         if vc.zpva:
             _merge_dict_of_tensors(self.total_zpva, values)
         else:
@@ -103,6 +486,11 @@ class VibrationalContributionsData:
         if pv_contribs:
             group.attrs['pv_contributions'] = ','.join(pv_contribs)
 
+        if self.per_mode:
+            per_mode_group = group['per_mode'] if 'per_mode' in group else group.create_group('per_mode')
+            for k in self.per_mode:
+                self.per_mode[k].write_in_dataset(per_mode_group, k)
+
     def read_from_group(self, group):
         zpva_contribs = []
         pv_contribs = []
@@ -120,7 +508,12 @@ class VibrationalContributionsData:
 
             vc = VibrationalContribution.from_representation(c)
             values = chemistry_datafile.ChemistryDataFile.read_derivative_from_dataset(group[c], self.derivative)
-            self.add_contribution(vc, values)
+
+            decomposition = None
+            if 'per_mode' in group and c in group['per_mode']:
+                decomposition = ModeDecomposition.read_from_dataset(group['per_mode'][c])
+
+            self.add_contribution(vc, values, decomposition)
 
     def sort_per_type_and_order(self):
         """Group vibrational contributions together.
@@ -212,6 +605,143 @@ def load_vibrational_contributions(path, spacial_dof):
     return v_contributions
 
 
+class DispersionCurves:
+    """Store the pure vibrational contributions to a given (dynamic) derivative on a grid of frequencies, as one
+    array per contribution
+
+    :param derivative: the derivative
+    :type derivative: qcip_tools.derivatives.Derivative
+    :param grid: the frequencies (in atomic units)
+    :type grid: numpy.ndarray|list
+    """
+
+    def __init__(self, derivative, grid):
+        if derivatives.is_geometrical(derivative):
+            raise ValueError('vibrational contributions only to electrical derivatives')
+
+        self.derivative = derivative
+        self.grid = numpy.asarray(grid, dtype=float)
+
+        self.curves = {}
+        self.per_type = {'pv': []}
+        self.total_pv = numpy.zeros((len(self.grid), ) + (3, ) * derivative.order())
+
+    def add_contribution(self, vc, values):
+        """add a contribution
+
+        :param vc: vibrational contribution
+        :type vc: VibrationalContribution
+        :param values: values, of shape ``(len(grid), ) + shape of the derivative``
+        :type values: numpy.ndarray
+        """
+
+        if vc.zpva:
+            raise ValueError('{} is not a pure vibrational contribution'.format(vc.to_string()))
+
+        if vc in self.per_type['pv']:
+            raise ValueError('{} already defined for {}'.format(vc.to_string(), self.derivative))
+
+        if values.shape != self.total_pv.shape:
+            raise ValueError('{} does not match the grid for {}'.format(vc.to_string(), self.derivative))
+
+        self.per_type['pv'].append(vc)
+        self.curves[vc.to_string()] = values
+        self.total_pv += values
+
+    def write_in_group(self, group):
+        """Write in an h5py group (the grid and one dataset per contribution)
+
+        :param group: the group
+        :type group: h5py.Group
+        """
+
+        group.create_dataset('frequencies', data=self.grid)
+
+        for k in self.curves:
+            group.create_dataset(k, data=self.curves[k])
+
+        group.attrs['pv_contributions'] = ','.join(p.to_string() for p in self.per_type['pv'])
+
+    def read_from_group(self, group):
+        if 'pv_contributions' not in group.attrs or not group.attrs['pv_contributions']:
+            return
+
+        for c in group.attrs['pv_contributions'].split(','):
+            if c not in group:
+                raise ValueError('{} not found in {}'.format(c, self.derivative))
+
+            self.add_contribution(VibrationalContribution.from_representation(c), group[c][()])
+
+
+def save_dispersion_curves(path, curves):
+    """Save the dispersion curves in an h5file (replacing the previous ones for the same derivatives)
+
+    :param path: path to the h5 file
+    :type path: str
+    :param curves: the dispersion curves
+    :type curves: dict
+    """
+
+    with h5py.File(path, 'a') as f:
+        if '/derivatives/' not in f:
+            f.create_group('derivatives')
+
+        if 'dispersion_curves' not in f['derivatives']:
+            curves_group = f['derivatives'].create_group('dispersion_curves')
+        else:
+            curves_group = f['derivatives']['dispersion_curves']
+
+        derivatives_available = \
+            curves_group.attrs['derivatives_available'].split(',') if 'derivatives_available' in curves_group.attrs \
+            else []
+
+        for k in curves:
+            if k in curves_group:
+                del curves_group[k]
+            else:
+                derivatives_available.append(k)
+
+            curves[k].write_in_group(curves_group.create_group(k))
+
+        curves_group.attrs['derivatives_available'] = ','.join(derivatives_available)
+
+
+def load_dispersion_curves(path):
+    """Load the dispersion curves from an h5file
+
+    :param path: path to the h5 file
+    :type path: str
+    :rtype: dict
+    """
+
+    curves = {}
+
+    with h5py.File(path, 'r') as f:
+        if '/derivatives/dispersion_curves' not in f:
+            return curves
+
+        g = f['derivatives']['dispersion_curves']
+        if 'derivatives_available' not in g.attrs:
+            raise BadShaking('no derivative available field!')
+
+        for derivative in g.attrs['derivatives_available'].split(','):
+            if derivative not in g or 'frequencies' not in g[derivative]:
+                raise BadShaking('{} is not available'.format(derivative))
+
+            try:
+                d = derivatives.Derivative(derivative)
+            except derivatives.RepresentationError:
+                raise BadShaking('wrong derivative {}'.format(derivative))
+
+            try:
+                curves[derivative] = DispersionCurves(d, g[derivative]['frequencies'][()])
+                curves[derivative].read_from_group(g[derivative])
+            except ValueError as e:
+                raise BadShaking('error while reading {}: {}'.format(derivative, str(e)))
+
+    return curves
+
+
 class BadShaking(Exception):
     pass
 
@@ -221,6 +751,21 @@ class DerivativeNotAvailable(BadShaking):
         super().__init__('Derivative not available: {} @ {}'.format(representation, frequency))
 
 
+#: Engines available to compute pure vibrational contributions: ``loops`` (component per component) or
+#: ``tensor`` (all components at once, through tensor contractions).
+ENGINES = ('loops', 'tensor')
+
+#: When screened, the cubic force field is stored as a list of its elements if the fraction of non-negligible ones is
+#: lower than that (see ``Screening``), since dense contractions are faster otherwise.
+SPARSE_CUBIC_FORCE_FIELD_DENSITY = 0.01
+
+#: Maximum size (in bytes) of the intermediates shared by the vibrational contributions (see ``IntermediateStore``)
+INTERMEDIATES_MAX_SIZE = 512 * 1024 ** 2
+
+#: Maximum number of frequencies handled at once by the contractions of the ``tensor`` engine (the intermediates
+#: grow linearly with it), so that a dense grid of frequencies is computed in a few chunks
+CONTRACTION_MAX_FREQUENCIES = 128
+
 ORDER_TO_REPR = {1: 'µ', 2: 'α', 3: 'β', 4: 'γ'}
 FANCY_EXPONENTS = {0: '⁰', 1: '¹', 2: '²', 3: '³', 4: '⁴'}
 
@@ -311,6 +856,19 @@ class VibrationalContribution:
 
         return needed
 
+    def is_additive(self):
+        """Check if the contribution is a sum of one term per normal mode (the ZPVA :math:`[p]^{1,0}` and the pure
+        vibrational :math:`[\\ldots]^{0,0}` contributions), so that it can be decomposed per mode (see
+        :class:`ModeDecomposition`).
+
+        :rtype: bool
+        """
+
+        if self.zpva:
+            return (self.m, self.n) == (1, 0)
+
+        return self.perturbation_order == 0
+
     def to_string(self, fancy=False):
         if not fancy:
             return '{}__{}_{}'.format('_'.join(d.representation() for d in self.derivatives), self.m, self.n)
@@ -377,45 +935,313 @@ class VibrationalContribution:
         return self.to_string() == other.to_string()
 
 
-class Shaker:
-    """Shaker class to compute vibrational contributions (to electrical derivatives)
+class LambdaCache:
+    """Cache for the :math:`\\lambda` quantities (see :meth:`Shaker.lambda_`), stored as dense arrays over the
+    included modes and the frequencies, so that they are computed once and shared by every contribution.
 
-    :param datafile: input for derivatives
-    :type datafile: qcip_tools.chemistry_files.chemistry_datafile.ChemistryDataFile
+    The cache is invalidated when the list of included modes (or the vibrational frequencies) changes.
+
+    :param mwh: the mass weighted hessian
+    :type mwh: qcip_tools.derivatives_g.MassWeightedHessian
     """
 
-    def __init__(self, datafile):
-        self.datafile = datafile
+    def __init__(self, mwh):
+        self.mwh = mwh
+        self.modes = None
+        self.vibrational_frequencies = None
+        self.tables = {}
 
-        if 'GG' not in self.datafile.derivatives:
-            raise BadShaking('no hessian in datafile')
+    def clear(self):
+        """Empty the cache"""
 
-        self.mwh = derivatives_g.MassWeightedHessian(datafile.molecule, self.datafile.derivatives['GG'])
-        self.available_geometrical_derivatives = {}
-        self.dynamic_frequencies = []
-        self.available_electrical_derivatives = []
+        self.tables = {}
 
-        self.dof = 3 * len(self.datafile.molecule)
+    def _check_validity(self):
+        """Clear the cache if the modes or the vibrational frequencies changed since last time"""
 
-        self.computable_pv = {
-            # polarizability
-            2: [
-                VibrationalContribution(('F', 'F'), 0, 0, self.dof),
-                VibrationalContribution(('F', 'F'), 1, 1, self.dof),
-                VibrationalContribution(('F', 'F'), 2, 0, self.dof),
-                VibrationalContribution(('F', 'F'), 0, 2, self.dof)
-            ],
-            # first hyperpolarizability
-            3: [
-                VibrationalContribution(('F', 'FF'), 0, 0, self.dof),
-                VibrationalContribution(('F', 'FF'), 1, 1, self.dof),
-                VibrationalContribution(('F', 'FF'), 2, 0, self.dof),
-                VibrationalContribution(('F', 'FF'), 0, 2, self.dof),
-                VibrationalContribution(('F', 'F', 'F'), 1, 0, self.dof),
-                VibrationalContribution(('F', 'F', 'F'), 0, 1, self.dof)
-            ],
-            # second hyperpolarizability
-            4: [
+        modes = tuple(self.mwh.included_modes)
+        vibrational_frequencies = tuple(self.mwh.frequencies)
+
+        if modes != self.modes or vibrational_frequencies != self.vibrational_frequencies:
+            self.modes = modes
+            self.vibrational_frequencies = vibrational_frequencies
+            self.clear()
+
+    def included(self, weight, frequencies, order=1):
+        """Get :math:`\\lambda^{\\sigma}_{ab\\ldots}`, with :math:`\\sigma` being ``weight`` times the frequency,
+        for the ``order``-uplets of included modes.
+
+        :param weight: multiple of the frequency
+        :type weight: int
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray|tuple
+        :param order: number of vibrational frequencies that are summed
+        :type order: int
+        :return: an array of shape ``(n, ) * order + (len(frequencies), )``, ``n`` being the number of included modes
+        :rtype: numpy.ndarray
+        """
+
+        self._check_validity()
+
+        key = ('included', weight, order, tuple(frequencies))
+        if key not in self.tables:
+            sd = numpy.array(self.vibrational_frequencies)[list(self.modes)]
+            down = sd
+            for i in range(1, order):
+                sd = numpy.add.outer(sd, down)
+
+            up = weight * numpy.asarray(frequencies, dtype=float)
+            sd = sd[..., numpy.newaxis]
+            self.tables[key] = (sd + up) ** -1 * (sd - up) ** -1
+
+        return self.tables[key]
+
+    def __call__(self, weight, frequencies, order=1):
+        """Get :math:`\\lambda^{\\sigma}_{ab\\ldots}`, with :math:`\\sigma` being ``weight`` times the frequency,
+        indexed by the modes (as in ``mwh.frequencies``). Elements corresponding to modes that are not included are
+        set to zero.
+
+        :param weight: multiple of the frequency
+        :type weight: int
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray|tuple
+        :param order: number of vibrational frequencies that are summed
+        :type order: int
+        :return: an array of shape ``(dof, ) * order + (len(frequencies), )``
+        :rtype: numpy.ndarray
+        """
+
+        self._check_validity()
+
+        key = ('all', weight, order, tuple(frequencies))
+        if key not in self.tables:
+            table = numpy.zeros((len(self.vibrational_frequencies), ) * order + (len(frequencies), ))
+            table[numpy.ix_(*[list(self.modes)] * order + [range(len(frequencies))])] = \
+                self.included(weight, frequencies, order)
+            self.tables[key] = table
+
+        return self.tables[key]
+
+
+class _AbsoluteLambdaCache:
+    """Absolute values of the :math:`\\lambda` quantities of a cache (see :meth:`Shaker.screening_bound`).
+
+    :param lambda_cache: the cache
+    :type lambda_cache: LambdaCache
+    """
+
+    def __init__(self, lambda_cache):
+        self.lambda_cache = lambda_cache
+
+    def included(self, weight, frequencies, order=1):
+        return numpy.abs(self.lambda_cache.included(weight, frequencies, order))
+
+
+class IntermediateStore:
+    """Store for the intermediates shared by the vibrational contributions of a shake (such as the derivatives
+    restricted to the included modes, :math:`\\sum_c F_{bcc}\\,\\omega_c^{-1}` or
+    :math:`\\sum_c F_{abc}\\,\\lambda_c\\,\\tdiff{\\mu_i}{Q_c}`), so that they are computed once.
+
+    An intermediate is identified by a key, which should contain what is needed to distinguish it (the mode subset,
+    the frequency, ...), and by the tensors it is computed from (``sources``, identified by ``id()`` and kept alive
+    as long as the intermediate is stored).
+    The least recently used intermediates are evicted when the total size goes beyond ``max_size``.
+
+    :param max_size: maximum size (in bytes)
+    :type max_size: int
+    """
+
+    def __init__(self, max_size=INTERMEDIATES_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.intermediates = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """Empty the store"""
+
+        self.size = 0
+        self.intermediates = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.intermediates)
+
+    def __call__(self, key, compute, *sources):
+        """Get an intermediate, computed (and stored) if it was not available
+
+        :param key: key of the intermediate
+        :type key: tuple
+        :param compute: function (without arguments) computing the intermediate
+        :type compute: callable
+        :param sources: the tensors from which the intermediate is computed
+        :type sources: numpy.ndarray
+        """
+
+        key = key + tuple(id(source) for source in sources)
+
+        if key in self.intermediates:
+            self.hits += 1
+            self.intermediates.move_to_end(key)
+            return self.intermediates[key][1]
+
+        self.misses += 1
+        value = compute()
+        size = getattr(value, 'nbytes', 0)
+
+        if size <= self.max_size:
+            self.intermediates[key] = (sources, value, size)
+            self.size += size
+
+            while self.size > self.max_size:
+                self.size -= self.intermediates.popitem(last=False)[1][2]
+
+        return value
+
+
+class Screening:
+    """Screening of the anharmonic derivatives (the ones with at least two geometrical derivatives, such as ``NNN``,
+    ``NNF`` or ``NNFF``), so that negligible elements are set to zero:
+
+    + For the cubic force field (``NNN``), each element :math:`F_{abc}` for which :math:`|F_{abc}|` is lower than
+      ``threshold`` is neglected ;
+    + For the electrical derivatives (``NNF``, ``NNFF``, ...), a mask over the :math:`(a,b)` pairs of modes is used:
+      a block is neglected if all its elements are lower (in absolute value) than ``electrical_threshold``.
+
+    The screened derivatives are cached (for a given set of included modes), and what was neglected is recorded in
+    ``neglected``, as ``(number of elements, sum of their absolute values, largest absolute value)`` (among the
+    included modes). An upper bound on the error made on each contribution (see :meth:`Shaker.screening_bound`)
+    may be recorded in ``bounds``, as the largest one among the components and frequencies.
+
+    The screening is only available with the ``tensor`` engine, which skips the zero elements of a sparse enough
+    cubic force field (the ``loops`` engine would still visit all of them).
+
+    A threshold of zero disables the screening.
+
+    :param mwh: the mass weighted hessian
+    :type mwh: qcip_tools.derivatives_g.MassWeightedHessian
+    :param threshold: threshold for the cubic force field
+    :type threshold: float
+    :param electrical_threshold: threshold for the electrical derivatives
+    :type electrical_threshold: float
+    """
+
+    def __init__(self, mwh, threshold=0.0, electrical_threshold=0.0):
+        if threshold < 0 or electrical_threshold < 0:
+            raise BadShaking('screening thresholds should be positive')
+
+        self.mwh = mwh
+        self.threshold = threshold
+        self.electrical_threshold = electrical_threshold
+
+        self.screened = {}
+        self.neglected = {}
+        self.bounds = {}
+
+    @property
+    def active(self):
+        return self.threshold > 0 or self.electrical_threshold > 0
+
+    def clear(self):
+        """Empty the cache"""
+
+        self.screened = {}
+        self.neglected = {}
+        self.bounds = {}
+
+    def __call__(self, representation, tensor):
+        """Get the screened version of a derivative
+
+        :param representation: representation of the derivative
+        :type representation: str
+        :param tensor: its components
+        :type tensor: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        num_N = representation.count('N')
+
+        if num_N < 2:
+            return tensor
+
+        threshold = self.threshold if num_N == len(representation) else self.electrical_threshold
+
+        if threshold <= 0:
+            return tensor
+
+        key = (representation, tuple(self.mwh.included_modes))
+
+        if key not in self.screened:
+            magnitudes = numpy.abs(tensor)
+
+            if num_N == len(representation):
+                mask = magnitudes < threshold
+            else:
+                shape = tensor.shape[:2] + (1, ) * (tensor.ndim - 2)
+                mask = numpy.broadcast_to(
+                    numpy.max(magnitudes.reshape(tensor.shape[:2] + (-1, )), axis=-1).reshape(shape) < threshold,
+                    tensor.shape)
+
+            screened = tensor.copy()
+            screened[mask] = .0
+
+            # a posteriori information, for the included modes
+            included = numpy.ix_(
+                *[self.mwh.included_modes] * num_N + [range(n) for n in tensor.shape[num_N:]])
+            neglected = magnitudes[included][mask[included]]
+            self.neglected[representation] = (
+                int(numpy.count_nonzero(neglected)),
+                float(numpy.sum(neglected)),
+                float(numpy.max(neglected)) if neglected.size > 0 else .0)
+
+            self.screened[key] = screened
+
+        return self.screened[key]
+
+
+class Shaker:
+    """Shaker class to compute vibrational contributions (to electrical derivatives)
+
+    :param datafile: input for derivatives
+    :type datafile: qcip_tools.chemistry_files.chemistry_datafile.ChemistryDataFile
+    """
+
+    def __init__(self, datafile):
+        self.datafile = datafile
+
+        if 'GG' not in self.datafile.derivatives:
+            raise BadShaking('no hessian in datafile')
+
+        self.mwh = derivatives_g.MassWeightedHessian(datafile.molecule, self.datafile.derivatives['GG'])
+        self.available_geometrical_derivatives = {}
+        self.dynamic_frequencies = []
+        self.available_electrical_derivatives = []
+
+        self.dof = 3 * len(self.datafile.molecule)
+        self.lambda_cache = LambdaCache(self.mwh)
+        self.screening = Screening(self.mwh)
+        self.intermediates = IntermediateStore()
+
+        self.computable_pv = {
+            # polarizability
+            2: [
+                VibrationalContribution(('F', 'F'), 0, 0, self.dof),
+                VibrationalContribution(('F', 'F'), 1, 1, self.dof),
+                VibrationalContribution(('F', 'F'), 2, 0, self.dof),
+                VibrationalContribution(('F', 'F'), 0, 2, self.dof)
+            ],
+            # first hyperpolarizability
+            3: [
+                VibrationalContribution(('F', 'FF'), 0, 0, self.dof),
+                VibrationalContribution(('F', 'FF'), 1, 1, self.dof),
+                VibrationalContribution(('F', 'FF'), 2, 0, self.dof),
+                VibrationalContribution(('F', 'FF'), 0, 2, self.dof),
+                VibrationalContribution(('F', 'F', 'F'), 1, 0, self.dof),
+                VibrationalContribution(('F', 'F', 'F'), 0, 1, self.dof)
+            ],
+            # second hyperpolarizability
+            4: [
                 VibrationalContribution(('FF', 'FF'), 0, 0, self.dof),
                 VibrationalContribution(('FF', 'FF'), 1, 1, self.dof),
                 VibrationalContribution(('FF', 'FF'), 2, 0, self.dof),
@@ -528,6 +1354,31 @@ class Shaker:
 
         raise DerivativeNotAvailable(representation, frequency)
 
+    def fingerprint(self, representations):
+        """Compute a fingerprint of the vibrational frequencies and of the components of some derivatives (for all
+        frequencies), to check that data computed from them is still valid.
+
+        :param representations: representations of the derivatives
+        :type representations: list of str
+        :rtype: str
+        """
+
+        h = hashlib.sha1(numpy.asarray(self.mwh.frequencies, dtype=float).tobytes())
+
+        for r in representations:
+            if r not in self.datafile.derivatives:
+                raise DerivativeNotAvailable(r)
+
+            h.update(r.encode())
+            if not derivatives.is_electrical(r):
+                h.update(self.datafile.derivatives[r].components.tobytes())
+            else:
+                for frequency in sorted(self.datafile.derivatives[r], key=str):
+                    h.update(str(frequency).encode())
+                    h.update(self.datafile.derivatives[r][frequency].components.tobytes())
+
+        return h.hexdigest()
+
     @staticmethod
     def lambda_(up, down):
         """Compute the lambda quantity found in the papers of Kirtman and Bishop
@@ -539,35 +1390,31 @@ class Shaker:
              &[(\\omega_x+\\omega_y+\\ldots)-(\\omega_i+\\omega_j+\\ldots)]^{-1}
             \\end{align}
 
-        :param up: upper argument (optical frequencies: :math:`\\omega_{i}`, ...)
-        :type up: float|list|tuple
+        :param up: upper argument (optical frequencies: :math:`\\omega_{i}`, ...), each of them may be an array
+          (one value per frequency)
+        :type up: float|numpy.ndarray|list|tuple
         :param down: down argument (vibrational frequencies: :math:`\\omega_{x}`, ...)
         :type down: float|list|tuple
-        :rtype: float
+        :rtype: float|numpy.ndarray
         """
-        sd = down if type(down) is float else sum(down)
-        su = up if type(up) is float else sum(up)
+        sd = sum(down) if isinstance(down, (list, tuple)) else down
+        su = sum(up) if isinstance(up, (list, tuple)) else up
 
         return (sd + su) ** -1 * (sd - su) ** -1
 
     @staticmethod
     def get_iterator(coordinates, input_fields):
-        """Get the iteration over all possible permutations
+        """Get the iteration over all possible permutations (memoized, so that it is not computed again for each
+        contribution)
 
         :param coordinates: coordinates
         :type coordinates: tuple
         :param input_fields: the input fields
         :type input_fields: tuple
-        :rtype: (int, list)
+        :rtype: (float, tuple)
         """
 
-        shuflable = [(coordinates[0], -sum(input_fields))]
-        for i in range(1, len(coordinates)):
-            shuflable.append((coordinates[i], input_fields[i - 1]))
-
-        unique_elements = set(itertools.permutations(shuflable))
-        return math.factorial(len(coordinates)) / len(unique_elements), unique_elements
-        # return 1, itertools.permutations(shuflable)
+        return _iterator(tuple(coordinates), tuple(input_fields))
 
     def compute_zpva(self, vc, derivative, frequencies):
         """Compute a ZPVA contribution to a given derivative. It does not uses _create_tensors() since it is possible
@@ -590,13 +1437,13 @@ class Shaker:
 
         return getattr(self, '_compute_zpva_{}{}'.format(vc.m, vc.n))(derivative, frequencies)
 
-    def compute_pv(self, vc, derivative, frequencies, limit_anharmonicity_usage=True):
+    def compute_pv(self, vc, derivative, frequencies, limit_anharmonicity_usage=True, engine='loops'):
         """Compute a pure vibrational contribution.
 
         .. note::
 
-            Expect the callback function to be ``'_compute_' + what + '_component'``,
-            and kwargs to looks like ``'t_' + repr``.
+            Expect the callback function to be ``'_compute_' + what + '_component'`` (``loops`` engine) or
+            ``'_contract_' + what`` (``tensor`` engine), and kwargs to looks like ``'t_' + repr``.
 
         :param vc: what to compute
         :type vc: VibrationalContribution
@@ -606,9 +1453,30 @@ class Shaker:
         :type frequencies: list
         :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
         :type limit_anharmonicity_usage: bool
+        :param engine: engine used for the computation (see ``ENGINES``)
+        :type engine: str
         :rtype: dict
         """
 
+        if engine not in ENGINES:
+            raise BadShaking('unknown engine {}'.format(engine))
+
+        self._check_pv(vc, derivative, limit_anharmonicity_usage)
+
+        return self._compute_pv(vc, derivative, frequencies, limit_anharmonicity_usage, engine)
+
+    def _check_pv(self, vc, derivative, limit_anharmonicity_usage=True):
+        """Check that a pure vibrational contribution is computable
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :raise BadShaking: if it is not
+        """
+
         if derivatives.is_geometrical(derivative):
             raise BadShaking('cannot compute vibrational contribution of a geometrical derivative')
 
@@ -618,399 +1486,1740 @@ class Shaker:
         if not self.check_availability(vc, limit_anharmonicity_usage):
             raise BadShaking('unable to compute {}, some derivatives are missing!'.format(vc.to_string()))
 
-        kwargs = {}
-        for n in vc.derivatives_needed(limit_anharmonicity_usage=limit_anharmonicity_usage):
-            r = n.representation()
-            kwargs['t_' + r.lower()] = self.get_tensor(r)
+    def _compute_pv(self, vc, derivative, frequencies, limit_anharmonicity_usage=True, engine='loops'):
+        """Compute a pure vibrational contribution, without any check (see :meth:`compute_pv`)
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: list of frequencies
+        :type frequencies: list
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :param engine: engine used for the computation (see ``ENGINES``)
+        :type engine: str
+        :rtype: dict
+        """
+
+        kwargs = self._pv_kwargs(vc, limit_anharmonicity_usage)
+
+        if engine == 'tensor':
+            return self._create_tensors_by_contraction(
+                derivative, frequencies, '_contract_{}'.format(vc.to_string()), **kwargs)
 
         return self._create_tensors(
             derivative, frequencies, '_compute_{}_component'.format(vc.to_string()), **kwargs)
 
-    def shake(self, only=None, frequencies=None, out=sys.stdout, verbosity_level=0,
-              limit_anharmonicity_usage=True):
-        """Compute the vibrational contributions
+    def _pv_kwargs(self, vc, limit_anharmonicity_usage=True):
+        """Get the (screened) derivatives needed to compute a pure vibrational contribution, as kwargs for the
+        callback functions
 
-        :param only: restrict to the vibrational contribution to certain derivatives
-        :type only: list|tuple of qcip_tools.derivatives.Derivative, int
-        :param frequencies: frequencies (if not available, ZPVA will not be computed for those ones)
-        :type frequencies: list
-        :param out: output if information is needed to be outputed
-        :type out: file
-        :param verbosity_level: how far should we print information
-        :type verbosity_level: int
+        :param vc: what to compute
+        :type vc: VibrationalContribution
         :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
         :type limit_anharmonicity_usage: bool
         :rtype: dict
         """
 
-        # select bases:
-        if not only:
-            bases = [(a, 2) for a in self.available_electrical_derivatives if a.order() > 1]
-        else:
-            bases = []
-            for i, max_level in only:
-                if i not in self.available_electrical_derivatives:
-                    full_F = 'F' * (i.order() - 1)
-                    if full_F not in self.available_electrical_derivatives:
-                        raise BadShaking('it is impossible to compute ZPVA or pv contribution to {}'.format(i))
+        kwargs = {}
+        for n in vc.derivatives_needed(limit_anharmonicity_usage=limit_anharmonicity_usage):
+            r = n.representation()
+            kwargs['t_' + r.lower()] = self.screening(r, self.get_tensor(r))
 
-                bases.append((i, max_level))
+        return kwargs
 
-        bases.sort(key=lambda x: (x[0].order(), x[0].raw_representation().count('D')))
+    def screening_bound(self, vc, derivative, frequencies, limit_anharmonicity_usage=True):
+        """Compute an upper bound on the (absolute) error made by the screening on each component of a pure
+        vibrational contribution (computed with the ``tensor`` engine).
 
-        # select frequencies:
-        frequencies_for_all = []
-        frequencies_for_pv_only = []
+        The contributions are sums of products of derivatives, :math:`\\lambda` and :math:`\\omega^{-1}` with
+        coefficients of the same sign, so that the terms that contain neglected elements are bounded by the same sums
+        computed with absolute values. Thus, the error is lower than the difference between these sums computed with
+        the absolute values of the derivatives, where the neglected elements are replaced by their absolute values
+        (or, for the cubic force field, by the largest of them), and computed with the screened derivatives.
+        This costs about twice the computation of the contribution.
 
-        if not frequencies:
-            frequencies_for_all = frequencies_for_pv_only = self.dynamic_frequencies.copy()
-        else:
-            for f in frequencies:
-                if f in self.dynamic_frequencies:
-                    frequencies_for_all.append(f)
-                frequencies_for_pv_only.append(f)
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: list of frequencies
+        :type frequencies: list
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :return: the bound, of shape ``(len(frequencies), ) + shape of the derivative``, or ``None`` if none of the
+          derivatives needed is screened
+        :rtype: numpy.ndarray
+        """
 
-        vibrational_contributions = {}
+        screened_kwargs = {}
+        unscreened_kwargs = {}
+        screened = False
+        shift = .0
 
-        # compute:
-        for base, max_level in bases:
-            b_repr = base.representation()
-            is_dynamic = 'D' in b_repr
-            computed_pv, computed_ZPVA = False, False
+        for n in vc.derivatives_needed(limit_anharmonicity_usage=limit_anharmonicity_usage):
+            r = n.representation()
+            t = self.get_tensor(r)
+            t_screened = self.screening(r, t)
 
-            if verbosity_level >= 1:
-                out.write('\n**** Computing vibrational contributions of {}:\n'.format(fancy_output_derivative(base)))
+            screened_kwargs['t_' + r.lower()] = numpy.abs(t_screened)
+            unscreened_kwargs['t_' + r.lower()] = numpy.abs(t_screened if r == 'NNN' else t)
 
-            freqs_zpva = frequencies_for_all if is_dynamic else ['static']
-            freqs_pv = frequencies_for_pv_only if is_dynamic else ['static']
+            if t_screened is not t:
+                screened = True
+                if r == 'NNN':
+                    shift = self.screening.neglected[r][2]
 
-            c = VibrationalContributionsData(base, self.dof)
+        if not screened:
+            return None
 
-            to_compute = [VibrationalContribution((base,), 1, 0), VibrationalContribution((base,), 0, 1)]
-            if base.order() in self.computable_pv:
-                to_compute += self.computable_pv[base.order()]
+        callback = '_contract_{}'.format(vc.to_string())
+        frequencies = [derivatives_e.convert_frequency_from_string(f) for f in frequencies]
+        lambda_cache, intermediates = self.lambda_cache, self.intermediates
 
-            for vc in to_compute:
-                if vc.perturbation_order > max_level:
-                    Shaker.display_message(
-                        '{} disabled by request, skipping'.format(vc.to_string(fancy=True)),
-                        out,
-                        verbosity_level)
-                    continue
+        try:
+            self.lambda_cache, self.intermediates = _AbsoluteLambdaCache(lambda_cache), IntermediateStore()
 
-                if self.check_availability(vc, limit_anharmonicity_usage):
-                    Shaker.display_message(
-                        'computing {}{}'.format(
-                            vc.to_string(fancy=True),
-                            ' for all frequencies' if is_dynamic else ''),
-                        out,
-                        verbosity_level)
+            lower = self._sum_over_permutations(
+                derivative, frequencies, callback, **self._restricted_kwargs(screened_kwargs))
 
-                    if vc.zpva:
-                        t = self.compute_zpva(vc, base, freqs_zpva)
-                        computed_ZPVA = True
-                        Shaker.output_tensors(base, vc, t, freqs_zpva, out, verbosity_level)
-                    else:
-                        t = self.compute_pv(vc, base, freqs_pv, limit_anharmonicity_usage)
-                        computed_pv = True
-                        Shaker.output_tensors(base, vc, t, freqs_pv, out, verbosity_level)
+            restricted_kwargs = self._restricted_kwargs(unscreened_kwargs)
+            if shift > 0:
+                restricted_kwargs['t_nnn'] = _ShiftedCubicForceField(restricted_kwargs['t_nnn'], shift)
 
-                    c.add_contribution(vc, t)
-                else:
-                    Shaker.display_message('unable to compute {}, skipping'.format(vc.to_string(fancy=True)))
+            upper = self._sum_over_permutations(derivative, frequencies, callback, **restricted_kwargs)
+        finally:
+            self.lambda_cache, self.intermediates = lambda_cache, intermediates
 
-            # total stuffs
-            if verbosity_level >= 2:
-                if computed_ZPVA:
-                    out.write('\n*** Total ZPVA contribution to {}:\n'.format(fancy_output_derivative(base)))
-                    Shaker.output_tensors(base, None, c.total_zpva, freqs_zpva, out, verbosity_level, 'ZPVA')
-                if computed_pv:
-                    out.write('\n*** Total pv contribution to {}:\n'.format(fancy_output_derivative(base)))
-                    Shaker.output_tensors(base, None, c.total_pv, freqs_pv, out, verbosity_level, 'pv')
+        return numpy.maximum(numpy.abs(upper) - numpy.abs(lower), .0)
 
-            if verbosity_level >= 1 and computed_ZPVA and computed_pv:
-                out.write(
-                    '\n*** Total vibrational contribution (ZPVA+pv) to {}:\n'.format(fancy_output_derivative(base)))
-                Shaker.output_tensors(
-                    base, None, c.total_vibrational, freqs_zpva, out, verbosity_level, 'total vibrational contribution')
+    def compute_pv_on_grid(self, vc, derivative, grid, limit_anharmonicity_usage=True, engine='loops'):
+        """Compute a pure vibrational contribution on a grid of frequencies, as a single array (see
+        :meth:`compute_pv`).
 
-            vibrational_contributions[b_repr] = c
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param grid: the frequencies (in atomic units)
+        :type grid: numpy.ndarray|list
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :param engine: engine used for the computation (see ``ENGINES``)
+        :type engine: str
+        :return: the components, of shape ``(len(grid), ) + shape of the derivative``
+        :rtype: numpy.ndarray
+        """
 
-        return vibrational_contributions
+        if engine not in ENGINES:
+            raise BadShaking('unknown engine {}'.format(engine))
 
-    @staticmethod
+        self._check_pv(vc, derivative, limit_anharmonicity_usage)
+
+        return self._compute_pv_on_grid(vc, derivative, grid, limit_anharmonicity_usage, engine)
+
+    def _compute_pv_on_grid(self, vc, derivative, grid, limit_anharmonicity_usage=True, engine='loops'):
+        """Compute a pure vibrational contribution on a grid of frequencies, without any check (see
+        :meth:`compute_pv_on_grid`)
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param grid: the frequencies (in atomic units)
+        :type grid: numpy.ndarray|list
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :param engine: engine used for the computation (see ``ENGINES``)
+        :type engine: str
+        :rtype: numpy.ndarray
+        """
+
+        kwargs = self._pv_kwargs(vc, limit_anharmonicity_usage)
+        grid = numpy.asarray(grid, dtype=float)
+
+        if engine == 'tensor':
+            return self._create_components_by_contraction(
+                derivative, grid, '_contract_{}'.format(vc.to_string()), **kwargs)
+
+        # the callback functions expect sorted frequencies
+        order = numpy.argsort(grid, kind='stable')
+        components = numpy.empty((len(grid), ) + (3, ) * derivative.order())
+        components[order] = self._create_components(
+            derivative, grid[order], '_compute_{}_component'.format(vc.to_string()), **kwargs)
+
+        return components
+
+    def compute_per_mode(self, vc, derivative, frequencies, modes):
+        """Compute the part of each given mode to a contribution which is a sum of one term per mode (see
+        :meth:`VibrationalContribution.is_additive`). The modes do not have to be included.
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: list of frequencies
+        :type frequencies: list
+        :param modes: the modes
+        :type modes: list
+        :return: the parts, as arrays of shape ``(len(modes), ) + shape of the derivative``, per frequency
+        :rtype: dict
+        """
+
+        self._check_per_mode(vc, derivative)
+
+        modes = numpy.array(modes, dtype=int)
+        omega = numpy.array(self.mwh.frequencies)[modes]
+
+        if vc.zpva:
+            parts = {}
+            b_repr = derivative.representation()
+
+            for frequency in frequencies:
+                t_nnx = self.get_tensor('NN' + b_repr, frequency)
+                parts[frequency] = 1 / 4 * _scale_modes(t_nnx[modes, modes], 1 / omega)
+
+            return parts
+
+        kwargs = {}
+        for n in vc.derivatives_needed():
+            r = n.representation()
+            kwargs['t_' + r.lower()] = self.get_tensor(r)[modes]
+
+        return self._create_decomposition(
+            derivative, frequencies, '_decompose_{}'.format(vc.to_string()), omega, **kwargs)
+
+    def _check_per_mode(self, vc, derivative):
+        """Check that a contribution is decomposable per mode and computable
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :raise BadShaking: if it is not
+        """
+
+        if not vc.is_additive():
+            raise BadShaking('cannot decompose {} per mode'.format(vc.to_string()))
+
+        if vc.zpva:
+            if derivatives.is_geometrical(derivative):
+                raise BadShaking('cannot compute vibrational contribution of a geometrical derivative')
+        else:
+            self._check_pv(vc, derivative)
+
+    def compute_by_modes(self, vc, derivative, frequencies, decomposition=None):
+        """Compute a contribution which is a sum of one term per mode (see
+        :meth:`VibrationalContribution.is_additive`) as the sum of the parts of the included modes.
+
+        The parts available in ``decomposition`` are reused if it was computed from the same data, so that only the
+        parts of the modes that were not included before are computed.
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: list of frequencies
+        :type frequencies: list
+        :param decomposition: a previous decomposition of the contribution
+        :type decomposition: ModeDecomposition
+        :return: the contribution (per frequency) and its (updated) decomposition
+        :rtype: tuple
+        """
+
+        self._check_per_mode(vc, derivative)
+
+        if vc.zpva:
+            needed = ['NN' + derivative.representation()]
+        else:
+            needed = [n.representation() for n in vc.derivatives_needed()]
+
+        fingerprint = self.fingerprint(needed)
+        if decomposition is None or decomposition.fingerprint != fingerprint:
+            decomposition = ModeDecomposition(fingerprint, self.dof)
+
+        modes = list(self.mwh.included_modes)
+        tensors = {}
+
+        for frequency in frequencies:
+            missing = decomposition.missing(frequency, modes)
+            if missing or frequency not in decomposition.parts:
+                decomposition.update(
+                    frequency, missing, self.compute_per_mode(vc, derivative, [frequency], missing)[frequency])
+
+            tensors[frequency] = derivatives.Tensor(
+                representation=derivative, frequency=frequency, components=decomposition.total(frequency, modes))
+
+        return tensors, decomposition
+
+    def shake(self, only=None, frequencies=None, out=sys.stdout, verbosity_level=0,
+              limit_anharmonicity_usage=True, engine='loops', workers=1, screening=0.0, screening_electrical=0.0,
+              previous=None):
+        """Compute the vibrational contributions.
+
+        If the contributions of a previous run are given (even if there is none), the contributions that are a sum of
+        one term per mode (see :meth:`VibrationalContribution.is_additive`) are computed through their decomposition
+        per mode (see :meth:`compute_by_modes`), which is stored with them, and the parts of the modes that were
+        already computed are reused. Otherwise, they are computed as the other ones.
+
+        :param only: restrict to the vibrational contribution to certain derivatives
+        :type only: list|tuple of qcip_tools.derivatives.Derivative, int
+        :param frequencies: frequencies (if not available, ZPVA will not be computed for those ones)
+        :type frequencies: list
+        :param out: output if information is needed to be outputed
+        :type out: file
+        :param verbosity_level: how far should we print information
+        :type verbosity_level: int
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :param engine: engine used to compute the pure vibrational contributions (see ``ENGINES``)
+        :type engine: str
+        :param workers: number of processes used to compute the pure vibrational contributions
+        :type workers: int
+        :param screening: threshold under which the elements of the cubic force field are neglected (see ``Screening``)
+        :type screening: float
+        :param screening_electrical: threshold under which the blocks of the anharmonic electrical derivatives are
+          neglected (see ``Screening``)
+        :type screening_electrical: float
+        :param previous: vibrational contributions of a previous run (see :func:`load_vibrational_contributions`),
+          if the decomposition per mode is requested
+        :type previous: dict
+        :rtype: dict
+        """
+
+        if engine not in ENGINES:
+            raise BadShaking('unknown engine {}'.format(engine))
+
+        if engine != 'tensor' and (screening != 0 or screening_electrical != 0):
+            raise BadShaking('the screening requires the tensor engine')
+
+        if workers < 1:
+            raise BadShaking('number of workers should be larger than 0')
+
+        # λ are shared by all contributions
+        self.lambda_cache.clear()
+
+        # so are the screened derivatives and the intermediates
+        self.screening = Screening(self.mwh, screening, screening_electrical)
+        self.intermediates.clear()
+
+        bases = self._select_bases(only)
+
+        # select frequencies:
+        frequencies_for_all = []
+        frequencies_for_pv_only = []
+
+        if not frequencies:
+            frequencies_for_all = frequencies_for_pv_only = self.dynamic_frequencies.copy()
+        else:
+            for f in frequencies:
+                if f in self.dynamic_frequencies:
+                    frequencies_for_all.append(f)
+                frequencies_for_pv_only.append(f)
+
+        vibrational_contributions = {}
+        by_modes = previous is not None
+
+        # compute pv contributions in parallel, if requested:
+        computed_in_parallel = {}
+
+        if workers > 1:
+            tasks = []
+            for base, max_level in bases:
+                freqs_pv = frequencies_for_pv_only if 'D' in base.representation() else ['static']
+                for vc in self.computable_pv.get(base.order(), []):
+                    if by_modes and vc.is_additive():
+                        continue
+
+                    if vc.perturbation_order <= max_level and self.check_availability(vc, limit_anharmonicity_usage):
+                        self._check_pv(vc, base, limit_anharmonicity_usage)
+                        tasks.append((base, vc, freqs_pv))
+
+            computed_in_parallel = self._compute_pv_in_parallel(tasks, workers, limit_anharmonicity_usage, engine)
+
+        # compute:
+        for base, max_level in bases:
+            b_repr = base.representation()
+            is_dynamic = 'D' in b_repr
+            computed_pv, computed_ZPVA = False, False
+
+            if verbosity_level >= 1:
+                out.write('\n**** Computing vibrational contributions of {}:\n'.format(fancy_output_derivative(base)))
+
+            freqs_zpva = frequencies_for_all if is_dynamic else ['static']
+            freqs_pv = frequencies_for_pv_only if is_dynamic else ['static']
+
+            c = VibrationalContributionsData(base, self.dof)
+
+            to_compute = [VibrationalContribution((base,), 1, 0), VibrationalContribution((base,), 0, 1)]
+            if base.order() in self.computable_pv:
+                to_compute += self.computable_pv[base.order()]
+
+            for vc in to_compute:
+                if vc.perturbation_order > max_level:
+                    Shaker.display_message(
+                        '{} disabled by request, skipping'.format(vc.to_string(fancy=True)),
+                        out,
+                        verbosity_level)
+                    continue
+
+                if self.check_availability(vc, limit_anharmonicity_usage):
+                    Shaker.display_message(
+                        'computing {}{}'.format(
+                            vc.to_string(fancy=True),
+                            ' for all frequencies' if is_dynamic else ''),
+                        out,
+                        verbosity_level)
+
+                    decomposition = None
+
+                    if by_modes and vc.is_additive():
+                        if b_repr in previous:
+                            decomposition = previous[b_repr].per_mode.get(vc.to_string(), None)
+
+                        t, decomposition = self.compute_by_modes(
+                            vc, base, freqs_zpva if vc.zpva else freqs_pv, decomposition)
+                    elif vc.zpva:
+                        t = self.compute_zpva(vc, base, freqs_zpva)
+                    elif (b_repr, vc.to_string()) in computed_in_parallel:
+                        t = computed_in_parallel[b_repr, vc.to_string()]
+                    else:
+                        t = self.compute_pv(vc, base, freqs_pv, limit_anharmonicity_usage, engine=engine)
+
+                    if not vc.zpva and decomposition is None and self.screening.active and verbosity_level >= 1:
+                        self._record_screening_bound(vc, base, freqs_pv, limit_anharmonicity_usage)
+
+                    if vc.zpva:
+                        computed_ZPVA = True
+                        Shaker.output_tensors(base, vc, t, freqs_zpva, out, verbosity_level)
+                    else:
+                        computed_pv = True
+                        Shaker.output_tensors(base, vc, t, freqs_pv, out, verbosity_level)
+
+                    c.add_contribution(vc, t, decomposition)
+                else:
+                    Shaker.display_message('unable to compute {}, skipping'.format(vc.to_string(fancy=True)))
+
+            # total stuffs
+            if verbosity_level >= 2:
+                if computed_ZPVA:
+                    out.write('\n*** Total ZPVA contribution to {}:\n'.format(fancy_output_derivative(base)))
+                    Shaker.output_tensors(base, None, c.total_zpva, freqs_zpva, out, verbosity_level, 'ZPVA')
+                if computed_pv:
+                    out.write('\n*** Total pv contribution to {}:\n'.format(fancy_output_derivative(base)))
+                    Shaker.output_tensors(base, None, c.total_pv, freqs_pv, out, verbosity_level, 'pv')
+
+            if verbosity_level >= 1 and computed_ZPVA and computed_pv:
+                out.write(
+                    '\n*** Total vibrational contribution (ZPVA+pv) to {}:\n'.format(fancy_output_derivative(base)))
+                Shaker.output_tensors(
+                    base, None, c.total_vibrational, freqs_zpva, out, verbosity_level, 'total vibrational contribution')
+
+            vibrational_contributions[b_repr] = c
+
+        if verbosity_level >= 1:
+            self._report_screening(out)
+
+        return vibrational_contributions
+
+    def shake_on_grid(self, grid, only=None, out=sys.stdout, verbosity_level=0, limit_anharmonicity_usage=True,
+                      engine='loops', workers=1, screening=0.0, screening_electrical=0.0):
+        """Compute the pure vibrational contributions to the dynamic derivatives on a (dense) grid of frequencies,
+        to get dispersion curves.
+
+        Each contribution is computed for the whole grid at once, and stored as a single array: the ``loops`` engine
+        treats the frequencies as an array dimension, while the ``tensor`` one computes each permutation of the
+        fields once per chunk of ``CONTRACTION_MAX_FREQUENCIES`` frequencies.
+        The ZPVA contributions, which require the derivatives to be available for each frequency, are not computed.
+
+        :param grid: the frequencies (in atomic units)
+        :type grid: numpy.ndarray|list
+        :param only: restrict to the vibrational contribution to certain derivatives
+        :type only: list|tuple of qcip_tools.derivatives.Derivative, int
+        :param out: output if information is needed to be outputed
+        :type out: file
+        :param verbosity_level: how far should we print information
+        :type verbosity_level: int
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :param engine: engine used to compute the pure vibrational contributions (see ``ENGINES``)
+        :type engine: str
+        :param workers: number of processes used to compute the pure vibrational contributions
+        :type workers: int
+        :param screening: threshold under which the elements of the cubic force field are neglected (see ``Screening``)
+        :type screening: float
+        :param screening_electrical: threshold under which the blocks of the anharmonic electrical derivatives are
+          neglected (see ``Screening``)
+        :type screening_electrical: float
+        :rtype: dict of DispersionCurves
+        """
+
+        if engine not in ENGINES:
+            raise BadShaking('unknown engine {}'.format(engine))
+
+        if engine != 'tensor' and (screening != 0 or screening_electrical != 0):
+            raise BadShaking('the screening requires the tensor engine')
+
+        if workers < 1:
+            raise BadShaking('number of workers should be larger than 0')
+
+        grid = numpy.asarray(grid, dtype=float)
+        if grid.ndim != 1 or len(grid) == 0:
+            raise BadShaking('the grid should be a non-empty list of frequencies')
+
+        self.lambda_cache.clear()
+        self.screening = Screening(self.mwh, screening, screening_electrical)
+        self.intermediates.clear()
+
+        tasks = []
+        for base, max_level in self._select_bases(only):
+            if 'D' not in base.representation():
+                Shaker.display_message(
+                    '{} is static, skipping'.format(fancy_output_derivative(base)), out, verbosity_level)
+                continue
+
+            for vc in self.computable_pv.get(base.order(), []):
+                if vc.perturbation_order > max_level:
+                    continue
+
+                if self.check_availability(vc, limit_anharmonicity_usage):
+                    self._check_pv(vc, base, limit_anharmonicity_usage)
+                    tasks.append((base, vc, grid))
+                else:
+                    Shaker.display_message('unable to compute {}, skipping'.format(vc.to_string(fancy=True)))
+
+        computed_in_parallel = {}
+        if workers > 1:
+            computed_in_parallel = self._compute_pv_in_parallel(
+                tasks, workers, limit_anharmonicity_usage, engine, on_grid=True)
+
+        dispersion_curves = {}
+
+        for base, vc, _ in tasks:
+            b_repr = base.representation()
+            if b_repr not in dispersion_curves:
+                dispersion_curves[b_repr] = DispersionCurves(base, grid)
+
+            Shaker.display_message(
+                'computing {} of {} for {} frequencies'.format(
+                    vc.to_string(fancy=True), fancy_output_derivative(base), len(grid)),
+                out,
+                verbosity_level)
+
+            if (b_repr, vc.to_string()) in computed_in_parallel:
+                values = computed_in_parallel[b_repr, vc.to_string()]
+            else:
+                values = self._compute_pv_on_grid(vc, base, grid, limit_anharmonicity_usage, engine)
+
+            if self.screening.active and verbosity_level >= 1:
+                self._record_screening_bound(vc, base, grid.tolist(), limit_anharmonicity_usage)
+
+            dispersion_curves[b_repr].add_contribution(vc, values)
+
+        if verbosity_level >= 1:
+            self._report_screening(out)
+
+        return dispersion_curves
+
+    def _select_bases(self, only=None):
+        """Select the derivatives for which the vibrational contributions are computed
+
+        :param only: restrict to the vibrational contribution to certain derivatives
+        :type only: list|tuple of qcip_tools.derivatives.Derivative, int
+        :return: list of ``(derivative, max_level)``, sorted
+        :rtype: list
+        """
+
+        if not only:
+            bases = [(a, 2) for a in self.available_electrical_derivatives if a.order() > 1]
+        else:
+            bases = []
+            for i, max_level in only:
+                if i not in self.available_electrical_derivatives:
+                    full_F = 'F' * (i.order() - 1)
+                    if full_F not in self.available_electrical_derivatives:
+                        raise BadShaking('it is impossible to compute ZPVA or pv contribution to {}'.format(i))
+
+                bases.append((i, max_level))
+
+        bases.sort(key=lambda x: (x[0].order(), x[0].raw_representation().count('D')))
+
+        return bases
+
+    def _record_screening_bound(self, vc, derivative, frequencies, limit_anharmonicity_usage=True):
+        """Record the largest bound on the error made by the screening on a contribution (see
+        :meth:`screening_bound`), if it uses screened derivatives
+
+        :param vc: what to compute
+        :type vc: VibrationalContribution
+        :param derivative: representation
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: list of frequencies
+        :type frequencies: list
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        """
+
+        bound = self.screening_bound(vc, derivative, frequencies, limit_anharmonicity_usage)
+        if bound is not None:
+            self.screening.bounds[derivative.representation(), vc.to_string()] = float(numpy.max(bound))
+
+    def _report_screening(self, out=sys.stdout):
+        """Report what was neglected by the screening (if any)
+
+        :param out: output
+        :type out: file
+        """
+
+        if not self.screening.active:
+            return
+
+        out.write('\n**** Screening:\n')
+        for r in sorted(self.screening.neglected):
+            number, total, largest = self.screening.neglected[r]
+            out.write('{}: {} elements neglected (sum of absolute values: {:.3e}, largest: {:.3e})\n'.format(
+                r, number, total, largest))
+
+        for (b_repr, vc_representation), bound in self.screening.bounds.items():
+            out.write('{} of {}: error lower than {:.3e}\n'.format(
+                VibrationalContribution.from_representation(vc_representation).to_string(fancy=True),
+                fancy_output_derivative(derivatives.Derivative(b_repr)),
+                bound))
+
+    def _compute_pv_in_parallel(self, tasks, workers, limit_anharmonicity_usage=True, engine='loops', on_grid=False):
+        """Compute pure vibrational contributions in a pool of processes.
+
+        Each task is split in chunks of frequencies, so that there are at least as much jobs as workers.
+        The derivatives needed are copied once in shared memory, and read from there by the workers (rather than
+        being sent with each job).
+
+        :param tasks: list of ``(derivative, vc, frequencies)``
+        :type tasks: list
+        :param workers: number of processes
+        :type workers: int
+        :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+        :type limit_anharmonicity_usage: bool
+        :param engine: engine used for the computation (see ``ENGINES``)
+        :type engine: str
+        :param on_grid: the frequencies are a grid (see :meth:`compute_pv_on_grid`), the result is then an array
+        :type on_grid: bool
+        :return: the tensors (or arrays), per ``(derivative representation, vc representation)``
+        :rtype: dict
+        """
+
+        if not tasks:
+            return {}
+
+        needed = []
+        for derivative, vc, frequencies in tasks:
+            for n in vc.derivatives_needed(limit_anharmonicity_usage=limit_anharmonicity_usage):
+                if n.representation() not in needed:
+                    needed.append(n.representation())
+
+        shared_memories = []
+        shared_tensors = {}
+        results = {}
+
+        try:
+            for r in needed:
+                t = numpy.asarray(self.screening(r, self.get_tensor(r)), dtype=float)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, t.nbytes))
+                shared_memories.append(shm)
+                numpy.ndarray(t.shape, dtype=float, buffer=shm.buf)[:] = t
+                shared_tensors[r] = (shm.name, t.shape)
+
+            num_chunks = -(-workers // len(tasks))
+
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(
+                        shared_tensors,
+                        list(self.mwh.frequencies),
+                        list(self.mwh.included_modes),
+                        self.screening.threshold,
+                        self.screening.electrical_threshold)) as executor:
+
+                futures = {}
+                for derivative, vc, frequencies in tasks:
+                    futures[derivative.representation(), vc.to_string()] = [
+                        executor.submit(
+                            _compute_pv_in_worker,
+                            vc.to_string(),
+                            derivative.representation(),
+                            chunk,
+                            limit_anharmonicity_usage,
+                            engine,
+                            on_grid)
+                        for chunk in _split_in_chunks(frequencies, num_chunks)
+                    ]
+
+                for derivative, vc, frequencies in tasks:
+                    if on_grid:
+                        results[derivative.representation(), vc.to_string()] = numpy.concatenate(
+                            [future.result() for future in futures[derivative.representation(), vc.to_string()]])
+                        continue
+
+                    tensors = {}
+                    for future in futures[derivative.representation(), vc.to_string()]:
+                        for frequency, components in future.result().items():
+                            tensors[frequency] = derivatives.Tensor(
+                                representation=derivative, frequency=frequency, components=components)
+
+                    results[derivative.representation(), vc.to_string()] = tensors
+        finally:
+            for shm in shared_memories:
+                shm.close()
+                shm.unlink()
+
+        return results
+
+    @staticmethod
     def display_message(message, out=sys.stdout, verbosity_level=0):
         """Output a message, if requested
 
-        :param message: the message
-        :type message: str
-        :param out: output if information is needed to be outputed
-        :type out: file
-        :param verbosity_level: how far should we print information
-        :type verbosity_level: int
+        :param message: the message
+        :type message: str
+        :param out: output if information is needed to be outputed
+        :type out: file
+        :param verbosity_level: how far should we print information
+        :type verbosity_level: int
+        """
+
+        if verbosity_level >= 1:
+            out.write('{}(! {})\n'.format('\n' if verbosity_level > 2 else '', message))
+            out.flush()
+
+    @staticmethod
+    def output_tensors(base, vc, tensors, frequencies, out=sys.stdout, verbosity_level=0, what=''):
+        """Output a bit of information if requested
+
+        :param base: base electrical derivative for which the vibrational contribution is computed
+        :type base: qcip_tools.derivatives.Derivative
+        :param vc: vibrational contribution
+        :type vc: VibrationalContribution|None
+        :param tensors: list of tensors
+        :type tensors: dict
+        :param frequencies: frequencies
+        :type frequencies: list
+        :param out: output if information is needed to be outputed
+        :type out: file
+        :param verbosity_level: how far should we print information
+        :type verbosity_level: int
+        :param what: used when no vc is given
+        :type what: str
+        """
+
+        if (verbosity_level >= 1 and vc is None) or verbosity_level >= 3:
+            for freq in frequencies:
+                if freq not in tensors:
+                    raise ValueError('{} not in tensors?'.format(freq))
+                if vc is not None:
+                    out.write('\n** Computed {} for {}:\n'.format(
+                        vc.to_string(fancy=True),
+                        fancy_output_derivative(base, freq)))
+                else:
+                    out.write('\n** {} for {}:\n'.format(what, fancy_output_derivative(base, freq)))
+
+                out.write(tensors[freq].to_string(threshold=1e-5))
+
+    # --------------------------------------------
+    # BELOW, COMPUTATION OF ALL THE CONTRIBUTIONS:
+    #           (so, internal stuffs)
+    # --------------------------------------------
+
+    def _create_tensors(self, derivative, frequencies, callback, **kwargs):
+        """Create a list of tensor, by taking advantage of the fact that it may (?) be easier to compute the same
+        contribution for many frequencies.
+
+        The ``callback`` function must be a function of this class, and receive:
+
+        + `input_fields`` as first argument,
+        + then ``frequencies``` (as a ``numpy.ndarray`` of float, sorted),
+        + and finally ``**kwargs``.
+
+        It returns the value of the component for all frequencies at once, as an array (the frequency axis is
+        therefore carried through the whole computation).
+
+        .. note::
+
+            + It is more efficient to compute the static version separately (because of permutations)
+            + Permutation of the full tensor is not used: the first coordinate is separated from the rest.
+
+
+        :param derivative: the derivative of the tensor for which the contribution should be computed
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies
+        :type frequencies: list
+        :param callback: callback func
+        :type callback: str
+        :param kwargs: kwargs
+        :type kwargs: dict
+        :rtype: dict
+        """
+
+        frequencies_mapping = {}
+
+        for frequency in frequencies:
+            frequencies_mapping[frequency] = derivatives_e.convert_frequency_from_string(frequency)
+
+        frequencies_converted = numpy.array(sorted(set(frequencies_mapping.values())))
+        components = self._create_components(derivative, frequencies_converted, callback, **kwargs)
+
+        tensors = {}
+        for frequency, converted_frequency in frequencies_mapping.items():
+            tensors[frequency] = derivatives.Tensor(
+                representation=derivative,
+                frequency=frequency,
+                components=components[numpy.searchsorted(frequencies_converted, converted_frequency)].copy())
+
+        return tensors
+
+    def _create_components(self, derivative, frequencies, callback, **kwargs):
+        """Compute all the components of a contribution for all frequencies at once (see :meth:`_create_tensors`)
+
+        :param derivative: the derivative of the tensor for which the contribution should be computed
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies (sorted)
+        :type frequencies: numpy.ndarray
+        :param callback: callback func
+        :type callback: str
+        :param kwargs: kwargs
+        :type kwargs: dict
+        :return: the components, of shape ``(len(frequencies), ) + shape of the derivative``
+        :rtype: numpy.ndarray
+        """
+
+        if derivative.representation() not in derivatives_e.DERIVATIVES:
+            raise BadShaking('I cannot deal with {}'.format(derivative.representation()))
+
+        input_fields = [derivatives_e.representation_to_field[x] for x in derivative.representation()[1:]]
+        components = numpy.zeros((len(frequencies), ) + (3, ) * derivative.order())
+
+        for i in derivative.smart_iterator():
+            v = getattr(self, callback)(i, input_fields, frequencies, **kwargs)
+            for j in derivative.inverse_smart_iterator(i):
+                components[(slice(None), ) + tuple(j)] = v
+
+        return components
+
+    def _create_tensors_by_contraction(self, derivative, frequencies, callback, **kwargs):
+        """Create a list of tensors, by computing all components at once through tensor contractions over the
+        normal modes.
+
+        The ``callback`` function must be a function of this class, and receive:
+
+        + ``fields`` as first argument (the multiple of the frequency associated to each coordinate, the first one
+          being :math:`-\\sum_i \\omega_i`),
+        + then ``frequencies`` (as an array),
+        + then ``omega``, the vibrational frequencies of the included modes,
+        + and finally ``**kwargs``, restricted to the included modes.
+
+        It returns the contribution for all the frequencies at once (as an array of which the first axis runs over
+        the frequencies), without the permutations: these are performed here, by summing the callback result over
+        all the permutations of its axes (and the corresponding fields).
+        Thus, the callback function is called once per permutation (and per chunk of ``CONTRACTION_MAX_FREQUENCIES``
+        frequencies).
+
+        :param derivative: the derivative of the tensor for which the contribution should be computed
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies
+        :type frequencies: list
+        :param callback: callback func
+        :type callback: str
+        :param kwargs: kwargs
+        :type kwargs: dict
+        :rtype: dict
+        """
+
+        converted_frequencies = [derivatives_e.convert_frequency_from_string(f) for f in frequencies]
+        components = self._create_components_by_contraction(derivative, converted_frequencies, callback, **kwargs)
+
+        tensors = {}
+        for i, frequency in enumerate(frequencies):
+            tensors[frequency] = derivatives.Tensor(
+                representation=derivative, frequency=frequency, components=components[i].copy())
+
+        return tensors
+
+    def _create_components_by_contraction(self, derivative, frequencies, callback, **kwargs):
+        """Compute all the components of a contribution through tensor contractions over the normal modes (see
+        :meth:`_create_tensors_by_contraction`)
+
+        :param derivative: the derivative of the tensor for which the contribution should be computed
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies (as float)
+        :type frequencies: numpy.ndarray|list
+        :param callback: callback func
+        :type callback: str
+        :param kwargs: kwargs
+        :type kwargs: dict
+        :return: the components, of shape ``(len(frequencies), ) + shape of the derivative``
+        :rtype: numpy.ndarray
+        """
+
+        if derivative.representation() not in derivatives_e.DERIVATIVES:
+            raise BadShaking('I cannot deal with {}'.format(derivative.representation()))
+
+        return self._sum_over_permutations(derivative, frequencies, callback, **self._restricted_kwargs(kwargs))
+
+    def _restricted_kwargs(self, kwargs):
+        """Restrict the derivatives to the included modes (the cubic force field is stored as a list of its
+        non-zero elements if it is sparse enough, see ``_ScreenedCubicForceField``), and add ``omega``, the
+        vibrational frequencies of the included modes.
+
+        :param kwargs: kwargs (``'t_' + repr``)
+        :type kwargs: dict
+        :rtype: dict
+        """
+
+        modes = numpy.array(self.mwh.included_modes)
+
+        restricted_kwargs = {'omega': numpy.array(self.mwh.frequencies)[modes]}
+        for k, t in kwargs.items():
+            restricted_kwargs[k] = self.intermediates(
+                ('restricted', tuple(modes)), lambda: t[numpy.ix_(*[modes] * k[2:].count('n'))], t)
+
+        # if screened, the cubic force field is sparse enough to only visit its non-negligible elements
+        if self.screening.threshold > 0 and 't_nnn' in restricted_kwargs:
+            t_nnn = restricted_kwargs['t_nnn']
+            if numpy.count_nonzero(t_nnn) < SPARSE_CUBIC_FORCE_FIELD_DENSITY * t_nnn.size:
+                restricted_kwargs['t_nnn'] = self.intermediates(
+                    ('sparse', ), lambda: _ScreenedCubicForceField(t_nnn), t_nnn)
+
+        return restricted_kwargs
+
+    def _sum_over_permutations(self, derivative, frequencies, callback, omega, **kwargs):
+        """Sum the result of the callback function over the permutations (see
+        :meth:`_create_tensors_by_contraction`)
+
+        :param derivative: the derivative of the tensor for which the contribution should be computed
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies (as float)
+        :type frequencies: numpy.ndarray|list
+        :param callback: callback func
+        :type callback: str
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param kwargs: kwargs, restricted to the included modes
+        :type kwargs: dict
+        :rtype: numpy.ndarray
+        """
+
+        input_fields = [derivatives_e.representation_to_field[x] for x in derivative.representation()[1:]]
+        fields = tuple([-sum(input_fields)] + input_fields)
+
+        frequencies = numpy.asarray(frequencies, dtype=float)
+        components = numpy.zeros((len(frequencies), ) + (3, ) * len(fields))
+
+        for start in range(0, len(frequencies), CONTRACTION_MAX_FREQUENCIES):
+            chunk = slice(start, start + CONTRACTION_MAX_FREQUENCIES)
+            for permuted_fields, inverse_permutations in _fields_permutations(fields):
+                value = getattr(self, callback)(permuted_fields, frequencies[chunk], omega, **kwargs)
+                for inverse_permutation in inverse_permutations:
+                    components[chunk] += value.transpose((0, ) + tuple(i + 1 for i in inverse_permutation))
+
+        return components
+
+    def _create_decomposition(self, derivative, frequencies, callback, omega, **kwargs):
+        """Create the per-mode decomposition of a contribution, as :meth:`_create_tensors_by_contraction` does for
+        the contribution itself, except that the ``callback`` function returns an array whose second axis (after the
+        one over the frequencies) runs over the modes (and is not summed).
+
+        :param derivative: the derivative of the tensor for which the contribution should be computed
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies
+        :type frequencies: list
+        :param callback: callback func
+        :type callback: str
+        :param omega: vibrational frequencies of the modes
+        :type omega: numpy.ndarray
+        :param kwargs: kwargs, restricted to the modes
+        :type kwargs: dict
+        :rtype: dict
+        """
+
+        if derivative.representation() not in derivatives_e.DERIVATIVES:
+            raise BadShaking('I cannot deal with {}'.format(derivative.representation()))
+
+        input_fields = [derivatives_e.representation_to_field[x] for x in derivative.representation()[1:]]
+        fields = tuple([-sum(input_fields)] + input_fields)
+
+        converted_frequencies = numpy.array([derivatives_e.convert_frequency_from_string(f) for f in frequencies])
+        components = numpy.zeros((len(frequencies), len(omega)) + (3, ) * len(fields))
+
+        for permuted_fields, inverse_permutations in _fields_permutations(fields):
+            value = getattr(self, callback)(permuted_fields, converted_frequencies, omega, **kwargs)
+            for inverse_permutation in inverse_permutations:
+                components += value.transpose((0, 1) + tuple(i + 2 for i in inverse_permutation))
+
+        return dict((frequency, components[i]) for i, frequency in enumerate(frequencies))
+
+    def _compute_zpva_10(self, derivative, frequencies):
+        """Compute the ZPVA contribution from electrical anharmonicity:
+
+        .. math::
+
+            [p]^{1,0} = \\frac{1}{4}\\,\\sum_a \\tdiff{^2p}{Q_a^2}\\,\\omega_a^{-1}
+
+        :param derivative: the derivative
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies
+        :type frequencies: list of float|str
+        :rtype: qcip_tools.derivatives.Tensor
+        """
+        tensors = {}
+        b_repr = derivative.representation()
+
+        for frequency in frequencies:
+            t_nnx = self.get_tensor('NN' + b_repr, frequency)
+            t = derivatives.Tensor(representation=derivative, frequency=frequency)
+
+            for a in self.mwh.included_modes:
+                t.components += 1 / self.mwh.frequencies[a] * t_nnx[a, a]
+
+            t.components *= 1 / 4
+            tensors[frequency] = t
+
+        return tensors
+
+    def _compute_zpva_01(self, derivative, frequencies):
+        """Compute the ZPVA contribution from mechanical anharmonicity:
+
+        .. math::
+
+            [p]^{0,1} = -\\frac{1}{4}\\,\\sum_{ab} F_{abb}\\,\\tdiff{p}{Q_a}\\,\\omega_a^{-2}\\,\\omega_b^{-1}
+
+        :param derivative: the derivative
+        :type derivative: qcip_tools.derivatives.Derivative
+        :param frequencies: the frequencies
+        :type frequencies: list of float|str
+        :rtype: qcip_tools.derivatives.Tensor
+        """
+
+        tensors = {}
+        b_repr = derivative.representation()
+
+        # h_a = \sum_b F_bba / ω_b, shared by all frequencies (and the [1,1] contributions)
+        h = self._nnn_trace(self.get_tensor('NNN'), self._inverse_vibrational_frequencies())
+
+        for frequency in frequencies:
+            t_nx = self.get_tensor('N' + b_repr, frequency)
+            t = derivatives.Tensor(representation=derivative, frequency=frequency)
+
+            for a in self.mwh.included_modes:
+                t.components += 1 / (self.mwh.frequencies[a] ** 2) * h[a] * t_nx[a]
+
+            t.components *= -1 / 4
+            tensors[frequency] = t
+
+        return tensors
+
+    def _compute_F_F__0_0_component(self, coo, input_fields, frequencies, t_nf):
+        """Compute a component of the :math:`[\\mu^2]^{0,0}` contribution
+
+        .. math::
+
+            [\\mu^2]^{0,0} = \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_a
+            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\mu_j}{Q_a}\\,\\lb{\\sigma}{a}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+
+            for a in self.mwh.included_modes:
+                tmp = t_nf[a, p[0][0]] * t_nf[a, p[1][0]]
+                values += lambda_0[a] * tmp
+
+        values *= 1 / 2 * multiplier
+
+        return values
+
+    def _compute_F_F__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nnn):
+        """Compute a component of the :math:`[\\mu^2]^{1,1}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu^2]^{1,1} &= -\\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{abc} F_{abc}\\,
+            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_j}{Q_c}\\,
+            \\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1})\\\\
+            &+ F_{bcc}\\,\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_j}{Q_a}\\,
+            \\lb{\\sigma}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        h = self._nnn_trace(t_nnn, self._inverse_vibrational_frequencies())
+        w_nnf = self._weighted_by_inverse_frequencies(t_nnf)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
+            for a in self.mwh.included_modes:
+                for b in self.mwh.included_modes:
+
+                    tmp_ab1 = w_nnf[a, b, p[0][0]]
+                    tmp_ab2 = self.mwh.frequencies[b] ** -2 * t_nnf[a, b, p[0][0]] * t_nf[a, p[1][0]] * h[b]
+
+                    for c in self.mwh.included_modes:
+                        tmp1 = tmp_ab1 * t_nf[c, p[1][0]] * t_nnn[a, b, c]
+                        values += lambda2_0[a, b] * lambda_0[c] * tmp1
+
+                    values += lambda_0[a] * tmp_ab2
+
+        values *= - 1 / 4 * multiplier
+
+        return values
+
+    def _compute_F_F__2_0_component(self, coo, input_fields, frequencies, t_nnf):
+        """Compute a component of the :math:`[\\mu^2]^{2,0}` contribution
+
+         .. math::
+
+            \\begin{align}
+            [\\mu^2]^{2,0} &= \\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{ab}
+            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,
+            \\lb{\\sigma}{ab}\\,\\omega_a^{-1}
+            \\end{align}
+
+         :param coo: coordinates
+         :type coo: tuple|list
+         :param input_fields: input fields
+         :type input_fields: tuple|list
+         :param frequencies: the frequencies
+         :type frequencies: numpy.ndarray
+         :param t_nnf: ``NNF`` components
+         :type t_nnf: numpy.ndarray
+         :rtype: numpy.ndarray
+         """
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
+            for a in self.mwh.included_modes:
+                for b in self.mwh.included_modes:
+
+                    tmp = 1 / self.mwh.frequencies[a] * t_nnf[a, b, p[0][0]] * t_nnf[a, b, p[1][0]]
+
+                    values += lambda2_0[a, b] * tmp
+
+        values *= 1 / 4 * multiplier
+
+        return values
+
+    def _compute_F_F__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nnn):
+        """Compute a component of the :math:`[\\mu^2]^{0,2}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu^2]^{0,2} &= -\\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{abcd}
+            \\tdiff{\\mu_i}{Q_c}\\tdiff{\\mu_j}{Q_d}\\times\\\\
+            &\\left[F_{aab}\\,F_{bcd}\\,\\lb{\\sigma}{c}\\lb{\\sigma}{d}\\,\\omega_b^{-2}
+            +2\\,F_{abc}\\,F_{abd}\\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\right]
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
+            for a in self.mwh.included_modes:
+                mult_a = 1 / self.mwh.frequencies[a]
+                for b in self.mwh.included_modes:
+                    mult_ab = self.mwh.frequencies[b] ** -2
+
+                    for c in self.mwh.included_modes:
+
+                        mult_abc = mult_a * t_nf[c, p[0][0]]
+                        mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
+                        mult_abc_2 = mult_abc * t_nnn[a, b, c]
+
+                        for d in self.mwh.included_modes:
+                            mult_abcd = t_nf[d, p[1][0]]
+
+                            tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
+                            tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
+
+                            values -= (tmp1 + lambda2_0[a, b] * tmp2) * lambda_0[c] * lambda_0[d]
+
+        values *= -1 / 8 * multiplier
+
+        return values
+
+    def _compute_F_FF__0_0_component(self, coo, input_fields, frequencies, t_nf, t_nff):
+        """Compute a component of the :math:`[\\mu\\alpha]^{0,0}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu\\alpha]^{0,0} &= \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_a
+            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\alpha_{jk}}{Q_a}\\,\\lb{\\sigma}{a}
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+
+            for a in self.mwh.included_modes:
+                tmp = t_nf[a, p[0][0]] * t_nff[a, p[1][0], p[2][0]]
+                values += lambda_0[a] * tmp
+
+        values *= 1 / 2 * multiplier
+
+        return values
+
+    def _compute_F_FF__2_0_component(self, coo, input_fields, frequencies, t_nnf, t_nnff):
+        """Compute a component of the :math:`[\\mu\\alpha]^{2,0}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu\\alpha]^{2,0} &= \\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{ab}
+            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\,
+            \\lb{\\sigma}{ab}\\,\\omega_a^{-1}
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
+            for a in self.mwh.included_modes:
+                for b in self.mwh.included_modes:
+
+                    tmp = 1 / self.mwh.frequencies[a] * t_nnf[a, b, p[0][0]] * t_nnff[a, b, p[1][0], p[2][0]]
+
+                    values += lambda2_0[a, b] * tmp
+
+        values *= 1 / 4 * multiplier
+
+        return values
+
+    def _compute_F_FF__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nff, t_nnn):
+        """Compute a component of the :math:`[\\mu\\alpha]^{0,2}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu\\alpha]^{0,2} &= \\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{abcd}
+            \\tdiff{\\mu_i}{Q_c}\\tdiff{\\alpha_{jk}}{Q_d}\\times\\\\
+            &\\left[ F_{aab}\\,F_{bcd}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\,\\omega_b^{-2}
+            +2\\,F_{abc}\\,F_{abd}\\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\right]
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
+            for a in self.mwh.included_modes:
+                mult_a = 1 / self.mwh.frequencies[a]
+                for b in self.mwh.included_modes:
+                    mult_ab = self.mwh.frequencies[b] ** -2
+
+                    for c in self.mwh.included_modes:
+
+                        mult_abc = mult_a * t_nf[c, p[0][0]]
+                        mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
+                        mult_abc_2 = mult_abc * t_nnn[a, b, c]
+
+                        for d in self.mwh.included_modes:
+                            mult_abcd = t_nff[d, p[1][0], p[2][0]]
+
+                            tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
+                            tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
+
+                            values -= (tmp1 + lambda2_0[a, b] * tmp2) * lambda_0[c] * lambda_0[d]
+
+        values *= -1 / 8 * multiplier
+
+        return values
+
+    def _compute_F_FF__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nff, t_nnff, t_nnn):
+        """Compute a component of the :math:`[\\mu\\alpha]^{1,1}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu\\alpha]^{1,1} &= -\\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{abc}
+            F_{abc}\\times\\\\
+            &\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{jk}}{Q_c}+
+            \\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_c}\\right]\\times\\\\
+            &\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1}) \\\\
+            &+ F_{bcc}\\,\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{jk}}{Q_a}
+            +\\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_a}\\right]\\times\\\\
+            &\\lb{\\sigma}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        h = self._nnn_trace(t_nnn, self._inverse_vibrational_frequencies())
+        w_nnf = self._weighted_by_inverse_frequencies(t_nnf)
+        w_nnff = self._weighted_by_inverse_frequencies(t_nnff)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
+            for a in self.mwh.included_modes:
+                for b in self.mwh.included_modes:
+
+                    f_ab2 = self.mwh.frequencies[b] ** -2
+
+                    tmp_ab1 = w_nnf[a, b, p[0][0]]
+                    tmp_ab3 = w_nnff[a, b, p[1][0], p[2][0]]
+
+                    e_1 = t_nnf[a, b, p[0][0]] * t_nff[a, p[1][0], p[2][0]]
+                    e_1 += t_nnff[a, b, p[1][0], p[2][0]] * t_nf[a, p[0][0]]
+
+                    tmp_ab2 = f_ab2 * e_1 * h[b]
+
+                    for c in self.mwh.included_modes:
+                        tmp1 = (tmp_ab1 * t_nff[c, p[1][0], p[2][0]] + tmp_ab3 * t_nf[c, p[0][0]]) * t_nnn[a, b, c]
+                        values += lambda2_0[a, b] * lambda_0[c] * tmp1
+
+                    values += lambda_0[a] * tmp_ab2
+
+        values *= - 1 / 8 * multiplier
+
+        return values
+
+    def _compute_F_F_F__1_0_component(self, coo, input_fields, frequencies, t_nf, t_nnf):
+        """Compute a component of the :math:`[\\mu^3]^{1,0}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu^3]^{1,0} &= \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{ab}
+            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,
+            \\tdiff{\\mu_k}{Q_b}\\,\\lb{\\sigma}{a}\\,\\lb{2}{b}
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :rtype: numpy.ndarray
         """
+        values = numpy.zeros(len(frequencies))
 
-        if verbosity_level >= 1:
-            out.write('{}(! {})\n'.format('\n' if verbosity_level > 2 else '', message))
-            out.flush()
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
-    @staticmethod
-    def output_tensors(base, vc, tensors, frequencies, out=sys.stdout, verbosity_level=0, what=''):
-        """Output a bit of information if requested
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_2 = self.lambda_cache(p[2][1], frequencies)
 
-        :param base: base electrical derivative for which the vibrational contribution is computed
-        :type base: qcip_tools.derivatives.Derivative
-        :param vc: vibrational contribution
-        :type vc: VibrationalContribution|None
-        :param tensors: list of tensors
-        :type tensors: dict
-        :param frequencies: frequencies
-        :type frequencies: list
-        :param out: output if information is needed to be outputed
-        :type out: file
-        :param verbosity_level: how far should we print information
-        :type verbosity_level: int
-        :param what: used when no vc is given
-        :type what: str
+            for a in self.mwh.included_modes:
+                tmp_a = t_nf[a, p[0][0]]
+
+                for b in self.mwh.included_modes:
+                    tmp_ab = tmp_a * t_nnf[a, b, p[1][0]] * t_nf[b, p[2][0]]
+
+                    values += lambda_0[a] * lambda_2[b] * tmp_ab
+
+        values *= 1 / 2 * multiplier
+
+        return values
+
+    def _compute_F_F_F__0_1_component(self, coo, input_fields, frequencies, t_nf, t_nnn):
+        """Compute a component of the :math:`[\\mu^3]^{0,1}` contribution
+
+        .. math::
+
+            \\begin{align}
+            [\\mu^3]^{0,1} &= -\\frac{1}{6}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{abc} F_{abc}
+            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\mu_j}{Q_b}\\,\\tdiff{\\mu_k}{Q_c}\\,
+            \\lb{\\sigma}{a}\\,\\lb{1}{b}\\,\\lb{2}{c}
+            \\end{align}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
         """
+        values = numpy.zeros(len(frequencies))
 
-        if (verbosity_level >= 1 and vc is None) or verbosity_level >= 3:
-            for freq in frequencies:
-                if freq not in tensors:
-                    raise ValueError('{} not in tensors?'.format(freq))
-                if vc is not None:
-                    out.write('\n** Computed {} for {}:\n'.format(
-                        vc.to_string(fancy=True),
-                        fancy_output_derivative(base, freq)))
-                else:
-                    out.write('\n** {} for {}:\n'.format(what, fancy_output_derivative(base, freq)))
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
-                out.write(tensors[freq].to_string(threshold=1e-5))
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_1 = self.lambda_cache(p[1][1], frequencies)
+            lambda_2 = self.lambda_cache(p[2][1], frequencies)
 
-    # --------------------------------------------
-    # BELOW, COMPUTATION OF ALL THE CONTRIBUTIONS:
-    #           (so, internal stuffs)
-    # --------------------------------------------
+            for a in self.mwh.included_modes:
+                tmp_a = t_nf[a, p[0][0]]
 
-    def _create_tensors(self, derivative, frequencies, callback, **kwargs):
-        """Create a list of tensor, by taking advantage of the fact that it may (?) be easier to compute the same
-        contribution for many frequencies.
+                for b in self.mwh.included_modes:
+                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
 
-        The ``callback`` function must be a function of this class, and receive:
+                    for c in self.mwh.included_modes:
 
-        + `input_fields`` as first argument,
-        + then ``frequencies``` (as a list of float, sorted),
-        + and finally ``**kwargs``.
+                        tmp_abc = tmp_ab * t_nf[c, p[2][0]] * t_nnn[a, b, c]
 
-        .. note::
+                        values += lambda_0[a] * lambda_1[b] * lambda_2[c] * tmp_abc
 
-            + It is more efficient to compute the static version separately (because of permutations)
-            + Permutation of the full tensor is not used: the first coordinate is separated from the rest.
+        values *= -1 / 6 * multiplier
 
+        return values
 
-        :param derivative: the derivative of the tensor for which the contribution should be computed
-        :type derivative: qcip_tools.derivatives.Derivative
+    def _compute_FF_FF__0_0_component(self, coo, input_fields, frequencies, t_nff):
+        """Compute a component of the :math:`[\\alpha^2]^{0,0}` contribution
+
+        .. math::
+
+            [\\alpha^2]^{0,0} = \\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_a
+            \\tdiff{\\alpha_{ij}}{Q_a}\\,\\tdiff{\\alpha_{kl}}{Q_a}\\,\\lb{23}{a}
+
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list
-        :param callback: callback func
-        :type callback: str
-        :param kwargs: kwargs
-        :type kwargs: dict
-        :rtype: dict
+        :type frequencies: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :rtype: numpy.ndarray
         """
 
-        if derivative.representation() not in derivatives_e.DERIVATIVES:
-            raise BadShaking('I cannot deal with {}'.format(derivative.representation()))
-
-        input_fields = [derivatives_e.representation_to_field[x] for x in derivative.representation()[1:]]
+        values = numpy.zeros(len(frequencies))
 
-        tensors = {}
-        frequencies_converted = []
-        frequencies_mapping = {}
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
-        for frequency in frequencies:
-            converted_frequency = derivatives_e.convert_frequency_from_string(frequency)
-            frequencies_converted.append(converted_frequency)
-            frequencies_mapping[converted_frequency] = frequency
-            tensors[frequency] = derivatives.Tensor(representation=derivative, frequency=frequency)
+        for p in unique_elemts:
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
 
-        frequencies_converted.sort()
+            for a in self.mwh.included_modes:
+                tmp = t_nff[a, p[0][0], p[1][0]] * t_nff[a, p[2][0], p[3][0]]
+                values += lambda_23[a] * tmp
 
-        for i in derivative.smart_iterator():
-            v = getattr(self, callback)(i, input_fields, frequencies_converted, **kwargs)
-            for j in derivative.inverse_smart_iterator(i):
-                for frequency, value in v.items():
-                    initial_frequency = frequencies_mapping[frequency]
-                    tensors[initial_frequency].components[j] = value
+        values *= 1 / 8 * multiplier
 
-        return tensors
+        return values
 
-    def _compute_zpva_10(self, derivative, frequencies):
-        """Compute the ZPVA contribution from electrical anharmonicity:
+    def _compute_F_FFF__0_0_component(self, coo, input_fields, frequencies, t_nf, t_nfff):
+        """Compute a component of the :math:`[\\mu\\beta]^{0,0}` contribution
 
         .. math::
 
-            [p]^{1,0} = \\frac{1}{4}\\,\\sum_a \\tdiff{^2p}{Q_a^2}\\,\\omega_a^{-1}
+            [\\mu\\beta]^{0,0} = \\frac{1}{6}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_a
+            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\beta_{jkl}}{Q_a}\\,\\lb{\\sigma}{a}
 
-        :param derivative: the derivative
-        :type derivative: qcip_tools.derivatives.Derivative
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :rtype: qcip_tools.derivatives.Tensor
+        :type frequencies: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
+        :rtype: numpy.ndarray
         """
-        tensors = {}
-        b_repr = derivative.representation()
 
-        for frequency in frequencies:
-            t_nnx = self.get_tensor('NN' + b_repr, frequency)
-            t = derivatives.Tensor(representation=derivative, frequency=frequency)
+        values = numpy.zeros(len(frequencies))
+
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
 
             for a in self.mwh.included_modes:
-                t.components += 1 / self.mwh.frequencies[a] * t_nnx[a, a]
+                tmp = t_nf[a, p[0][0]] * t_nfff[a, p[1][0], p[2][0], p[3][0]]
+                values += lambda_0[a] * tmp
 
-            t.components *= 1 / 4
-            tensors[frequency] = t
+        values *= 1 / 6 * multiplier
 
-        return tensors
+        return values
 
-    def _compute_zpva_01(self, derivative, frequencies):
-        """Compute the ZPVA contribution from mechanical anharmonicity:
+    def _compute_F_F_FF__1_0_component(self, coo, input_fields, frequencies, t_nf, t_nff, t_nnf, t_nnff):
+        """Compute a component of the :math:`[\\mu^2\\alpha]^{1,0}` contribution
 
         .. math::
 
-            [p]^{0,1} = -\\frac{1}{4}\\,\\sum_{ab} F_{abb}\\,\\tdiff{p}{Q_a}\\,\\omega_a^{-2}\\,\\omega_b^{-1}
+            \\begin{align}
+            [\\mu^2\\alpha]^{1,0} &= \\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{ab}
+            \\left\\{\\tdiff{\\mu_i}{Q_a}\\,\\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\tdiff{\\mu_l}{Q_b}
+            \\lb{\\sigma}{a}\\,\\lb{3}{b}\\right.\\nonumber\\\\
+            &+\\left.2\\,\\tdiff{\\mu_i}{Q_a}\\,\\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{kl}}{Q_b}
+            \\lb{\\sigma}{a}\\,\\lb{23}{b}\\right\\}
+            \\end{align}
 
-        :param derivative: the derivative
-        :type derivative: qcip_tools.derivatives.Derivative
+        :param coo: coordinates
+        :type coo: tuple|list
+        :param input_fields: input fields
+        :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :rtype: qcip_tools.derivatives.Tensor
+        :type frequencies: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :rtype: numpy.ndarray
         """
 
-        tensors = {}
-        b_repr = derivative.representation()
+        values = numpy.zeros(len(frequencies))
 
-        for frequency in frequencies:
-            t_nx = self.get_tensor('N' + b_repr, frequency)
-            t_nnn = self.get_tensor('NNN')
-            t = derivatives.Tensor(representation=derivative, frequency=frequency)
+        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+
+        for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+            lambda_3 = self.lambda_cache(p[3][1], frequencies)
 
             for a in self.mwh.included_modes:
-                ccc = 0
+                tmp_a = t_nf[a, p[0][0]]
                 for b in self.mwh.included_modes:
-                    ccc += t_nnn[b, b, a] / self.mwh.frequencies[b]
-
-                t.components += 1 / (self.mwh.frequencies[a] ** 2) * ccc * t_nx[a]
+                    tmp_ab_1 = tmp_a * t_nnff[a, b, p[1][0], p[2][0]] * t_nf[b, p[3][0]]
+                    tmp_ab_2 = tmp_a * t_nnf[a, b, p[1][0]] * t_nff[b, p[2][0], p[3][0]]
+                    values += lambda_0[a] * lambda_3[b] * tmp_ab_1
+                    values += 2 * lambda_0[a] * lambda_23[b] * tmp_ab_2
 
-            t.components *= -1 / 4
-            tensors[frequency] = t
+        values *= 1 / 4 * multiplier
 
-        return tensors
+        return values
 
-    def _compute_F_F__0_0_component(self, coo, input_fields, frequencies, t_nf):
-        """Compute a component of the :math:`[\\mu^2]^{0,0}` contribution
+    def _compute_F_F_FF__0_1_component(self, coo, input_fields, frequencies, t_nf, t_nff, t_nnn):
+        """Compute a component of the :math:`[\\mu^2\\alpha]^{0,1}` contribution
 
         .. math::
 
-            [\\mu^2]^{0,0} = \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_a
-            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\mu_j}{Q_a}\\,\\lb{\\sigma}{a}
+            [\\mu^2\\alpha]^{0,1} = -\\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc} F_{abc}\\,
+            \\tdiff{\\mu_j}{Q_b}\\,\\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\alpha_{jk}}{Q_c}\\,\\lb{\\sigma}{a}\\,
+            \\lb{1}{b}\\,\\lb{23}{c}
 
         :param coo: coordinates
         :type coo: tuple|list
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nf: ``NF`` components
-        :type t_nf: numpy.ndarray
-        :rtype: list of float
+        :type frequencies: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
         """
 
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_1 = self.lambda_cache(p[1][1], frequencies)
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+
             for a in self.mwh.included_modes:
-                tmp = t_nf[a, p[0][0]] * t_nf[a, p[1][0]]
-                for f in frequencies:
-                    values[f] += Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * tmp
+                tmp_a = t_nf[a, p[0][0]]
+                for b in self.mwh.included_modes:
+                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
+                    for c in self.mwh.included_modes:
+                        tmp_abc = tmp_ab * t_nff[c, p[2][0], p[3][0]] * t_nnn[a, b, c]
+                        values += lambda_0[a] * lambda_1[b] * lambda_23[c] * tmp_abc
 
-        for f in frequencies:
-            values[f] *= 1 / 2 * multiplier
+        values *= -1 / 4 * multiplier
 
         return values
 
-    def _compute_F_F__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nnn):
-        """Compute a component of the :math:`[\\mu^2]^{1,1}` contribution
+    def _compute_F_F_F_F__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nnn):
+        """Compute a component of the :math:`[\\mu^4]^{1,1}` contribution
 
         .. math::
 
-            \\begin{align}
-            [\\mu^2]^{1,1} &= -\\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{abc} F_{abc}\\,
-            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_j}{Q_c}\\,
-            \\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1})\\\\
-            &+ F_{bcc}\\,\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_j}{Q_a}\\,
-            \\lb{\\sigma}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}
-            \\end{align}
+            [\\mu^4]^{1,1} = -\\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcd}\\,F_{abc}
+            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\mu_j}{Q_b}\\,\\tdiff{^2\\mu_k}{Q_c\\partial Q_d}\\,\\tdiff{\\mu_l}{Q_d}
+            \\times\\\\\\lb{\\sigma}{a}\\,\\lb{1}{b}\\,\\lb{23}{c}\\,\\lb{3}{d}
 
         :param coo: coordinates
         :type coo: tuple|list
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
         :param t_nnf: ``NNF`` components
         :type t_nnf: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
 
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_1 = self.lambda_cache(p[1][1], frequencies)
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+            lambda_3 = self.lambda_cache(p[3][1], frequencies)
+
             for a in self.mwh.included_modes:
-                for b in self.mwh.included_modes:
+                tmp_a = t_nf[a, p[0][0]]
 
-                    tmp_ab1 = (1 / self.mwh.frequencies[a] + 1 / self.mwh.frequencies[b]) * t_nnf[a, b, p[0][0]]
-                    tmp_ab2 = self.mwh.frequencies[b] ** -2 * t_nnf[a, b, p[0][0]] * t_nf[a, p[1][0]]
+                for b in self.mwh.included_modes:
+                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
 
                     for c in self.mwh.included_modes:
-                        tmp1 = tmp_ab1 * t_nf[c, p[1][0]] * t_nnn[a, b, c]
-                        tmp2 = tmp_ab2 * t_nnn[b, c, c] * self.mwh.frequencies[c] ** -1
-
-                        for f in frequencies:
-                            ws = p[0][1] * f
-                            fr_1 = Shaker.lambda_(ws, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * \
-                                Shaker.lambda_(ws, self.mwh.frequencies[c])
+                        for d in self.mwh.included_modes:
+                            tmp_abcd = tmp_ab * t_nnn[a, b, c] * t_nf[d, p[3][0]] * t_nnf[c, d, p[2][0]]
 
-                            values[f] += (fr_1 * tmp1 + Shaker.lambda_(ws, self.mwh.frequencies[a]) * tmp2)
+                            values += lambda_0[a] * lambda_1[b] * lambda_23[c] * lambda_3[d] * tmp_abcd
 
-        for f in frequencies:
-            values[f] *= - 1 / 4 * multiplier
+        values *= -1 / 2 * multiplier
 
         return values
 
-    def _compute_F_F__2_0_component(self, coo, input_fields, frequencies, t_nnf):
-        """Compute a component of the :math:`[\\mu^2]^{2,0}` contribution
+    def _compute_F_F_F_F__2_0_component(self, coo, input_fields, frequencies, t_nf, t_nnf):
+        """Compute a component of the :math:`[\\mu^4]^{2,0}` contribution
 
          .. math::
 
             \\begin{align}
-            [\\mu^2]^{2,0} &= \\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{ab}
-            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,
-            \\lb{\\sigma}{ab}\\,\\omega_a^{-1}
+            [\\mu^4]^{2,0} &= \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc}
+            \\,F_{abc}\\,\\tdiff{\\mu_i}{Q_a}\\, \\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,
+            \\tdiff{^2\\mu_k}{Q_b\\partial Q_c}\\,\\tdiff{\\mu_l}{Q_c}
+            \\,\\lb{\\sigma}{a}\\,\\lb{23}{b}\\,\\lb{\\sigma}{3}
             \\end{align}
 
          :param coo: coordinates
@@ -1018,43 +3227,45 @@ class Shaker:
          :param input_fields: input fields
          :type input_fields: tuple|list
          :param frequencies: the frequencies
-         :type frequencies: list of float|str
+         :type frequencies: numpy.ndarray
+         :param t_nf: ``NNF`` components
+         :type t_nf: numpy.ndarray
          :param t_nnf: ``NNF`` components
          :type t_nnf: numpy.ndarray
-         :rtype: list of float
+         :rtype: numpy.ndarray
          """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+            lambda_3 = self.lambda_cache(p[3][1], frequencies)
+
             for a in self.mwh.included_modes:
+                tmp_a = t_nf[a, p[0][0]]
                 for b in self.mwh.included_modes:
+                    tmp_ab = tmp_a * t_nnf[a, b, p[1][0]]
+                    for c in self.mwh.included_modes:
+                        tmp_abc = tmp_ab * t_nnf[b, c, p[2][0]] * t_nf[c, p[3][0]]
 
-                    tmp = 1 / self.mwh.frequencies[a] * t_nnf[a, b, p[0][0]] * t_nnf[a, b, p[1][0]]
-
-                    for f in frequencies:
-                        values[f] += \
-                            Shaker.lambda_(p[0][1] * f, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp
+                        values += lambda_0[a] * lambda_23[b] * lambda_3[c] * tmp_abc
 
-        for f in frequencies:
-            values[f] *= 1 / 4 * multiplier
+        values *= 1 / 2 * multiplier
 
         return values
 
-    def _compute_F_F__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nnn):
-        """Compute a component of the :math:`[\\mu^2]^{0,2}` contribution
+    def _compute_F_F_F_F__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nnn):
+        """Compute a component of the :math:`[\\mu^4]^{0,2}` contribution
 
         .. math::
 
             \\begin{align}
-            [\\mu^2]^{0,2} &= -\\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{abcd}
-            \\tdiff{\\mu_i}{Q_c}\\tdiff{\\mu_j}{Q_d}\\times\\\\
-            &\\left[F_{aab}\\,F_{bcd}\\,\\lb{\\sigma}{c}\\lb{\\sigma}{d}\\,\\omega_b^{-2}
-            +2\\,F_{abc}\\,F_{abd}\\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\right]
+            [\\mu^4]^{0,2} &= \\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcde}
+            \\,F_{abc}\\,F_{cde}\\,\\tdiff{\\mu_i}{Q_a}\\, \\tdiff{\\mu_j}{Q_b}\\,
+            \\tdiff{\\mu_k}{Q_d}\\,\\tdiff{\\mu_l}{Q_e}
+            \\,\\lb{\\sigma}{a}\\,\\lb{1}{b}\\,\\lb{23}{c}\\,\\lb{2}{d}\\,\\lb{3}{e}
             \\end{align}
 
         :param coo: coordinates
@@ -1062,59 +3273,56 @@ class Shaker:
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_1 = self.lambda_cache(p[1][1], frequencies)
+            lambda_2 = self.lambda_cache(p[2][1], frequencies)
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+            lambda_3 = self.lambda_cache(p[3][1], frequencies)
+
             for a in self.mwh.included_modes:
-                mult_a = 1 / self.mwh.frequencies[a]
+                tmp_a = t_nf[a, p[0][0]]
                 for b in self.mwh.included_modes:
-                    mult_ab = self.mwh.frequencies[b] ** -2
+                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
 
                     for c in self.mwh.included_modes:
-
-                        mult_abc = mult_a * t_nf[c, p[0][0]]
-                        mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
-                        mult_abc_2 = mult_abc * t_nnn[a, b, c]
+                        tmp_abc = tmp_ab * t_nnn[a, b, c]
 
                         for d in self.mwh.included_modes:
-                            mult_abcd = t_nf[d, p[1][0]]
+                            tmp_abcd = tmp_abc * t_nf[d, p[2][0]]
 
-                            tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
-                            tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
+                            for e in self.mwh.included_modes:
+                                tmp_abcde = tmp_abcd * t_nf[e, p[3][0]] * t_nnn[c, d, e]
 
-                            for f in frequencies:
-                                ws = p[0][1] * f
-                                values[f] -= \
-                                    (tmp1 + Shaker.lambda_(
-                                        ws, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp2) * \
-                                    self.lambda_(ws, self.mwh.frequencies[c]) * \
-                                    self.lambda_(ws, self.mwh.frequencies[d])
+                                values += tmp_abcde * lambda_0[a] * lambda_1[b] * lambda_23[c] * \
+                                    lambda_2[d] * lambda_3[e]
 
-        for f in frequencies:
-            values[f] *= -1 / 8 * multiplier
+        values *= 1 / 8 * multiplier
 
         return values
 
-    def _compute_F_FF__0_0_component(self, coo, input_fields, frequencies, t_nf, t_nff):
-        """Compute a component of the :math:`[\\mu\\alpha]^{0,0}` contribution
+    def _compute_FF_FF__1_1_component(self, coo, input_fields, frequencies, t_nff, t_nnff, t_nnn):
+        """Compute a component of the :math:`[\\alpha^2]^{1,1}` contribution
 
         .. math::
 
             \\begin{align}
-            [\\mu\\alpha]^{0,0} &= \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_a
-            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\alpha_{jk}}{Q_a}\\,\\lb{\\sigma}{a}
+            [\\alpha^2]^{1,1} &= -\\frac{1}{16}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc} F_{abc}\\,
+            \\tdiff{^2\\alpha_{ij}}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{kl}}{Q_c}\\,
+            \\lb{23}{ab}\\,\\lb{23}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1})\\\\
+            &+ F_{bcc}\\,\\tdiff{^2\\alpha_{ij}}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{kl}}{Q_a}\\,
+            \\lb{23}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}
             \\end{align}
 
         :param coo: coordinates
@@ -1122,86 +3330,93 @@ class Shaker:
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nf: ``NF`` components
-        :type t_nf: numpy.ndarray
+        :type frequencies: numpy.ndarray
         :param t_nff: ``NFF`` components
         :type t_nff: numpy.ndarray
-        :rtype: list of float
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
         """
-        values = {}
 
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
+        h = self._nnn_trace(t_nnn, self._inverse_vibrational_frequencies())
+        w_nnff = self._weighted_by_inverse_frequencies(t_nnff)
+
         for p in unique_elemts:
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+            lambda2_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies, 2)
+
             for a in self.mwh.included_modes:
-                tmp = t_nf[a, p[0][0]] * t_nff[a, p[1][0], p[2][0]]
-                for f in frequencies:
-                    values[f] += Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * tmp
+                for b in self.mwh.included_modes:
+
+                    tmp_ab1 = w_nnff[a, b, p[0][0], p[1][0]]
+                    tmp_ab2 = self.mwh.frequencies[b] ** -2 * \
+                        t_nnff[a, b, p[0][0], p[1][0]] * t_nff[a, p[2][0], p[3][0]] * h[b]
+
+                    for c in self.mwh.included_modes:
+                        tmp1 = tmp_ab1 * t_nff[c, p[2][0], p[3][0]] * t_nnn[a, b, c]
+                        values += lambda2_23[a, b] * lambda_23[c] * tmp1
 
-        for f in frequencies:
-            values[f] *= 1 / 2 * multiplier
+                    values += lambda_23[a] * tmp_ab2
+
+        values *= - 1 / 16 * multiplier
 
         return values
 
-    def _compute_F_FF__2_0_component(self, coo, input_fields, frequencies, t_nnf, t_nnff):
-        """Compute a component of the :math:`[\\mu\\alpha]^{2,0}` contribution
+    def _compute_FF_FF__2_0_component(self, coo, input_fields, frequencies, t_nnff):
+        """Compute a component of the :math:`[\\alpha^2]^{2,0}` contribution
 
-        .. math::
+         .. math::
 
             \\begin{align}
-            [\\mu\\alpha]^{2,0} &= \\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{ab}
-            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\,
-            \\lb{\\sigma}{ab}\\,\\omega_a^{-1}
+            [\\alpha^2]^{2,0} &= \\frac{1}{16}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{ab}
+            \\tdiff{^2\\alpha_{ij}}{Q_a\\partial Q_b}\\tdiff{^2\\alpha_{kl}}{Q_a\\partial Q_b}
+            \\,\\lb{23}{ab}\\,\\omega_a^{-1}
             \\end{align}
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
-        :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nnf: ``NNF`` components
-        :type t_nnf: numpy.ndarray
-        :param t_nnff: ``NNFF`` components
-        :type t_nnff: numpy.ndarray
-        :rtype: list of float
-        """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+         :param coo: coordinates
+         :type coo: tuple|list
+         :param input_fields: input fields
+         :type input_fields: tuple|list
+         :param frequencies: the frequencies
+         :type frequencies: numpy.ndarray
+         :param t_nnff: ``NNFF`` components
+         :type t_nnff: numpy.ndarray
+         :rtype: numpy.ndarray
+         """
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
+            lambda2_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies, 2)
+
             for a in self.mwh.included_modes:
                 for b in self.mwh.included_modes:
 
-                    tmp = 1 / self.mwh.frequencies[a] * t_nnf[a, b, p[0][0]] * t_nnff[a, b, p[1][0], p[2][0]]
+                    tmp = 1 / self.mwh.frequencies[a] * t_nnff[a, b, p[0][0], p[1][0]] * t_nnff[a, b, p[2][0], p[3][0]]
 
-                    for f in frequencies:
-                        values[f] += \
-                            Shaker.lambda_(p[0][1] * f, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp
+                    values += lambda2_23[a, b] * tmp
 
-        for f in frequencies:
-            values[f] *= 1 / 4 * multiplier
+        values *= 1 / 16 * multiplier
 
         return values
 
-    def _compute_F_FF__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nff, t_nnn):
-        """Compute a component of the :math:`[\\mu\\alpha]^{0,2}` contribution
+    def _compute_FF_FF__0_2_component(self, coo, input_fields, frequencies, t_nff, t_nnn):
+        """Compute a component of the :math:`[\\alpha^2]^{0,2}` contribution
 
         .. math::
 
             \\begin{align}
-            [\\mu\\alpha]^{0,2} &= \\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{abcd}
-            \\tdiff{\\mu_i}{Q_c}\\tdiff{\\alpha_{jk}}{Q_d}\\times\\\\
-            &\\left[ F_{aab}\\,F_{bcd}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\,\\omega_b^{-2}
-            +2\\,F_{abc}\\,F_{abd}\\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\right]
+            [\\alpha^2]^{0,2} &= \\frac{1}{32}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcd}
+            \\tdiff{\\alpha_{ij}}{Q_c}\\tdiff{\\alpha_{kl}}{Q_d}\\,
+            \\left[F_{aab}\\,F_{bcd}\\,\\lb{23}{c}\\lb{\\sigma}{d}\\,\\omega_b^{-2}
+            +2\\,F_{abc}\\,F_{abd}\\,\\lb{23}{ab}\\,\\lb{23}{c}\\,\\lb{\\sigma}{d}\\right]
             \\end{align}
 
         :param coo: coordinates
@@ -1209,23 +3424,22 @@ class Shaker:
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nf: ``NF`` components
-        :type t_nf: numpy.ndarray
+        :type frequencies: numpy.ndarray
         :param t_nff: ``NFF`` components
         :type t_nff: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies)
+            lambda2_23 = self.lambda_cache(p[2][1] + p[3][1], frequencies, 2)
+
             for a in self.mwh.included_modes:
                 mult_a = 1 / self.mwh.frequencies[a]
                 for b in self.mwh.included_modes:
@@ -1233,43 +3447,35 @@ class Shaker:
 
                     for c in self.mwh.included_modes:
 
-                        mult_abc = mult_a * t_nf[c, p[0][0]]
+                        mult_abc = mult_a * t_nff[c, p[0][0], p[1][0]]
                         mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
                         mult_abc_2 = mult_abc * t_nnn[a, b, c]
 
                         for d in self.mwh.included_modes:
-                            mult_abcd = t_nff[d, p[1][0], p[2][0]]
+                            mult_abcd = t_nff[d, p[2][0], p[3][0]]
 
                             tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
                             tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
 
-                            for f in frequencies:
-                                ws = p[0][1] * f
-                                values[f] -= \
-                                    (tmp1 + Shaker.lambda_(
-                                        ws, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp2) * \
-                                    self.lambda_(ws, self.mwh.frequencies[c]) * \
-                                    self.lambda_(ws, self.mwh.frequencies[d])
+                            values -= (tmp1 + lambda2_23[a, b] * tmp2) * lambda_23[c] * lambda_0[d]
 
-        for f in frequencies:
-            values[f] *= -1 / 8 * multiplier
+        values *= -1 / 32 * multiplier
 
         return values
 
-    def _compute_F_FF__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nff, t_nnff, t_nnn):
-        """Compute a component of the :math:`[\\mu\\alpha]^{1,1}` contribution
+    def _compute_F_FFF__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nfff, t_nnfff, t_nnn):
+        """Compute a component of the :math:`[\\mu\\beta]^{1,1}` contribution
 
         .. math::
 
             \\begin{align}
-            [\\mu\\alpha]^{1,1} &= -\\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ij}} \\sum_{abc}
-            F_{abc}\\times\\\\
-            &\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{jk}}{Q_c}+
-            \\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_c}\\right]\\times\\\\
-            &\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1}) \\\\
-            &+ F_{bcc}\\,\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{jk}}{Q_a}
-            +\\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_a}\\right]\\times\\\\
-            &\\lb{\\sigma}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}
+            [\\mu\\beta]^{1,1} &= -\\frac{1}{24}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc}
+            \\left\\{ F_{abc}\\,\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\beta_{jkl}}{Q_c}
+            +\\tdiff{^2\\beta_{jkl}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_c}\\right]
+            \\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1})\\right.\\\\
+            &\\left.+ F_{bcc}\\,\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\beta_{jkl}}{Q_a}
+            +\\tdiff{^2\\beta_{jkl}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_a}\\right]
+            \\,\\lb{\\sigma}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}\\right\\}
             \\end{align}
 
         :param coo: coordinates
@@ -1277,113 +3483,107 @@ class Shaker:
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
         :param t_nnf: ``NNF`` components
         :type t_nnf: numpy.ndarray
-        :param t_nnff: ``NNFF`` components
-        :type t_nnff: numpy.ndarray
+        :param t_nnfff: ``NNFFF`` components
+        :type t_nnfff: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
-        :param t_nff: ``NFF`` components
-        :type t_nff: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
+        h = self._nnn_trace(t_nnn, self._inverse_vibrational_frequencies())
+        w_nnf = self._weighted_by_inverse_frequencies(t_nnf)
+        w_nnfff = self._weighted_by_inverse_frequencies(t_nnfff)
+
         for p in unique_elemts:
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
+
             for a in self.mwh.included_modes:
                 for b in self.mwh.included_modes:
 
-                    f_ab1 = (1 / self.mwh.frequencies[a] + 1 / self.mwh.frequencies[b])
                     f_ab2 = self.mwh.frequencies[b] ** -2
 
-                    tmp_ab1 = f_ab1 * t_nnf[a, b, p[0][0]]
-                    tmp_ab3 = f_ab1 * t_nnff[a, b, p[1][0], p[2][0]]
+                    tmp_ab1 = w_nnf[a, b, p[0][0]]
+                    tmp_ab3 = w_nnfff[a, b, p[1][0], p[2][0], p[3][0]]
 
-                    e_1 = t_nnf[a, b, p[0][0]] * t_nff[a, p[1][0], p[2][0]]
-                    e_1 += t_nnff[a, b, p[1][0], p[2][0]] * t_nf[a, p[0][0]]
+                    e = t_nnf[a, b, p[0][0]] * t_nfff[a, p[1][0], p[2][0], p[3][0]]
+                    e += t_nnfff[a, b, p[1][0], p[2][0], p[3][0]] * t_nf[a, p[0][0]]
 
-                    tmp_ab2 = f_ab2 * e_1
+                    tmp_ab2 = f_ab2 * e * h[b]
 
                     for c in self.mwh.included_modes:
-                        tmp1 = (tmp_ab1 * t_nff[c, p[1][0], p[2][0]] + tmp_ab3 * t_nf[c, p[0][0]]) * t_nnn[a, b, c]
-                        tmp2 = tmp_ab2 * t_nnn[b, c, c] * self.mwh.frequencies[c] ** -1
-
-                        for f in frequencies:
-                            ws = p[0][1] * f
-                            fr_1 = Shaker.lambda_(ws, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * \
-                                Shaker.lambda_(ws, self.mwh.frequencies[c])
+                        tmp1 = (tmp_ab1 * t_nfff[c, p[1][0], p[2][0], p[3][0]] + tmp_ab3 * t_nf[c, p[0][0]]) * \
+                            t_nnn[a, b, c]
+                        values += lambda2_0[a, b] * lambda_0[c] * tmp1
 
-                            values[f] += (fr_1 * tmp1 + Shaker.lambda_(ws, self.mwh.frequencies[a]) * tmp2)
+                    values += lambda_0[a] * tmp_ab2
 
-        for f in frequencies:
-            values[f] *= - 1 / 8 * multiplier
+        values *= - 1 / 24 * multiplier
 
         return values
 
-    def _compute_F_F_F__1_0_component(self, coo, input_fields, frequencies, t_nf, t_nnf):
-        """Compute a component of the :math:`[\\mu^3]^{1,0}` contribution
+    def _compute_F_FFF__2_0_component(self, coo, input_fields, frequencies, t_nnf, t_nnfff):
+        """Compute a component of the :math:`[\\mu\\beta]^{2,0}` contribution
 
-        .. math::
+         .. math::
 
             \\begin{align}
-            [\\mu^3]^{1,0} &= \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{ab}
-            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,
-            \\tdiff{\\mu_k}{Q_b}\\,\\lb{\\sigma}{a}\\,\\lb{2}{b}
+            [\\mu\\beta]^{2,0} &= \\frac{1}{12}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{ab}
+            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\tdiff{^2\\beta_{jkl}}{Q_a\\partial Q_b}\\,
+            \\lb{\\sigma}{ab}\\,\\omega_a^{-1}
             \\end{align}
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
-        :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nnf: ``NNF`` components
-        :type t_nnf: numpy.ndarray
-        :param t_nf: ``NF`` components
-        :type t_nf: numpy.ndarray
-        :rtype: list of float
-        """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+         :param coo: coordinates
+         :type coo: tuple|list
+         :param input_fields: input fields
+         :type input_fields: tuple|list
+         :param frequencies: the frequencies
+         :type frequencies: numpy.ndarray
+         :param t_nnf: ``NNF`` components
+         :type t_nnf: numpy.ndarray
+         :param t_nnfff: ``NNFFF`` components
+         :type t_nnfff: numpy.ndarray
+         :rtype: numpy.ndarray
+         """
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
 
+            for a in self.mwh.included_modes:
                 for b in self.mwh.included_modes:
-                    tmp_ab = tmp_a * t_nnf[a, b, p[1][0]] * t_nf[b, p[2][0]]
 
-                    for f in frequencies:
-                        values[f] += \
-                            Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                            Shaker.lambda_(p[2][1] * f, self.mwh.frequencies[b]) * tmp_ab
+                    tmp = 1 / self.mwh.frequencies[a] * t_nnf[a, b, p[0][0]] * \
+                        t_nnfff[a, b, p[1][0], p[2][0], p[3][0]]
+
+                    values += lambda2_0[a, b] * tmp
 
-        for f in frequencies:
-            values[f] *= 1 / 2 * multiplier
+        values *= 1 / 12 * multiplier
 
         return values
 
-    def _compute_F_F_F__0_1_component(self, coo, input_fields, frequencies, t_nf, t_nnn):
-        """Compute a component of the :math:`[\\mu^3]^{0,1}` contribution
+    def _compute_F_FFF__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nfff, t_nnn):
+        """Compute a component of the :math:`[\\mu\\beta]^{0,2}` contribution
 
         .. math::
 
             \\begin{align}
-            [\\mu^3]^{0,1} &= -\\frac{1}{6}\\,\\sum_{\\mathcal{P}_{ijk}} \\sum_{abc} F_{abc}
-            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\mu_j}{Q_b}\\,\\tdiff{\\mu_k}{Q_c}\\,
-            \\lb{\\sigma}{a}\\,\\lb{1}{b}\\,\\lb{2}{c}
+            [\\mu\\beta]^{0,2} &= \\frac{1}{24}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcd}
+            \\tdiff{\\mu_i}{Q_c}\\tdiff{\\beta_{jkl}}{Q_d}\\times\\\\
+            &\\left[F_{aab}\\,F_{bcd}\\,\\lb{\\sigma}{c}\\lb{\\sigma}{d}\\,\\omega_b^{-2}
+            +2\\,F_{abc}\\,F_{abd}\\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\right]
             \\end{align}
 
         :param coo: coordinates
@@ -1391,734 +3591,933 @@ class Shaker:
         :param input_fields: input fields
         :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
-
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.zeros(len(frequencies))
 
         multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
         for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
+            lambda_0 = self.lambda_cache(p[0][1], frequencies)
+            lambda2_0 = self.lambda_cache(p[0][1], frequencies, 2)
 
+            for a in self.mwh.included_modes:
+                mult_a = 1 / self.mwh.frequencies[a]
                 for b in self.mwh.included_modes:
-                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
+                    mult_ab = self.mwh.frequencies[b] ** -2
 
                     for c in self.mwh.included_modes:
 
-                        tmp_abc = tmp_ab * t_nf[c, p[2][0]] * t_nnn[a, b, c]
+                        mult_abc = mult_a * t_nf[c, p[0][0]]
+                        mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
+                        mult_abc_2 = mult_abc * t_nnn[a, b, c]
+
+                        for d in self.mwh.included_modes:
+                            mult_abcd = t_nfff[d, p[1][0], p[2][0], p[3][0]]
+
+                            tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
+                            tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
 
-                        for f in frequencies:
-                            values[f] += \
-                                Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                                Shaker.lambda_(p[1][1] * f, self.mwh.frequencies[b]) * \
-                                Shaker.lambda_(p[2][1] * f, self.mwh.frequencies[c]) * tmp_abc
+                            values -= (tmp1 + lambda2_0[a, b] * tmp2) * lambda_0[c] * lambda_0[d]
 
-        for f in frequencies:
-            values[f] *= -1 / 6 * multiplier
+        values *= -1 / 24 * multiplier
 
         return values
 
-    def _compute_FF_FF__0_0_component(self, coo, input_fields, frequencies, t_nff):
-        """Compute a component of the :math:`[\\alpha^2]^{0,0}` contribution
-
-        .. math::
+    # --------------------------------------------
+    # BELOW, CONTRACTIONS FOR THE TENSOR ENGINE:
+    #    (so, internal stuffs, see the
+    #     corresponding _compute_*_component()
+    #     for the formulas)
+    # --------------------------------------------
 
-            [\\alpha^2]^{0,0} = \\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_a
-            \\tdiff{\\alpha_{ij}}{Q_a}\\,\\tdiff{\\alpha_{kl}}{Q_a}\\,\\lb{23}{a}
+    def _nnn_contraction(self, frequencies, t_nnn, t, weight):
+        """Compute :math:`A_{ab\\ldots} = \\sum_c F_{abc}\\,\\lambda_c\\,t_{c\\ldots}` (stored in the intermediates)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nff: ``NFF`` components
-        :type t_nff: numpy.ndarray
-        :rtype: list of float
+        :type frequencies: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray|_ScreenedCubicForceField
+        :param t: tensor of which the first axis runs over the modes
+        :type t: numpy.ndarray
+        :param weight: multiple of the frequency
+        :type weight: int
+        :return: a tensor, with axes over the frequencies, ``a``, ``b``, then the other ones of ``t``
+        :rtype: numpy.ndarray
         """
 
-        values = {}
+        def compute():
+            u = _scale_modes_per_frequency(t, self._lambdas(weight, frequencies))
+            return numpy.moveaxis(_contract_nnn(t_nnn, numpy.moveaxis(u, 0, 1)), 2, 0)
 
-        for f in frequencies:
-            values[f] = .0
+        return self.intermediates(('F_abc λ_c t_c', weight, tuple(frequencies)), compute, t_nnn, t)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+    def _nnn_trace(self, t_nnn, w):
+        """Compute :math:`h_b = \\sum_a F_{aab}\\,w_a` (stored in the intermediates)
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp = t_nff[a, p[0][0], p[1][0]] * t_nff[a, p[2][0], p[3][0]]
-                for f in frequencies:
-                    values[f] += Shaker.lambda_((p[2][1] * f, p[3][1] * f), self.mwh.frequencies[a]) * tmp
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray|_ScreenedCubicForceField
+        :param w: vector over the modes (generally :math:`\\omega_a^{-1}`)
+        :type w: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        for f in frequencies:
-            values[f] *= 1 / 8 * multiplier
+        return self.intermediates(('F_aab w_a', tuple(w)), lambda: _trace_nnn(t_nnn, w), t_nnn)
 
-        return values
+    def _lambdas(self, weight, frequencies, order=1):
+        """Get :math:`\\lambda^{\\sigma}_{ab\\ldots}` for the included modes (see ``LambdaCache.included()``), with
+        the frequencies as first axis
 
-    def _compute_F_FFF__0_0_component(self, coo, input_fields, frequencies, t_nf, t_nfff):
-        """Compute a component of the :math:`[\\mu\\beta]^{0,0}` contribution
+        :param weight: multiple of the frequency
+        :type weight: int
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param order: number of vibrational frequencies that are summed
+        :type order: int
+        :return: an array of shape ``(len(frequencies), ) + (n, ) * order``
+        :rtype: numpy.ndarray
+        """
 
-        .. math::
+        return numpy.moveaxis(self.lambda_cache.included(weight, frequencies, order), -1, 0)
 
-            [\\mu\\beta]^{0,0} = \\frac{1}{6}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_a
-            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\beta_{jkl}}{Q_a}\\,\\lb{\\sigma}{a}
+    def _inverse_vibrational_frequencies(self):
+        """Get :math:`\\omega_a^{-1}` for the included modes, and zero for the other ones
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
-        :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nf: ``NF`` components
-        :type t_nf: numpy.ndarray
-        :param t_nfff: ``NFFF`` components
-        :type t_nfff: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
 
-        values = {}
+        modes = list(self.mwh.included_modes)
+        inverse_frequencies = numpy.zeros(len(self.mwh.frequencies))
+        inverse_frequencies[modes] = 1 / numpy.array(self.mwh.frequencies)[modes]
 
-        for f in frequencies:
-            values[f] = .0
+        return inverse_frequencies
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
-
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp = t_nf[a, p[0][0]] * t_nfff[a, p[1][0], p[2][0], p[3][0]]
-                for f in frequencies:
-                    values[f] += Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * tmp
+    def _weighted_by_inverse_frequencies(self, t_nnx):
+        """Compute :math:`(\\omega_a^{-1}+\\omega_b^{-1})\\,t_{ab\\ldots}` (stored in the intermediates)
 
-        for f in frequencies:
-            values[f] *= 1 / 6 * multiplier
+        :param t_nnx: tensor of which the two first axes run over the modes (as in ``mwh.frequencies``)
+        :type t_nnx: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        return values
+        w = self._inverse_vibrational_frequencies()
 
-    def _compute_F_F_FF__1_0_component(self, coo, input_fields, frequencies, t_nf, t_nff, t_nnf, t_nnff):
-        """Compute a component of the :math:`[\\mu^2\\alpha]^{1,0}` contribution
+        def compute():
+            k_ab = numpy.add.outer(w, w)
+            return t_nnx * k_ab.reshape(k_ab.shape + (1, ) * (t_nnx.ndim - 2))
 
-        .. math::
+        return self.intermediates(('(1/ω_a+1/ω_b) t_ab', tuple(w)), compute, t_nnx)
 
-            \\begin{align}
-            [\\mu^2\\alpha]^{1,0} &= \\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{ab}
-            \\left\\{\\tdiff{\\mu_i}{Q_a}\\,\\tdiff{^2\\alpha_{jk}}{Q_a\\partial Q_b}\\tdiff{\\mu_l}{Q_b}
-            \\lb{\\sigma}{a}\\,\\lb{3}{b}\\right.\\nonumber\\\\
-            &+\\left.2\\,\\tdiff{\\mu_i}{Q_a}\\,\\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{kl}}{Q_b}
-            \\lb{\\sigma}{a}\\,\\lb{23}{b}\\right\\}
-            \\end{align}
+    def _factorized_nnn(self, frequencies, t_nnn, u, weight_u, v, weight_v):
+        """Compute :math:`\\sum_{ab} F_{abc}\\,\\lambda_a\\,u_{a\\ldots}\\,\\lambda_b\\,v_{b\\ldots}`
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nff: ``NFF`` components
-        :type t_nff: numpy.ndarray
-        :param t_nfff: ``NFFF`` components
-        :type t_nfff: numpy.ndarray
-        :param t_nnf: ``NNF`` components
-        :type t_nnf: numpy.ndarray
-        :param t_nnff: ``NNFF`` components
-        :type t_nnff: numpy.ndarray
-        :rtype: list of float
+        :type frequencies: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray|_ScreenedCubicForceField
+        :param u: tensor of which the first axis runs over the modes
+        :type u: numpy.ndarray
+        :param weight_u: multiple of the frequency for :math:`\\lambda_a`
+        :type weight_u: int
+        :param v: tensor of which the first axis runs over the modes
+        :type v: numpy.ndarray
+        :param weight_v: multiple of the frequency for :math:`\\lambda_b`
+        :type weight_v: int
+        :return: a tensor, with axes over the frequencies, ``c``, then the ones of ``u`` and ``v``
+        :rtype: numpy.ndarray
         """
 
-        values = {}
+        l_b = self._lambdas(weight_v, frequencies)
 
-        for f in frequencies:
-            values[f] = .0
+        return _contract_modes_per_frequency(
+            self._nnn_contraction(frequencies, t_nnn, u, weight_u), _scale_modes_per_frequency(v, l_b))
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+    def _factorized_1_1(self, frequencies, omega, t_nnn, weight, p, q):
+        """Compute the common part of the :math:`[]^{1,1}` contributions
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
-                for b in self.mwh.included_modes:
-                    tmp_ab_1 = tmp_a * t_nnff[a, b, p[1][0], p[2][0]] * t_nf[b, p[3][0]]
-                    tmp_ab_2 = tmp_a * t_nnf[a, b, p[1][0]] * t_nff[b, p[2][0], p[3][0]]
-                    for f in frequencies:
-                        values[f] += \
-                            Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                            Shaker.lambda_(p[3][1] * f, self.mwh.frequencies[b]) * \
-                            tmp_ab_1
-                        values[f] += 2 * \
-                            Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                            Shaker.lambda_((p[2][1] * f, p[3][1] * f), self.mwh.frequencies[b]) * \
-                            tmp_ab_2
-
-        for f in frequencies:
-            values[f] *= 1 / 4 * multiplier
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray|_ScreenedCubicForceField
+        :param weight: multiple of the frequency for the :math:`\\lambda`
+        :type weight: int
+        :param p: tensor of which the two first axes run over the modes
+        :type p: numpy.ndarray
+        :param q: tensor of which the first axis runs over the modes
+        :type q: numpy.ndarray
+        :return: a tensor, with axes over the frequencies, then the ones of ``p`` and then the ones of ``q``
+        :rtype: numpy.ndarray
+        """
 
-        return values
+        l_a = self._lambdas(weight, frequencies)
+        l_ab = self._lambdas(weight, frequencies, 2)
 
-    def _compute_F_F_FF__0_1_component(self, coo, input_fields, frequencies, t_nf, t_nff, t_nnn):
-        """Compute a component of the :math:`[\\mu^2\\alpha]^{0,1}` contribution
+        k_ab = numpy.add.outer(1 / omega, 1 / omega) * l_ab
+        a_ab = self._nnn_contraction(frequencies, t_nnn, q, weight)
+        values = numpy.moveaxis(numpy.tensordot(
+            p, a_ab * k_ab.reshape(k_ab.shape + (1, ) * (q.ndim - 1)), axes=([0, 1], [1, 2])), p.ndim - 2, 0)
 
-        .. math::
+        h_b = self._nnn_trace(t_nnn, 1 / omega)
+        p_a = numpy.tensordot(p, omega ** -2 * h_b, axes=(1, 0))
+        values += numpy.tensordot(_scale_modes_per_frequency(p_a, l_a), q, axes=(1, 0))
 
-            [\\mu^2\\alpha]^{0,1} = -\\frac{1}{4}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc} F_{abc}\\,
-            \\tdiff{\\mu_j}{Q_b}\\,\\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\alpha_{jk}}{Q_c}\\,\\lb{\\sigma}{a}\\,
-            \\lb{1}{b}\\,\\lb{23}{c}
+        return values
+
+    def _factorized_0_2(self, frequencies, omega, t_nnn, weight, u, weight_u, w, weight_w):
+        """Compute the common part of the :math:`[]^{0,2}` contributions
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nff: ``NFF`` components
-        :type t_nff: numpy.ndarray
-        :param t_nfff: ``NFFF`` components
-        :type t_nfff: numpy.ndarray
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
         :param t_nnn: ``NNN`` components
-        :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :type t_nnn: numpy.ndarray|_ScreenedCubicForceField
+        :param weight: multiple of the frequency for :math:`\\lambda_{ab}`
+        :type weight: int
+        :param u: tensor of which the first axis runs over the modes
+        :type u: numpy.ndarray
+        :param weight_u: multiple of the frequency for :math:`\\lambda_c`
+        :type weight_u: int
+        :param w: tensor of which the first axis runs over the modes
+        :type w: numpy.ndarray
+        :param weight_w: multiple of the frequency for :math:`\\lambda_d`
+        :type weight_w: int
+        :return: a tensor, with axes over the frequencies, then the ones of ``u`` and then the ones of ``w``
+        :rtype: numpy.ndarray
         """
 
-        values = {}
+        l_ab = self._lambdas(weight, frequencies, 2)
+        l_c = self._lambdas(weight_u, frequencies)
+        l_d = self._lambdas(weight_w, frequencies)
 
-        for f in frequencies:
-            values[f] = .0
+        g_cd = self.intermediates(
+            ('F_bcd g_b', tuple(omega)),
+            lambda: _contract_nnn(t_nnn, self._nnn_trace(t_nnn, 1 / omega) * omega ** -2),
+            t_nnn)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
-
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
-                for b in self.mwh.included_modes:
-                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
-                    for c in self.mwh.included_modes:
-                        tmp_abc = tmp_ab * t_nff[c, p[2][0], p[3][0]] * t_nnn[a, b, c]
-                        for f in frequencies:
-                            values[f] += \
-                                Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                                Shaker.lambda_(p[1][1] * f, self.mwh.frequencies[b]) * \
-                                Shaker.lambda_((p[2][1] * f, p[3][1] * f), self.mwh.frequencies[c]) * \
-                                tmp_abc
+        values = _contract_modes_per_frequency(
+            numpy.moveaxis(numpy.tensordot(g_cd, _scale_modes_per_frequency(u, l_c), axes=(0, 1)), 1, 0),
+            _scale_modes_per_frequency(w, l_d))
 
-        for f in frequencies:
-            values[f] *= -1 / 4 * multiplier
+        k_ab = 2 * l_ab / omega[:, numpy.newaxis]
+        a_ab = self._nnn_contraction(frequencies, t_nnn, u, weight_u)
+        b_ab = self._nnn_contraction(frequencies, t_nnn, w, weight_w)
+        n = len(omega)
+        values += _contract_modes_per_frequency(
+            (a_ab * k_ab.reshape(k_ab.shape + (1, ) * (u.ndim - 1))).reshape((len(frequencies), n * n) + u.shape[1:]),
+            b_ab.reshape((len(frequencies), n * n) + w.shape[1:]))
 
         return values
 
-    def _compute_F_F_F_F__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nnn):
-        """Compute a component of the :math:`[\\mu^4]^{1,1}` contribution
+    def _contract_F_F__0_0(self, fields, frequencies, omega, t_nf):
+        """Compute the :math:`[\\mu^2]^{0,0}` contribution (without permutations)
 
-        .. math::
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-            [\\mu^4]^{1,1} = -\\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcd}\\,F_{abc}
-            \\tdiff{\\mu_i}{Q_a}\\,\\tdiff{\\mu_j}{Q_b}\\,\\tdiff{^2\\mu_k}{Q_c\\partial Q_d}\\,\\tdiff{\\mu_l}{Q_d}
-            \\times\\\\\\lb{\\sigma}{a}\\,\\lb{1}{b}\\,\\lb{23}{c}\\,\\lb{3}{d}
+        l_a = self._lambdas(fields[0], frequencies)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
+        return 1 / 2 * numpy.einsum('wa,ai,aj->wij', l_a, t_nf, t_nf, optimize=True)
+
+    def _contract_F_F__1_1(self, fields, frequencies, omega, t_nf, t_nnf, t_nnn):
+        """Compute the :math:`[\\mu^2]^{1,1}` contribution (without permutations)
+
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
         :param t_nnf: ``NNF`` components
         :type t_nnf: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
 
-        values = {}
+        return -1 / 4 * self._factorized_1_1(frequencies, omega, t_nnn, fields[0], t_nnf, t_nf)
 
-        for f in frequencies:
-            values[f] = .0
+    def _contract_F_F__2_0(self, fields, frequencies, omega, t_nnf):
+        """Compute the :math:`[\\mu^2]^{2,0}` contribution (without permutations)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
+        l_ab = self._lambdas(fields[0], frequencies, 2)
 
-                for b in self.mwh.included_modes:
-                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
+        return 1 / 4 * numpy.einsum('wab,a,abi,abj->wij', l_ab, 1 / omega, t_nnf, t_nnf, optimize=True)
 
-                    for c in self.mwh.included_modes:
-                        for d in self.mwh.included_modes:
-                            tmp_abcd = tmp_ab * t_nnn[a, b, c] * t_nf[d, p[3][0]] * t_nnf[c, d, p[2][0]]
+    def _contract_F_F__0_2(self, fields, frequencies, omega, t_nf, t_nnn):
+        """Compute the :math:`[\\mu^2]^{0,2}` contribution (without permutations)
 
-                            for f in frequencies:
-                                values[f] += \
-                                    Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                                    Shaker.lambda_(p[1][1] * f, self.mwh.frequencies[b]) * \
-                                    Shaker.lambda_((p[2][1] * f, p[3][1] * f), self.mwh.frequencies[c]) * \
-                                    Shaker.lambda_(p[3][1] * f, self.mwh.frequencies[d]) * tmp_abcd
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        for f in frequencies:
-            values[f] *= -1 / 2 * multiplier
+        return 1 / 8 * self._factorized_0_2(frequencies, omega, t_nnn, fields[0], t_nf, fields[0], t_nf, fields[0])
 
-        return values
+    def _contract_F_FF__0_0(self, fields, frequencies, omega, t_nf, t_nff):
+        """Compute the :math:`[\\mu\\alpha]^{0,0}` contribution (without permutations)
 
-    def _compute_F_F_F_F__2_0_component(self, coo, input_fields, frequencies, t_nf, t_nnf):
-        """Compute a component of the :math:`[\\mu^4]^{2,0}` contribution
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-         .. math::
+        l_a = self._lambdas(fields[0], frequencies)
 
-            \\begin{align}
-            [\\mu^4]^{2,0} &= \\frac{1}{2}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc}
-            \\,F_{abc}\\,\\tdiff{\\mu_i}{Q_a}\\, \\tdiff{^2\\mu_j}{Q_a\\partial Q_b}\\,
-            \\tdiff{^2\\mu_k}{Q_b\\partial Q_c}\\,\\tdiff{\\mu_l}{Q_c}
-            \\,\\lb{\\sigma}{a}\\,\\lb{23}{b}\\,\\lb{\\sigma}{3}
-            \\end{align}
+        return 1 / 2 * numpy.einsum('wa,ai,ajk->wijk', l_a, t_nf, t_nff, optimize=True)
 
-         :param coo: coordinates
-         :type coo: tuple|list
-         :param input_fields: input fields
-         :type input_fields: tuple|list
-         :param frequencies: the frequencies
-         :type frequencies: list of float|str
-         :param t_nf: ``NNF`` components
-         :type t_nf: numpy.ndarray
-         :param t_nnf: ``NNF`` components
-         :type t_nnf: numpy.ndarray
-         :rtype: list of float
-         """
-        values = {}
+    def _contract_F_FF__2_0(self, fields, frequencies, omega, t_nnf, t_nnff):
+        """Compute the :math:`[\\mu\\alpha]^{2,0}` contribution (without permutations)
+
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        for f in frequencies:
-            values[f] = .0
+        l_ab = self._lambdas(fields[0], frequencies, 2)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+        return 1 / 4 * numpy.einsum('wab,a,abi,abjk->wijk', l_ab, 1 / omega, t_nnf, t_nnff, optimize=True)
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
-                for b in self.mwh.included_modes:
-                    tmp_ab = tmp_a * t_nnf[a, b, p[1][0]]
-                    for c in self.mwh.included_modes:
-                        tmp_abc = tmp_ab * t_nnf[b, c, p[2][0]] * t_nf[c, p[3][0]]
+    def _contract_F_FF__0_2(self, fields, frequencies, omega, t_nf, t_nff, t_nnn):
+        """Compute the :math:`[\\mu\\alpha]^{0,2}` contribution (without permutations)
+
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                        for f in frequencies:
-                            values[f] += \
-                                Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                                Shaker.lambda_((p[2][1] * f, p[3][1] * f), self.mwh.frequencies[b]) * \
-                                Shaker.lambda_(p[3][1] * f, self.mwh.frequencies[c]) * tmp_abc
+        return 1 / 8 * self._factorized_0_2(frequencies, omega, t_nnn, fields[0], t_nf, fields[0], t_nff, fields[0])
 
-        for f in frequencies:
-            values[f] *= 1 / 2 * multiplier
+    def _contract_F_FF__1_1(self, fields, frequencies, omega, t_nf, t_nnf, t_nff, t_nnff, t_nnn):
+        """Compute the :math:`[\\mu\\alpha]^{1,1}` contribution (without permutations)
 
-        return values
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-    def _compute_F_F_F_F__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nnn):
-        """Compute a component of the :math:`[\\mu^4]^{0,2}` contribution
+        values = self._factorized_1_1(frequencies, omega, t_nnn, fields[0], t_nnf, t_nff)
+        values += self._factorized_1_1(frequencies, omega, t_nnn, fields[0], t_nnff, t_nf).transpose(0, 3, 1, 2)
 
-        .. math::
+        return -1 / 8 * values
 
-            \\begin{align}
-            [\\mu^4]^{0,2} &= \\frac{1}{8}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcde}
-            \\,F_{abc}\\,F_{cde}\\,\\tdiff{\\mu_i}{Q_a}\\, \\tdiff{\\mu_j}{Q_b}\\,
-            \\tdiff{\\mu_k}{Q_d}\\,\\tdiff{\\mu_l}{Q_e}
-            \\,\\lb{\\sigma}{a}\\,\\lb{1}{b}\\,\\lb{23}{c}\\,\\lb{2}{d}\\,\\lb{3}{e}
-            \\end{align}
+    def _contract_F_F_F__1_0(self, fields, frequencies, omega, t_nf, t_nnf):
+        """Compute the :math:`[\\mu^3]^{1,0}` contribution (without permutations)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        l_a = self._lambdas(fields[0], frequencies)
+        l_b = self._lambdas(fields[2], frequencies)
+
+        return 1 / 2 * numpy.einsum('wa,wb,ai,abj,bk->wijk', l_a, l_b, t_nf, t_nnf, t_nf, optimize=True)
+
+    def _contract_F_F_F__0_1(self, fields, frequencies, omega, t_nf, t_nnn):
+        """Compute the :math:`[\\mu^3]^{0,1}` contribution (without permutations)
+
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
 
-        for f in frequencies:
-            values[f] = .0
+        l_c = self._lambdas(fields[2], frequencies)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+        f_cij = self._factorized_nnn(frequencies, t_nnn, t_nf, fields[0], t_nf, fields[1])
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                tmp_a = t_nf[a, p[0][0]]
-                for b in self.mwh.included_modes:
-                    tmp_ab = tmp_a * t_nf[b, p[1][0]]
+        values = _contract_modes_per_frequency(_scale_modes_per_frequency(t_nf, l_c), f_cij)
 
-                    for c in self.mwh.included_modes:
-                        tmp_abc = tmp_ab * t_nnn[a, b, c]
+        return -1 / 6 * values.transpose(0, 2, 3, 1)
 
-                        for d in self.mwh.included_modes:
-                            tmp_abcd = tmp_abc * t_nf[d, p[2][0]]
+    def _contract_FF_FF__0_0(self, fields, frequencies, omega, t_nff):
+        """Compute the :math:`[\\alpha^2]^{0,0}` contribution (without permutations)
 
-                            for e in self.mwh.included_modes:
-                                tmp_abcde = tmp_abcd * t_nf[e, p[3][0]] * t_nnn[c, d, e]
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                                for f in frequencies:
-                                    values[f] += tmp_abcde * \
-                                        Shaker.lambda_(p[0][1] * f, self.mwh.frequencies[a]) * \
-                                        Shaker.lambda_(p[1][1] * f, self.mwh.frequencies[b]) * \
-                                        Shaker.lambda_((p[2][1] * f, p[3][1] * f), self.mwh.frequencies[c]) * \
-                                        Shaker.lambda_(p[2][1] * f, self.mwh.frequencies[d]) * \
-                                        Shaker.lambda_(p[3][1] * f, self.mwh.frequencies[e])
+        l_a = self._lambdas(fields[2] + fields[3], frequencies)
 
-        for f in frequencies:
-            values[f] *= 1 / 8 * multiplier
+        return 1 / 8 * numpy.einsum('wa,aij,akl->wijkl', l_a, t_nff, t_nff, optimize=True)
 
-        return values
+    def _contract_F_FFF__0_0(self, fields, frequencies, omega, t_nf, t_nfff):
+        """Compute the :math:`[\\mu\\beta]^{0,0}` contribution (without permutations)
+
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-    def _compute_FF_FF__1_1_component(self, coo, input_fields, frequencies, t_nff, t_nnff, t_nnn):
-        """Compute a component of the :math:`[\\alpha^2]^{1,1}` contribution
+        l_a = self._lambdas(fields[0], frequencies)
 
-        .. math::
+        return 1 / 6 * numpy.einsum('wa,ai,ajkl->wijkl', l_a, t_nf, t_nfff, optimize=True)
 
-            \\begin{align}
-            [\\alpha^2]^{1,1} &= -\\frac{1}{16}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc} F_{abc}\\,
-            \\tdiff{^2\\alpha_{ij}}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{kl}}{Q_c}\\,
-            \\lb{23}{ab}\\,\\lb{23}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1})\\\\
-            &+ F_{bcc}\\,\\tdiff{^2\\alpha_{ij}}{Q_a\\partial Q_b}\\,\\tdiff{\\alpha_{kl}}{Q_a}\\,
-            \\lb{23}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}
-            \\end{align}
+    def _contract_F_F_FF__1_0(self, fields, frequencies, omega, t_nf, t_nff, t_nnf, t_nnff):
+        """Compute the :math:`[\\mu^2\\alpha]^{1,0}` contribution (without permutations)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
         :param t_nff: ``NFF`` components
         :type t_nff: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
         :param t_nnff: ``NNFF`` components
         :type t_nnff: numpy.ndarray
-        :param t_nnn: ``NNN`` components
-        :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
 
-        values = {}
+        l_a = self._lambdas(fields[0], frequencies)
+        l_b3 = self._lambdas(fields[3], frequencies)
+        l_b23 = self._lambdas(fields[2] + fields[3], frequencies)
 
-        for f in frequencies:
-            values[f] = .0
+        values = numpy.einsum('wa,wb,ai,abjk,bl->wijkl', l_a, l_b3, t_nf, t_nnff, t_nf, optimize=True)
+        values += 2 * numpy.einsum('wa,wb,ai,abj,bkl->wijkl', l_a, l_b23, t_nf, t_nnf, t_nff, optimize=True)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+        return 1 / 4 * values
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                for b in self.mwh.included_modes:
+    def _contract_F_F_FF__0_1(self, fields, frequencies, omega, t_nf, t_nff, t_nnn):
+        """Compute the :math:`[\\mu^2\\alpha]^{0,1}` contribution (without permutations)
 
-                    tmp_ab1 = (1 / self.mwh.frequencies[a] + 1 / self.mwh.frequencies[b]) * \
-                        t_nnff[a, b, p[0][0], p[1][0]]
-                    tmp_ab2 = self.mwh.frequencies[b] ** -2 * \
-                        t_nnff[a, b, p[0][0], p[1][0]] * t_nff[a, p[2][0], p[3][0]]
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                    for c in self.mwh.included_modes:
-                        tmp1 = tmp_ab1 * t_nff[c, p[2][0], p[3][0]] * t_nnn[a, b, c]
-                        tmp2 = tmp_ab2 * t_nnn[b, c, c] * self.mwh.frequencies[c] ** -1
+        l_c = self._lambdas(fields[2] + fields[3], frequencies)
 
-                        for f in frequencies:
-                            w23 = (p[2][1] * f, p[3][1] * f)
-                            fr_1 = Shaker.lambda_(w23, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * \
-                                Shaker.lambda_(w23, self.mwh.frequencies[c])
+        f_cij = self._factorized_nnn(frequencies, t_nnn, t_nf, fields[0], t_nf, fields[1])
 
-                            values[f] += (fr_1 * tmp1 + Shaker.lambda_(w23, self.mwh.frequencies[a]) * tmp2)
+        return -1 / 4 * _contract_modes_per_frequency(f_cij, _scale_modes_per_frequency(t_nff, l_c))
 
-        for f in frequencies:
-            values[f] *= - 1 / 16 * multiplier
+    def _contract_F_F_F_F__1_1(self, fields, frequencies, omega, t_nf, t_nnf, t_nnn):
+        """Compute the :math:`[\\mu^4]^{1,1}` contribution (without permutations)
 
-        return values
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-    def _compute_FF_FF__2_0_component(self, coo, input_fields, frequencies, t_nnff):
-        """Compute a component of the :math:`[\\alpha^2]^{2,0}` contribution
+        l_c = self._lambdas(fields[2] + fields[3], frequencies)
+        l_d = self._lambdas(fields[3], frequencies)
 
-         .. math::
+        f_cij = _scale_modes_per_frequency(
+            self._factorized_nnn(frequencies, t_nnn, t_nf, fields[0], t_nf, fields[1]), l_c, batched=True)
+        g_ckl = numpy.moveaxis(numpy.tensordot(t_nnf, _scale_modes_per_frequency(t_nf, l_d), axes=(1, 1)), 2, 0)
 
-            \\begin{align}
-            [\\alpha^2]^{2,0} &= \\frac{1}{16}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{ab}
-            \\tdiff{^2\\alpha_{ij}}{Q_a\\partial Q_b}\\tdiff{^2\\alpha_{kl}}{Q_a\\partial Q_b}
-            \\,\\lb{23}{ab}\\,\\omega_a^{-1}
-            \\end{align}
+        return -1 / 2 * _contract_modes_per_frequency(f_cij, g_ckl)
 
-         :param coo: coordinates
-         :type coo: tuple|list
-         :param input_fields: input fields
-         :type input_fields: tuple|list
-         :param frequencies: the frequencies
-         :type frequencies: list of float|str
-         :param t_nnff: ``NNFF`` components
-         :type t_nnff: numpy.ndarray
-         :rtype: list of float
-         """
-        values = {}
+    def _contract_F_F_F_F__2_0(self, fields, frequencies, omega, t_nf, t_nnf):
+        """Compute the :math:`[\\mu^4]^{2,0}` contribution (without permutations)
 
-        for f in frequencies:
-            values[f] = .0
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+        l_a = self._lambdas(fields[0], frequencies)
+        l_b = self._lambdas(fields[2] + fields[3], frequencies)
+        l_c = self._lambdas(fields[3], frequencies)
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                for b in self.mwh.included_modes:
+        f_bij = _scale_modes_per_frequency(
+            numpy.tensordot(t_nnf, _scale_modes_per_frequency(t_nf, l_a), axes=(0, 1)).transpose(2, 0, 3, 1),
+            l_b,
+            batched=True)
+        g_bkl = numpy.moveaxis(numpy.tensordot(t_nnf, _scale_modes_per_frequency(t_nf, l_c), axes=(1, 1)), 2, 0)
 
-                    tmp = 1 / self.mwh.frequencies[a] * t_nnff[a, b, p[0][0], p[1][0]] * t_nnff[a, b, p[2][0], p[3][0]]
+        return 1 / 2 * _contract_modes_per_frequency(f_bij, g_bkl)
 
-                    for f in frequencies:
-                        values[f] += \
-                            Shaker.lambda_(
-                                (p[2][1] * f, p[3][1] * f), (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp
+    def _contract_F_F_F_F__0_2(self, fields, frequencies, omega, t_nf, t_nnn):
+        """Compute the :math:`[\\mu^4]^{0,2}` contribution (without permutations)
 
-        for f in frequencies:
-            values[f] *= 1 / 16 * multiplier
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        return values
+        l_c = self._lambdas(fields[2] + fields[3], frequencies)
 
-    def _compute_FF_FF__0_2_component(self, coo, input_fields, frequencies, t_nff, t_nnn):
-        """Compute a component of the :math:`[\\alpha^2]^{0,2}` contribution
+        f_cij = _scale_modes_per_frequency(
+            self._factorized_nnn(frequencies, t_nnn, t_nf, fields[0], t_nf, fields[1]), l_c, batched=True)
+        g_ckl = self._factorized_nnn(frequencies, t_nnn, t_nf, fields[2], t_nf, fields[3])
 
-        .. math::
+        return 1 / 8 * _contract_modes_per_frequency(f_cij, g_ckl)
 
-            \\begin{align}
-            [\\alpha^2]^{0,2} &= \\frac{1}{32}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcd}
-            \\tdiff{\\alpha_{ij}}{Q_c}\\tdiff{\\alpha_{kl}}{Q_d}\\,
-            \\left[F_{aab}\\,F_{bcd}\\,\\lb{23}{c}\\lb{\\sigma}{d}\\,\\omega_b^{-2}
-            +2\\,F_{abc}\\,F_{abd}\\,\\lb{23}{ab}\\,\\lb{23}{c}\\,\\lb{\\sigma}{d}\\right]
-            \\end{align}
+    def _contract_FF_FF__1_1(self, fields, frequencies, omega, t_nff, t_nnff, t_nnn):
+        """Compute the :math:`[\\alpha^2]^{1,1}` contribution (without permutations)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
         :param t_nff: ``NFF`` components
         :type t_nff: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
 
-        for f in frequencies:
-            values[f] = .0
+        return -1 / 16 * self._factorized_1_1(frequencies, omega, t_nnn, fields[2] + fields[3], t_nnff, t_nff)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+    def _contract_FF_FF__2_0(self, fields, frequencies, omega, t_nnff):
+        """Compute the :math:`[\\alpha^2]^{2,0}` contribution (without permutations)
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                mult_a = 1 / self.mwh.frequencies[a]
-                for b in self.mwh.included_modes:
-                    mult_ab = self.mwh.frequencies[b] ** -2
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nnff: ``NNFF`` components
+        :type t_nnff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                    for c in self.mwh.included_modes:
+        l_ab = self._lambdas(fields[2] + fields[3], frequencies, 2)
 
-                        mult_abc = mult_a * t_nff[c, p[0][0], p[1][0]]
-                        mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
-                        mult_abc_2 = mult_abc * t_nnn[a, b, c]
+        return 1 / 16 * numpy.einsum('wab,a,abij,abkl->wijkl', l_ab, 1 / omega, t_nnff, t_nnff, optimize=True)
 
-                        for d in self.mwh.included_modes:
-                            mult_abcd = t_nff[d, p[2][0], p[3][0]]
+    def _contract_FF_FF__0_2(self, fields, frequencies, omega, t_nff, t_nnn):
+        """Compute the :math:`[\\alpha^2]^{0,2}` contribution (without permutations)
 
-                            tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
-                            tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                            for f in frequencies:
-                                ws = p[0][1] * f
-                                w23 = (p[2][1] * f, p[3][1] * f)
-                                values[f] -= \
-                                    (tmp1 + Shaker.lambda_(
-                                        w23, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp2) * \
-                                    self.lambda_(w23, self.mwh.frequencies[c]) * \
-                                    self.lambda_(ws, self.mwh.frequencies[d])
+        return 1 / 32 * self._factorized_0_2(
+            frequencies, omega, t_nnn, fields[2] + fields[3], t_nff, fields[2] + fields[3], t_nff, fields[0])
 
-        for f in frequencies:
-            values[f] *= -1 / 32 * multiplier
+    def _contract_F_FFF__1_1(self, fields, frequencies, omega, t_nf, t_nnf, t_nfff, t_nnfff, t_nnn):
+        """Compute the :math:`[\\mu\\beta]^{1,1}` contribution (without permutations)
 
-        return values
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nnf: ``NNF`` components
+        :type t_nnf: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
+        :param t_nnfff: ``NNFFF`` components
+        :type t_nnfff: numpy.ndarray
+        :param t_nnn: ``NNN`` components
+        :type t_nnn: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-    def _compute_F_FFF__1_1_component(self, coo, input_fields, frequencies, t_nf, t_nnf, t_nfff, t_nnfff, t_nnn):
-        """Compute a component of the :math:`[\\mu\\beta]^{1,1}` contribution
+        values = self._factorized_1_1(frequencies, omega, t_nnn, fields[0], t_nnf, t_nfff)
+        values += self._factorized_1_1(frequencies, omega, t_nnn, fields[0], t_nnfff, t_nf).transpose(0, 4, 1, 2, 3)
 
-        .. math::
+        return -1 / 24 * values
 
-            \\begin{align}
-            [\\mu\\beta]^{1,1} &= -\\frac{1}{24}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abc}
-            \\left\\{ F_{abc}\\,\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\beta_{jkl}}{Q_c}
-            +\\tdiff{^2\\beta_{jkl}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_c}\\right]
-            \\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,(\\omega_a^{-1}+\\omega_b^{-1})\\right.\\\\
-            &\\left.+ F_{bcc}\\,\\left[\\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\,\\tdiff{\\beta_{jkl}}{Q_a}
-            +\\tdiff{^2\\beta_{jkl}}{Q_a\\partial Q_b}\\,\\tdiff{\\mu_i}{Q_a}\\right]
-            \\,\\lb{\\sigma}{a}\\,\\omega_b^{-2}\\,\\omega_c^{-1}\\right\\}
-            \\end{align}
+    def _contract_F_FFF__2_0(self, fields, frequencies, omega, t_nnf, t_nnfff):
+        """Compute the :math:`[\\mu\\beta]^{2,0}` contribution (without permutations)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
         :param frequencies: the frequencies
-        :type frequencies: list of float|str
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
         :param t_nnf: ``NNF`` components
         :type t_nnf: numpy.ndarray
         :param t_nnfff: ``NNFFF`` components
         :type t_nnfff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+
+        l_ab = self._lambdas(fields[0], frequencies, 2)
+
+        return 1 / 12 * numpy.einsum('wab,a,abi,abjkl->wijkl', l_ab, 1 / omega, t_nnf, t_nnfff, optimize=True)
+
+    def _contract_F_FFF__0_2(self, fields, frequencies, omega, t_nf, t_nfff, t_nnn):
+        """Compute the :math:`[\\mu\\beta]^{0,2}` contribution (without permutations)
+
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the included modes
+        :type omega: numpy.ndarray
         :param t_nf: ``NF`` components
         :type t_nf: numpy.ndarray
         :param t_nfff: ``NFFF`` components
         :type t_nfff: numpy.ndarray
         :param t_nnn: ``NNN`` components
         :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        :rtype: numpy.ndarray
         """
-        values = {}
 
-        for f in frequencies:
-            values[f] = .0
+        return 1 / 24 * self._factorized_0_2(frequencies, omega, t_nnn, fields[0], t_nf, fields[0], t_nfff, fields[0])
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+    def _decompose_F_F__0_0(self, fields, frequencies, omega, t_nf):
+        """Compute the part of each mode to the :math:`[\\mu^2]^{0,0}` contribution (without permutations)
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                for b in self.mwh.included_modes:
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                    f_ab1 = (1 / self.mwh.frequencies[a] + 1 / self.mwh.frequencies[b])
-                    f_ab2 = self.mwh.frequencies[b] ** -2
+        l_a = Shaker.lambda_(fields[0] * frequencies[:, numpy.newaxis], omega)
 
-                    tmp_ab1 = f_ab1 * t_nnf[a, b, p[0][0]]
-                    tmp_ab3 = f_ab1 * t_nnfff[a, b, p[1][0], p[2][0], p[3][0]]
+        return 1 / 2 * numpy.einsum('wa,ai,aj->waij', l_a, t_nf, t_nf, optimize=True)
 
-                    e = t_nnf[a, b, p[0][0]] * t_nfff[a, p[1][0], p[2][0], p[3][0]]
-                    e += t_nnfff[a, b, p[1][0], p[2][0], p[3][0]] * t_nf[a, p[0][0]]
+    def _decompose_F_FF__0_0(self, fields, frequencies, omega, t_nf, t_nff):
+        """Compute the part of each mode to the :math:`[\\mu\\alpha]^{0,0}` contribution (without permutations)
 
-                    tmp_ab2 = f_ab2 * e
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-                    for c in self.mwh.included_modes:
-                        tmp1 = (tmp_ab1 * t_nfff[c, p[1][0], p[2][0], p[3][0]] + tmp_ab3 * t_nf[c, p[0][0]]) * \
-                            t_nnn[a, b, c]
-                        tmp2 = tmp_ab2 * t_nnn[b, c, c] * self.mwh.frequencies[c] ** -1
+        l_a = Shaker.lambda_(fields[0] * frequencies[:, numpy.newaxis], omega)
 
-                        for f in frequencies:
-                            ws = p[0][1] * f
-                            fr_1 = Shaker.lambda_(ws, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * \
-                                Shaker.lambda_(ws, self.mwh.frequencies[c])
+        return 1 / 2 * numpy.einsum('wa,ai,ajk->waijk', l_a, t_nf, t_nff, optimize=True)
 
-                            values[f] += (fr_1 * tmp1 + Shaker.lambda_(ws, self.mwh.frequencies[a]) * tmp2)
+    def _decompose_FF_FF__0_0(self, fields, frequencies, omega, t_nff):
+        """Compute the part of each mode to the :math:`[\\alpha^2]^{0,0}` contribution (without permutations)
 
-        for f in frequencies:
-            values[f] *= - 1 / 24 * multiplier
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the modes
+        :type omega: numpy.ndarray
+        :param t_nff: ``NFF`` components
+        :type t_nff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-        return values
+        l_a = Shaker.lambda_((fields[2] + fields[3]) * frequencies[:, numpy.newaxis], omega)
 
-    def _compute_F_FFF__2_0_component(self, coo, input_fields, frequencies, t_nnf, t_nnfff):
-        """Compute a component of the :math:`[\\mu\\beta]^{2,0}` contribution
+        return 1 / 8 * numpy.einsum('wa,aij,akl->waijkl', l_a, t_nff, t_nff, optimize=True)
 
-         .. math::
+    def _decompose_F_FFF__0_0(self, fields, frequencies, omega, t_nf, t_nfff):
+        """Compute the part of each mode to the :math:`[\\mu\\beta]^{0,0}` contribution (without permutations)
 
-            \\begin{align}
-            [\\mu\\beta]^{2,0} &= \\frac{1}{12}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{ab}
-            \\tdiff{^2\\mu_i}{Q_a\\partial Q_b}\\tdiff{^2\\beta_{jkl}}{Q_a\\partial Q_b}\\,
-            \\lb{\\sigma}{ab}\\,\\omega_a^{-1}
-            \\end{align}
+        :param fields: multiple of the frequency for each coordinate
+        :type fields: tuple
+        :param frequencies: the frequencies
+        :type frequencies: numpy.ndarray
+        :param omega: vibrational frequencies of the modes
+        :type omega: numpy.ndarray
+        :param t_nf: ``NF`` components
+        :type t_nf: numpy.ndarray
+        :param t_nfff: ``NFFF`` components
+        :type t_nfff: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
 
-         :param coo: coordinates
-         :type coo: tuple|list
-         :param input_fields: input fields
-         :type input_fields: tuple|list
-         :param frequencies: the frequencies
-         :type frequencies: list of float|str
-         :param t_nnf: ``NNF`` components
-         :type t_nnf: numpy.ndarray
-         :param t_nnfff: ``NNFFF`` components
-         :type t_nnfff: numpy.ndarray
-         :rtype: list of float
-         """
-        values = {}
+        l_a = Shaker.lambda_(fields[0] * frequencies[:, numpy.newaxis], omega)
 
-        for f in frequencies:
-            values[f] = .0
+        return 1 / 6 * numpy.einsum('wa,ai,ajkl->waijkl', l_a, t_nf, t_nfff, optimize=True)
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                for b in self.mwh.included_modes:
+class _VibrationalModes:
+    """Vibrational frequencies and included modes, as in the mass weighted hessian (for the worker processes).
 
-                    tmp = 1 / self.mwh.frequencies[a] * t_nnf[a, b, p[0][0]] * \
-                        t_nnfff[a, b, p[1][0], p[2][0], p[3][0]]
+    :param frequencies: vibrational frequencies
+    :type frequencies: list
+    :param included_modes: included modes
+    :type included_modes: list
+    """
 
-                    for f in frequencies:
-                        values[f] += \
-                            Shaker.lambda_(p[0][1] * f, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp
+    def __init__(self, frequencies, included_modes):
+        self.frequencies = frequencies
+        self.included_modes = included_modes
+
+
+class _SharedShaker(Shaker):
+    """Shaker used in the worker processes, which reads the derivatives in shared memory blocks (created by
+    :meth:`Shaker._compute_pv_in_parallel`) rather than in a datafile.
+
+    :param shared_tensors: name of the shared memory block and shape, per representation
+    :type shared_tensors: dict
+    :param frequencies: vibrational frequencies
+    :type frequencies: list
+    :param included_modes: included modes
+    :type included_modes: list
+    :param screening: threshold for the cubic force field (see ``Screening``)
+    :type screening: float
+    :param screening_electrical: threshold for the electrical derivatives (see ``Screening``)
+    :type screening_electrical: float
+    """
 
-        for f in frequencies:
-            values[f] *= 1 / 12 * multiplier
+    def __init__(self, shared_tensors, frequencies, included_modes, screening=0.0, screening_electrical=0.0):
+        self.mwh = _VibrationalModes(frequencies, included_modes)
+        self.dof = len(frequencies)
+        self.lambda_cache = LambdaCache(self.mwh)
+        self.screening = Screening(self.mwh, screening, screening_electrical)
+        self.intermediates = IntermediateStore()
 
-        return values
+        self.shared_memories = []
+        self.tensors = {}
 
-    def _compute_F_FFF__0_2_component(self, coo, input_fields, frequencies, t_nf, t_nfff, t_nnn):
-        """Compute a component of the :math:`[\\mu\\beta]^{0,2}` contribution
+        for representation, (name, shape) in shared_tensors.items():
+            shm = shared_memory.SharedMemory(name=name)
+            self.shared_memories.append(shm)
+            self.tensors[representation] = numpy.ndarray(shape, dtype=float, buffer=shm.buf)
 
-        .. math::
+            # the derivatives are already screened by the main process
+            self.screening.screened[representation, tuple(included_modes)] = self.tensors[representation]
 
-            \\begin{align}
-            [\\mu\\beta]^{0,2} &= \\frac{1}{24}\\,\\sum_{\\mathcal{P}_{ijkl}} \\sum_{abcd}
-            \\tdiff{\\mu_i}{Q_c}\\tdiff{\\beta_{jkl}}{Q_d}\\times\\\\
-            &\\left[F_{aab}\\,F_{bcd}\\,\\lb{\\sigma}{c}\\lb{\\sigma}{d}\\,\\omega_b^{-2}
-            +2\\,F_{abc}\\,F_{abd}\\,\\lb{\\sigma}{ab}\\,\\lb{\\sigma}{c}\\,\\lb{\\sigma}{d}\\right]
-            \\end{align}
+    def get_tensor(self, representation, frequency='static'):
+        if representation not in self.tensors or frequency != 'static':
+            raise DerivativeNotAvailable(representation, frequency)
 
-        :param coo: coordinates
-        :type coo: tuple|list
-        :param input_fields: input fields
-        :type input_fields: tuple|list
-        :param frequencies: the frequencies
-        :type frequencies: list of float|str
-        :param t_nf: ``NF`` components
-        :type t_nf: numpy.ndarray
-        :param t_nfff: ``NFFF`` components
-        :type t_nfff: numpy.ndarray
-        :param t_nnn: ``NNN`` components
-        :type t_nnn: numpy.ndarray
-        :rtype: list of float
+        return self.tensors[representation]
+
+    def close(self):
+        """Close the shared memory blocks (they are unlinked by the main process). The arrays that use them are
+        dropped first, since a block cannot be closed while they exist.
         """
-        values = {}
 
-        for f in frequencies:
-            values[f] = .0
+        self.tensors = {}
+        self.screening.clear()
+        self.intermediates.clear()
 
-        multiplier, unique_elemts = self.get_iterator(coo, input_fields)
+        for shm in self.shared_memories:
+            shm.close()
 
-        for p in unique_elemts:
-            for a in self.mwh.included_modes:
-                mult_a = 1 / self.mwh.frequencies[a]
-                for b in self.mwh.included_modes:
-                    mult_ab = self.mwh.frequencies[b] ** -2
+        self.shared_memories = []
 
-                    for c in self.mwh.included_modes:
 
-                        mult_abc = mult_a * t_nf[c, p[0][0]]
-                        mult_abc_1 = mult_abc * t_nnn[a, a, b] * mult_ab
-                        mult_abc_2 = mult_abc * t_nnn[a, b, c]
+#: shaker of the worker process (see ``_init_worker()``)
+_worker_shaker = None
 
-                        for d in self.mwh.included_modes:
-                            mult_abcd = t_nfff[d, p[1][0], p[2][0], p[3][0]]
 
-                            tmp1 = mult_abcd * mult_abc_1 * t_nnn[b, c, d]
-                            tmp2 = mult_abcd * mult_abc_2 * t_nnn[a, b, d] * 2
+def _init_worker(shared_tensors, frequencies, included_modes, screening=0.0, screening_electrical=0.0):
+    """Initialize a worker process.
+    The shared memory blocks are closed when the process exits.
+
+    :param shared_tensors: name of the shared memory block and shape, per representation
+    :type shared_tensors: dict
+    :param frequencies: vibrational frequencies
+    :type frequencies: list
+    :param included_modes: included modes
+    :type included_modes: list
+    :param screening: threshold for the cubic force field (see ``Screening``)
+    :type screening: float
+    :param screening_electrical: threshold for the electrical derivatives (see ``Screening``)
+    :type screening_electrical: float
+    """
 
-                            for f in frequencies:
-                                ws = p[0][1] * f
-                                values[f] -= \
-                                    (tmp1 + Shaker.lambda_(
-                                        ws, (self.mwh.frequencies[a], self.mwh.frequencies[b])) * tmp2) * \
-                                    self.lambda_(ws, self.mwh.frequencies[c]) * \
-                                    self.lambda_(ws, self.mwh.frequencies[d])
+    global _worker_shaker
+    _worker_shaker = _SharedShaker(shared_tensors, frequencies, included_modes, screening, screening_electrical)
+
+    # the worker processes exit without calling the ``atexit`` functions, but they run these finalizers
+    multiprocessing.util.Finalize(None, _worker_shaker.close, exitpriority=0)
+
+
+def _compute_pv_in_worker(
+        vc_representation, derivative_representation, frequencies, limit_anharmonicity_usage, engine, on_grid=False):
+    """Compute a pure vibrational contribution in a worker process.
+
+    :param vc_representation: representation of the vibrational contribution
+    :type vc_representation: str
+    :param derivative_representation: representation of the derivative
+    :type derivative_representation: str
+    :param frequencies: list of frequencies
+    :type frequencies: list
+    :param limit_anharmonicity_usage: limit the usage of anharmonicity to first order
+    :type limit_anharmonicity_usage: bool
+    :param engine: engine used for the computation (see ``ENGINES``)
+    :type engine: str
+    :param on_grid: the frequencies are a grid (see :meth:`Shaker.compute_pv_on_grid`)
+    :type on_grid: bool
+    :return: the components, per frequency (or as a single array if ``on_grid``)
+    :rtype: dict|numpy.ndarray
+    """
 
-        for f in frequencies:
-            values[f] *= -1 / 24 * multiplier
+    vc = VibrationalContribution.from_representation(vc_representation, _worker_shaker.dof)
 
-        return values
+    if on_grid:
+        return _worker_shaker._compute_pv_on_grid(
+            vc, derivatives.Derivative(derivative_representation), frequencies, limit_anharmonicity_usage, engine)
+
+    tensors = _worker_shaker._compute_pv(
+        vc, derivatives.Derivative(derivative_representation), frequencies, limit_anharmonicity_usage, engine)
+
+    return dict((frequency, tensor.components) for frequency, tensor in tensors.items())
@@ -0,0 +1,96 @@
+import io
+import tarfile
+
+from qcip_tools.chemistry_files import dalton
+
+
+def stream_archive_members(path, members):
+    """Get some members of a Dalton archive (``.tar.gz``) by streaming it: the archive is decompressed once, in
+    order, without being extracted on disk, and the other members are skipped (they are not kept in memory).
+    The decompression stops as soon as all the requested members are found.
+
+    :param path: path to the archive
+    :type path: str
+    :param members: name of the members
+    :type members: list of str
+    :return: the content of the members that were found, per name
+    :rtype: dict
+    :raise tarfile.ReadError: if the archive cannot be read
+    """
+
+    found = {}
+
+    with tarfile.open(path, 'r|gz') as stream:
+        for member in stream:
+            if member.name not in members or member.name in found or not member.isfile():
+                continue
+
+            found[member.name] = stream.extractfile(member).read()
+
+            if len(found) == len(members):
+                break
+
+    return found
+
+
+class StreamedArchiveOutput(dalton.ArchiveOutput):
+    """Dalton archive, in which only the members that are needed are read, by streaming the archive (see
+    ``stream_archive_members()``), and then given by ``get_file()``.
+
+    The archive is still opened by ``ArchiveOutput.read()``, but this only reads the first header.
+
+    :param members: name of the members (``DALTON.BAS``, which contains the molecule, is always needed)
+    :type members: list of str
+    """
+
+    def __init__(self, members=('DALTON.BAS', )):
+        super().__init__()
+
+        self.members = list(members)
+        self.streamed_members = {}
+
+    def read(self, f):
+        """
+
+        :param f: File
+        :type f: file
+        """
+
+        self.streamed_members = stream_archive_members(f.name, self.members)
+        super().read(f)
+
+    def get_file(self, name):
+        """Get a file of the archive. Raise FileNotFoundError if the file is not in the archive
+
+        :param name: name of the file in the archive
+        :type name: str
+        :rtype: file
+        """
+
+        if name in self.streamed_members:
+            return io.BytesIO(self.streamed_members[name])
+
+        if name in self.members:
+            raise FileNotFoundError(name)
+
+        return super().get_file(name)  # not requested: found in the whole archive
+
+
+def read_archive(path, members):
+    """Read a Dalton archive, but only with the members that are needed (see ``StreamedArchiveOutput``).
+
+    :param path: path to the archive
+    :type path: str
+    :param members: name of the members (``DALTON.BAS``, which contains the molecule, is always needed)
+    :type members: list of str
+    :rtype: StreamedArchiveOutput
+    :raise tarfile.ReadError: if the archive cannot be read
+    :raise FileNotFoundError: if ``DALTON.BAS`` is not in the archive
+    """
+
+    fx = StreamedArchiveOutput(members)
+
+    with open(path, 'rb') as f:
+        fx.read(f)
+
+    return fx
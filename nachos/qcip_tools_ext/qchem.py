@@ -36,17 +36,17 @@ class QChemLogFile(
         """A QChem log ... Contains a few "qchem" in the beginning (limit to the 100 first lines)"
         """
 
-        count = 0
         num_of_qchem = 0
 
-        for line in f.readlines():
+        for count, line in enumerate(f):
             if count > 100:
                 break
             if 'Q-Chem' in line or 'qchem' in line:
                 num_of_qchem += 1
-            count += 1
+                if num_of_qchem > 5:
+                    return True
 
-        return num_of_qchem > 5
+        return False
 
     def read(self, f):
         """
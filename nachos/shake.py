@@ -5,6 +5,8 @@ Shake it! (compute the vibrational contributions)
 import argparse
 import os
 
+import numpy
+
 from qcip_tools import derivatives
 from qcip_tools.chemistry_files import chemistry_datafile
 
@@ -90,6 +92,27 @@ def treat_frequencies_arg(frequencies_arg):
     return frequencies
 
 
+def treat_grid_arg(grid_arg):
+    info = grid_arg.split(';')
+
+    if len(info) != 3:
+        raise ValueError('{} is not a correct input (should be "start;stop;number")'.format(grid_arg))
+
+    try:
+        start, stop = float(info[0]), float(info[1])
+        number = int(info[2])
+    except ValueError:
+        raise ValueError('{} is not a correct input (should be "start;stop;number")'.format(grid_arg))
+
+    if start < 0 or stop < start:
+        raise ValueError('frequencies should be positive and increasing')
+
+    if number < 1:
+        raise ValueError('number of frequencies should be larger than 0')
+
+    return numpy.linspace(start, stop, number)
+
+
 def treat_exclude_argument(x, shaker):
     if x[0] == ':':
         x = x[1:]
@@ -146,6 +169,31 @@ def get_arguments_parser():
     arguments_parser.add_argument(
         '-m', '--modify-modes', action='store', help='Exclude or include vibrational modes')
 
+    arguments_parser.add_argument(
+        '-e', '--engine', choices=shaking.ENGINES, default='loops',
+        help='engine used to compute the pure vibrational contributions')
+
+    arguments_parser.add_argument(
+        '-j', '--workers', type=int, default=1,
+        help='number of processes used to compute the pure vibrational contributions')
+
+    arguments_parser.add_argument(
+        '-s', '--screening', type=float, default=0.0,
+        help='neglect the elements of the cubic force field lower than that (requires `-e tensor`)')
+
+    arguments_parser.add_argument(
+        '-S', '--screening-electrical', type=float, default=0.0,
+        help='neglect the blocks of the anharmonic electrical derivatives lower than that (requires `-e tensor`)')
+
+    arguments_parser.add_argument(
+        '-M', '--by-modes', action='store_true',
+        help='compute the contributions that are a sum of one term per mode through their decomposition per mode, '
+             'and reuse the parts of the previous run')
+
+    arguments_parser.add_argument(
+        '-g', '--grid', type=str,
+        help='only compute the pv contributions on a grid of frequencies (in atomic units), as "start;stop;number"')
+
     return arguments_parser
 
 
@@ -191,8 +239,39 @@ def main():
 
         print('(! list of modes is now {})'.format(', '.join(str(a + 1) for a in shaker.mwh.included_modes)))
 
+    if args.grid:
+        try:
+            grid = treat_grid_arg(args.grid)
+        except ValueError as e:
+            return exit_failure('error while treating grid: {}'.format(str(e)))
+
+        try:
+            curves = shaker.shake_on_grid(
+                grid, verbosity_level=args.verbose, only=only, engine=args.engine, workers=args.workers,
+                screening=args.screening, screening_electrical=args.screening_electrical)
+        except shaking.BadShaking as e:
+            return exit_failure('error while shaking: {}'.format(str(e)))
+
+        if not args.do_not_append:
+            shaking.save_dispersion_curves(args.data, curves)
+
+        return
+
+    # reuse the per-mode decompositions of a previous run, if any
+    previous = None
+    if args.by_modes:
+        try:
+            previous = shaking.load_vibrational_contributions(args.data, df.spacial_dof)
+        except shaking.BadShaking as e:
+            shaking.Shaker.display_message(
+                'previous vibrational contributions are not used: {}'.format(str(e)), verbosity_level=args.verbose)
+            previous = {}
+
     try:
-        contributions = shaker.shake(verbosity_level=args.verbose, only=only, frequencies=frequencies)
+        contributions = shaker.shake(
+            verbosity_level=args.verbose, only=only, frequencies=frequencies, engine=args.engine,
+            workers=args.workers, screening=args.screening, screening_electrical=args.screening_electrical,
+            previous=previous)
     except shaking.BadShaking as e:
         return exit_failure('error while shaking: {}'.format(str(e)))
 
@@ -8,6 +8,9 @@ import zipfile
 import pathlib
 
 from qcip_tools import derivatives
+from qcip_tools.chemistry_files import chemistry_datafile
+
+from nachos.core import files
 
 
 def array_almost_equals(a, b, places=7, delta=None, msg=''):
@@ -156,3 +159,48 @@ class NachosTestCase(unittest.TestCase):
         zf.close()
 
         return p
+
+    def unzip_calculation(self, path, name, directory, storage_path=None):
+        """Unzip a calculation (see ``unzip_it()``), and read its recipe and, eventually, its storage
+
+        :param path: path to the zip file
+        :type path: str
+        :param name: name of the directory of the calculation, in the zip file
+        :type name: str
+        :param directory: directory in which the zip file is extracted
+        :type directory: str
+        :param storage_path: path to the storage, relative to the directory of the calculation
+        :type storage_path: str
+        :return: the directory of the calculation, the recipe and the storage (``None`` if not requested)
+        :rtype: tuple
+        """
+
+        self.unzip_it(path, directory)
+        directory = os.path.join(directory, name)
+
+        recipe = files.Recipe(directory=directory)
+
+        with open(os.path.join(directory, 'nachos_recipe.yml')) as f:
+            recipe.read(f)
+
+        storage = None
+        if storage_path is not None:
+            storage = files.ComputationalResults(recipe, directory=directory)
+            storage.read(os.path.join(directory, storage_path))
+
+        return directory, recipe, storage
+
+    def read_datafile(self, path):
+        """Read a chemistry data file
+
+        :param path: path to the file
+        :type path: str
+        :rtype: qcip_tools.chemistry_files.chemistry_datafile.ChemistryDataFile
+        """
+
+        df = chemistry_datafile.ChemistryDataFile()
+
+        with open(path) as f:
+            df.read(f)
+
+        return df
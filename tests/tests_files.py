@@ -1,7 +1,10 @@
 import os
+import collections
+
+from qcip_tools import derivatives
 
 from tests import NachosTestCase
-from nachos.core import files
+from nachos.core import files, preparing, compute_numerical_derivative_of_tensor
 
 
 class FilesTestCase(NachosTestCase):
@@ -106,3 +109,66 @@ class FilesTestCase(NachosTestCase):
             opt_dict_p['differentiation'] = {1: ['energy', 'F', 'FF']}
             rx = files.Recipe(**opt_dict_p)
             rx.check_data()
+
+    @staticmethod
+    def dry_run_fields(recipe):
+        """Get the fields used by a dry run of the differentiations of the recipe, with their level, in the order
+        in which they are used"""
+
+        fields_used = collections.OrderedDict()
+        fields_used[(0, ) * (3 if recipe['type'] == 'F' else recipe.dof)] = 1
+
+        for d in recipe.maximum_derivatives():
+            def collect_fields(fields, *args, **kwargs):
+                fields_used.setdefault(tuple(int(a) for a in fields), d.order())
+                return .0
+
+            compute_numerical_derivative_of_tensor(
+                recipe, derivatives.Derivative(''), d, collect_fields, dry_run=True)
+
+        return [(list(fields), level) for fields, level in fields_used.items()]
+
+    def test_field_index(self):
+        """Test the index of the fields needed by the recipe"""
+
+        r = files.Recipe(
+            flavor='gaussian',
+            type='F',
+            method='HF',
+            basis_set='STO-3G',
+            geometry=self.geometry,
+            differentiation={3: ['energy']},
+            k_max=3)
+
+        fields_needed = preparing.fields_needed_by_recipe(r)
+        index = r.field_index()
+
+        self.assertEqual(len(index), len(fields_needed))
+        self.assertEqual(fields_needed, self.dry_run_fields(r))
+
+        for row, (fields, level) in enumerate(fields_needed):
+            self.assertEqual(index[tuple(fields)], (row, level))
+
+        self.assertEqual(r.number_of_fields(), len(fields_needed))
+
+        # same for a geometrical differentiation
+        rx = files.Recipe(
+            flavor='gaussian',
+            type='G',
+            method='HF',
+            basis_set='STO-3G',
+            geometry=self.geometry,
+            differentiation={2: ['energy']},
+            k_max=3)
+
+        self.assertEqual(rx.number_of_fields(), len(self.dry_run_fields(rx)))  # counted without generating them
+        self.assertEqual(rx.fields_needed(), self.dry_run_fields(rx))
+
+        # computed once ...
+        self.assertIs(r.field_index(), index)
+
+        # ... until the recipe changes
+        r['k_max'] = 4
+        number_of_fields = r.number_of_fields()  # counted without generating the fields
+        self.assertEqual(len(r.field_index()), number_of_fields)
+        self.assertNotEqual(len(r.field_index()), len(index))
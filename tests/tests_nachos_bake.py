@@ -1,6 +1,9 @@
+import io
 import os
+import json
 import math
 import subprocess
+import unittest.mock
 
 import numpy
 
@@ -141,6 +144,190 @@ class BakeTestCase(NachosTestCase):
         diffs = cf_free.derivatives['FF']['static'].components - cf_force.derivatives['FF']['static'].components
         self.assertTrue(numpy.all(diffs < 1e-3))
 
+    def test_bake_engines(self):
+        """Check that the "arrays" engine gives the same results as the "components" one"""
+
+        for zip_file, name in [(self.zip_F, 'numdiff_F'), (self.zip_G_dalton, 'numdiff_G_dalton')]:
+            directory, r, storage = self.unzip_calculation(
+                zip_file, name, self.working_directory, os.path.join('verification', 'nachos_data.h5'))
+
+            for force_choice in [None, (1, 1)]:
+                baker_components = baking.Baker(r, storage, directory=directory)
+                cf_components = baker_components.bake(force_choice=force_choice, record_details=True)
+                baker_arrays = baking.Baker(r, storage, directory=directory)
+                cf_arrays = baker_arrays.bake(force_choice=force_choice, engine='arrays', record_details=True)
+
+                self.assertEqual(sorted(cf_components.derivatives), sorted(cf_arrays.derivatives))
+
+                for d in cf_components.derivatives:
+                    if type(cf_components.derivatives[d]) is dict:
+                        for freq in cf_components.derivatives[d]:
+                            self.assertTensorsAlmostEqual(
+                                cf_components.derivatives[d][freq], cf_arrays.derivatives[d][freq], places=8)
+                    else:
+                        self.assertTensorsAlmostEqual(
+                            cf_components.derivatives[d], cf_arrays.derivatives[d], places=8)
+
+                # same positions in the Romberg triangles
+                for record_components, record_arrays in zip(baker_components.records, baker_arrays.records):
+                    for d_coo in record_components.best_values:
+                        for b_coo, best_value in record_components.best_values[d_coo].items():
+                            self.assertEqual(
+                                tuple(best_value[0]), tuple(record_arrays.best_values[d_coo][b_coo][0]))
+
+            with self.assertRaises(baking.BadBaking):
+                baking.Baker(r, storage, directory=directory).bake(engine='whatever')
+
+    def test_bake_parallel(self):
+        """Check that baking in parallel gives the same results"""
+
+        directory, r, storage = self.unzip_calculation(
+            self.zip_G, 'numdiff_G', self.working_directory, os.path.join('verification', 'nachos_data.h5'))
+
+        cf_serial = baking.Baker(r, storage, directory=directory).bake()
+
+        for engine, workers in [('components', 3), ('arrays', 2)]:
+            cf_parallel = baking.Baker(r, storage, directory=directory).bake(engine=engine, workers=workers)
+            self.assertEqual(list(cf_serial.derivatives), list(cf_parallel.derivatives))
+
+            for d in cf_serial.derivatives:
+                if type(cf_serial.derivatives[d]) is dict:
+                    self.assertEqual(list(cf_serial.derivatives[d]), list(cf_parallel.derivatives[d]))
+                    for freq in cf_serial.derivatives[d]:
+                        self.assertTensorsAlmostEqual(
+                            cf_serial.derivatives[d][freq], cf_parallel.derivatives[d][freq], places=6)
+                else:
+                    self.assertTensorsAlmostEqual(cf_serial.derivatives[d], cf_parallel.derivatives[d], places=6)
+
+        with self.assertRaises(baking.BadBaking):
+            baking.Baker(r, storage, directory=directory).bake(workers=0)
+
+    def test_bake_report(self):
+        """Check the records and the report"""
+
+        directory, r, storage = self.unzip_calculation(
+            self.zip_F, 'numdiff_F', self.working_directory, os.path.join('verification', 'nachos_data.h5'))
+
+        baker = baking.Baker(r, storage, directory=directory)
+
+        # the details are captured during the differentiation, the storage is not read again
+        with unittest.mock.patch.object(
+                storage, 'tensor_element_access', wraps=storage.tensor_element_access) as tensor_element_access:
+            cf = baker.bake(
+                only=[(derivatives.Derivative('F'), 1)], record_details=True, verbosity_level=3, out=io.StringIO())
+
+        accessed = set((tuple(c[0][0]), c[0][3]) for c in tensor_element_access.call_args_list)
+        self.assertEqual(tensor_element_access.call_count, len(accessed))
+
+        self.assertEqual(len(baker.records), 1)
+        record = baker.records[0]
+        self.assertTrue(record.has_details)
+        self.assertIs(record.result, cf.derivatives['FF']['static'])
+
+        # the position of the best values is found back in the triangles
+        for d_coo in record.best_values:
+            for b_coo in record.best_values[d_coo]:
+                (k, m), value, error = record.best_values[d_coo][b_coo]
+                triangle = record.romberg_triangles[d_coo][b_coo].romberg_triangle
+                self.assertEqual(triangle[k, m], value)
+                if k + m < triangle.shape[0] - 1:
+                    self.assertAlmostEqual(error, abs(triangle[k + 1, m] - triangle[k, m]))
+                self.assertNotEqual(record.decisions[d_coo][b_coo], '')
+
+        # values in the fields, compared to storage:
+        self.assertEqual(len(record.fields), 2 * r['k_max'] + 1)
+        for d_coo in record.field_values:
+            field = [0] * 3
+            for b in d_coo:
+                field[b] = 1
+            for i, b_coo in enumerate(record.romberg_triangles[d_coo]):
+                self.assertAlmostEqual(
+                    record.field_values[d_coo][r['k_max'] + 1, i],
+                    storage.tensor_element_access(field, 0, derivatives.Derivative('F'), b_coo, 'static', r))
+
+        # report
+        report_path = os.path.join(directory, 'report.json')
+        with open(report_path, 'w') as f:
+            baker.write_report(f)
+
+        with open(report_path) as f:
+            report = json.load(f)
+
+        self.assertEqual(report['recipe']['k_max'], r['k_max'])
+        self.assertEqual(len(report['derivatives']), 1)
+
+        derivative = report['derivatives'][0]
+        self.assertEqual(derivative['derivative'], 'FF')
+        self.assertEqual(derivative['frequency'], 'static')
+        self.assertArraysAlmostEqual(numpy.array(derivative['components']), cf.derivatives['FF']['static'].components)
+        self.assertEqual(len(derivative['romberg']), 9)
+
+        for component in derivative['romberg']:
+            self.assertAlmostEqual(
+                component['value'],
+                cf.derivatives['FF']['static'].components[
+                    tuple(component['basis_component'] + component['differentiation_component'])])
+
+        # without details
+        cf = baker.bake(only=[(derivatives.Derivative('F'), 1)])
+        self.assertFalse(baker.records[0].has_details)
+
+    def test_bake_hashes(self):
+        """Check that unchanged differentiations are not performed again"""
+
+        directory, r, storage = self.unzip_calculation(
+            self.zip_F, 'numdiff_F', self.working_directory, os.path.join('verification', 'nachos_data.h5'))
+        output_path = os.path.join(directory, 'molecule_nd.h5')
+
+        only = [(derivatives.Derivative('F'), 1), (derivatives.Derivative('dD'), 1)]
+        baker = baking.Baker(r, storage, directory=directory)
+
+        # not computed if not requested
+        baker.bake(only=only)
+        self.assertEqual(baker.hashes, {})
+
+        cf = baker.bake(only=only, with_hashes=True)
+
+        self.assertEqual(len(baker.records), 1 + len(r['frequencies']))
+        self.assertEqual(len(baker.hashes), 1 + len(r['frequencies']))
+        self.assertIn('FF@static', baker.hashes)
+
+        # the base tensors are hashed once per frequency
+        self.assertEqual(len(baker.storage_hashes), 1 + len(r['frequencies']))
+
+        with open(output_path, 'w') as f:
+            cf.write(f)
+
+        baking.save_bake_hashes(output_path, baker.hashes)
+        self.assertEqual(baking.load_bake_hashes(output_path), baker.hashes)
+
+        # nothing changed: nothing is differentiated
+        original_cf = chemistry_datafile.ChemistryDataFile()
+        with open(output_path) as f:
+            original_cf.read(f)
+
+        previous_hashes = baking.load_bake_hashes(output_path)
+        baker = baking.Baker(r, storage, directory=directory, original_cf=original_cf)
+        cf_appended = baker.bake(only=only, previous_hashes=previous_hashes)
+
+        self.assertEqual(len(baker.records), 0)
+        self.assertEqual(baker.hashes, previous_hashes)
+        self.assertTensorsAlmostEqual(cf.derivatives['FF']['static'], cf_appended.derivatives['FF']['static'])
+
+        # changing the Romberg settings or the storage triggers a new differentiation
+        baker = baking.Baker(r, storage, directory=directory, original_cf=original_cf)
+        baker.bake(only=only, previous_hashes=previous_hashes, force_choice=(1, 1))
+        self.assertEqual(len(baker.records), 1 + len(r['frequencies']))
+
+        storage.results[(0, 0, 0)]['F']['static'].components[0] += 1e-5
+        storage.add_result((0, 0, 0), 'F', storage.results[(0, 0, 0)]['F'], allow_replace=True)
+
+        baker = baking.Baker(r, storage, directory=directory, original_cf=original_cf)
+        baker.bake(only=only, previous_hashes=previous_hashes)
+        self.assertEqual(len(baker.records), 1)
+        self.assertEqual(baker.records[0].diff_derivative.representation(), 'F')
+        self.assertNotEqual(baker.hashes['FF@static'], previous_hashes['FF@static'])
+
     def test_bake_gaussian_G(self):
         self.unzip_it(self.zip_G, self.working_directory)
         directory = os.path.join(self.working_directory, 'numdiff_G')
@@ -214,6 +401,16 @@ class BakeTestCase(NachosTestCase):
             self.assertAlmostEqual(
                 math.fabs(ph[i, i]), mwh.frequencies[i] ** 2, places=5)
 
+        # batched projection gives the same results as qcip_tools:
+        self.assertArraysAlmostEqual(
+            cf.derivatives['NN'].components, cf.derivatives['GG'].project_over_normal_modes(mwh).components)
+        self.assertArraysAlmostEqual(
+            cf.derivatives['NFF']['static'].components,
+            cf.derivatives['GFF']['static'].project_over_normal_modes(mwh).components)
+        self.assertArraysAlmostEqual(
+            cf.derivatives['NdD']['1064nm'].components,
+            cf.derivatives['GdD']['1064nm'].project_over_normal_modes(mwh).components)
+
         # now, bake and steal results from zero field
         baker = baking.Baker(r, storage, directory=directory)
         cf_with_copy = baker.bake(only=[(derivatives.Derivative(), 0)], copy_zero_field_basis=True)
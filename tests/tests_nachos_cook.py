@@ -1,11 +1,17 @@
+import io
 import os
+import glob
 import random
+import shutil
+import tarfile
 import subprocess
+import unittest.mock
 
-from qcip_tools import numerical_differentiation
-from qcip_tools.chemistry_files import gaussian, dalton, xyz
+from qcip_tools import numerical_differentiation, derivatives
+from qcip_tools.chemistry_files import gaussian, dalton, xyz, helpers
 
 import nachos.qcip_tools_ext.qchem
+import nachos.qcip_tools_ext.dalton
 from tests import NachosTestCase
 from nachos.core import files, cooking, preparing
 
@@ -53,6 +59,29 @@ class CookTestCase(NachosTestCase):
             self.assertArraysAlmostEqual(
                 fields, cooking.Cooker.real_fields_to_fields(real_fields, min_field, ratio))
 
+        # batch of geometries
+        r = files.Recipe(
+            flavor='gaussian', type='G', method='HF', basis_set='STO-3G', geometry=path, min_field=min_field,
+            ratio=ratio)
+        c = cooking.Cooker(r, self.working_directory)
+
+        all_fields = []
+        deformed_geometries = []
+        for _ in range(10):
+            fields = [0] * dof
+            for i in range(random.randrange(1, 3)):
+                fields[random.randrange(0, dof)] = random.randrange(-5, 5)
+
+            all_fields.append(fields)
+            deformed_geometries.append(preparing.Preparer.deform_geometry(
+                geometry, numerical_differentiation.real_fields(fields, min_field, ratio)))
+
+        self.assertEqual(c.fields_from_geometries(deformed_geometries).tolist(), all_fields)
+        self.assertEqual(c.fields_from_geometries(deformed_geometries[:1])[0].tolist(), all_fields[0])
+
+        with self.assertRaises(ValueError):
+            c.fields_from_geometries([list(geometry)[:-1]])
+
     def test_cook_F_gaussian(self):
         self.unzip_it(self.zip_F, self.working_directory)
         directory = os.path.join(self.working_directory, 'numdiff_F')
@@ -103,6 +132,130 @@ class CookTestCase(NachosTestCase):
                             results['dD']['1064nm'],
                             skip_frequency_test=True)
 
+        # check the compiled view
+        all_fields = [a[0] for a in fields]
+        energies = s.tensors_access(all_fields, derivatives.Derivative(''))
+        self.assertEqual(energies.shape[0], len(all_fields))
+
+        for i, fields_n in enumerate(all_fields):
+            self.assertArraysAlmostEqual(energies[i], s.results[tuple(fields_n)][''].components)
+
+        fields_level_1 = [a[0] for a in fields if a[1] <= 1]
+        polarizabilities = s.tensors_access(
+            fields_level_1, derivatives.Derivative('dD'), frequency='1064nm', components=[(0, 0), (1, 2)])
+
+        for i, fields_n in enumerate(fields_level_1):
+            components = s.results[tuple(fields_n)]['dD']['1064nm'].components
+            self.assertAlmostEqual(polarizabilities[i, 0], components[0, 0])
+            self.assertAlmostEqual(polarizabilities[i, 1], components[1, 2])
+            self.assertAlmostEqual(
+                s.tensor_element_access(fields_n, 0, derivatives.Derivative('dD'), (1, 2), '1064nm', r),
+                components[1, 2])
+
+        with self.assertRaises(files.BadResult):
+            s.tensors_access(all_fields, derivatives.Derivative('dD'), frequency='1064nm')
+
+    def test_cook_parallel(self):
+        """Check that reading the files with different processes gives the same storage"""
+
+        directory, r, _ = self.unzip_calculation(self.zip_F, 'numdiff_F', self.working_directory)
+
+        c = cooking.Cooker(r, directory)
+        storage = c.cook([directory])
+        storage_parallel = c.cook([directory], workers=3)
+
+        self.assertEqual(storage_parallel.check(), ([], []))
+        self.assertEqual(list(storage_parallel.results), list(storage.results))
+
+        for fields in storage.results:
+            self.assertEqual(list(storage_parallel.results[fields]), list(storage.results[fields]))
+            self.assertArraysAlmostEqual(
+                storage_parallel.results[fields][''].components, storage.results[fields][''].components)
+
+            if 'dD' in storage.results[fields]:
+                self.assertTensorsAlmostEqual(
+                    storage_parallel.results[fields]['dD']['1064nm'], storage.results[fields]['dD']['1064nm'])
+
+        with self.assertRaises(cooking.BadCooking):
+            c.cook([directory], workers=0)
+
+    def test_cook_cache(self):
+        """Check that the cache gives back the same results"""
+
+        directory, r, _ = self.unzip_calculation(self.zip_F, 'numdiff_F', self.working_directory)
+        cache_path = os.path.join(directory, 'nachos_cook_cache.h5')
+
+        c = cooking.Cooker(r, directory)
+        cache = cooking.CookCache(r)
+        storage = c.cook([directory], cache=cache)
+        cache.write(cache_path)
+
+        fchk_paths = glob.glob(os.path.join(directory, '*.fchk'))
+        self.assertEqual(len(cache.entries), len(fchk_paths))
+
+        # read and cook again
+        cache_read = cooking.CookCache(r)
+        cache_read.read(cache_path)
+        self.assertEqual(len(cache_read.entries), len(fchk_paths))
+
+        storage_from_cache = c.cook([directory], cache=cache_read)
+        self.assertEqual(storage_from_cache.check(), ([], []))
+        self.assertEqual(list(storage_from_cache.results), list(storage.results))
+
+        for fields in storage.results:
+            self.assertEqual(list(storage_from_cache.results[fields]), list(storage.results[fields]))
+            self.assertArraysAlmostEqual(
+                storage_from_cache.results[fields][''].components, storage.results[fields][''].components)
+
+            if 'dD' in storage.results[fields]:
+                self.assertTensorsAlmostEqual(
+                    storage_from_cache.results[fields]['dD']['1064nm'], storage.results[fields]['dD']['1064nm'])
+
+        # a modified file is not in the cache anymore
+        stat = os.stat(fchk_paths[0])
+        os.utime(fchk_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        with self.assertRaises(KeyError):
+            cache_read.get(fchk_paths[0])
+
+        cache_read.get(fchk_paths[1])
+
+        # cache is emptied if the recipe changes
+        r['k_max'] = r['k_max'] - 1
+        cache_other = cooking.CookCache(r)
+        cache_other.read(cache_path)
+        self.assertEqual(len(cache_other.entries), 0)
+
+    def test_cook_manifest(self):
+        """Check that the fields are taken from the manifest"""
+
+        directory, r, _ = self.unzip_calculation(self.zip_F, 'numdiff_F', self.working_directory)
+
+        preparer = preparing.Preparer(r, directory)
+        preparer.prepare(dry_run=True)
+        manifest = preparer.manifest
+
+        c = cooking.Cooker(r, directory)
+        storage = c.cook([directory])
+
+        found, missing = c.outputs_from_manifest(manifest, [directory])
+        self.assertEqual(len(missing), 0)
+        self.assertEqual(len(found), len(manifest.entries))
+
+        storage_from_manifest = c.cook([directory], manifest=manifest)
+        self.assertEqual(storage_from_manifest.check(), ([], []))
+        self.assertEqual(sorted(storage_from_manifest.results), sorted(storage.results))
+
+        for fields in storage.results:
+            self.assertArraysAlmostEqual(
+                storage_from_manifest.results[fields][''].components, storage.results[fields][''].components)
+
+        # missing output
+        os.remove(found[1][0])
+        found, missing = c.outputs_from_manifest(manifest, [directory])
+        self.assertEqual(len(found), len(manifest.entries) - 1)
+        self.assertEqual(missing, [manifest.entries[1]])
+
     def test_cook_F_gaussian_b2plyp(self):
         """Check if B2PLYP data are similar to MP2 ones"""
 
@@ -200,6 +353,64 @@ class CookTestCase(NachosTestCase):
                         geometrical_derivatives['G'],
                         results['G'])
 
+    def test_prescan(self):
+        """Check that the fields are obtained from the header of the files"""
+
+        # F
+        directory, r, _ = self.unzip_calculation(self.zip_F, 'numdiff_F', self.working_directory)
+
+        fields = preparing.fields_needed_by_recipe(r)
+        c = cooking.Cooker(r, directory)
+
+        for n in range(1, len(fields) + 1):
+            with open(os.path.join(directory, r['name'] + '_{:04d}.fchk').format(n)) as f:
+                self.assertEqual(c.prescan(f, gaussian.FCHK), fields[n - 1][0])
+
+        # files which are not part of the calculation are dropped
+        r['k_max'] = 3
+        c = cooking.Cooker(r, directory)
+
+        n = next(i for i, (f, _) in enumerate(fields, 1) if any(abs(x) > 3 for x in f))
+        self.assertEqual(c.extract_from_path(os.path.join(directory, r['name'] + '_{:04d}.fchk').format(n)), ([], []))
+
+        # files with an unknown extension are identified on their beginning, not by qcip_tools
+        path = os.path.join(directory, r['name'] + '_0001.fchk')
+        shutil.copy(path, path + '.txt')
+
+        with unittest.mock.patch.object(helpers, 'open_chemistry_file', side_effect=AssertionError('not identified')):
+            self.assertEqual(c.extract_from_path(path + '.txt')[0], c.extract_from_path(path)[0])
+
+        # G
+        directory, r, _ = self.unzip_calculation(self.zip_G, 'numdiff_G', self.working_directory)
+
+        fields = preparing.fields_needed_by_recipe(r)
+        c = cooking.Cooker(r, directory)
+
+        for _ in range(10):
+            n = random.randrange(1, len(fields) + 1)
+            fields_n, level = fields[n - 1]
+            with open(os.path.join(directory, r['name'] + '_{:04d}{}.fchk').format(n, 'a' if level < 2 else '')) as f:
+                fx = gaussian.FCHK()
+                fx.read(f)
+                f.seek(0)
+
+                self.assertEqual(c.prescan(f, gaussian.FCHK), cooking.Cooker.real_fields_to_fields(
+                    cooking.Cooker.real_fields_from_geometry(r.geometry, fx.molecule), r['min_field'], r['ratio']))
+
+        # the prescan only drops files: the atoms are still checked for the other ones
+        path = os.path.join(directory, r['name'] + '_0001a.fchk')
+
+        with open(path) as f:
+            content = f.read()
+
+        with open(path, 'w') as f:
+            f.write(content.replace(
+                'Atomic numbers                             I   N=           3\n           8',
+                'Atomic numbers                             I   N=           3\n           9'))
+
+        with self.assertRaises(ValueError):
+            c.extract_from_path(path)
+
     def test_cook_G_dalton(self):
         self.unzip_it(self.zip_G_dalton, self.working_directory)
         directory = os.path.join(self.working_directory, 'numdiff_G_dalton')
@@ -259,6 +470,64 @@ class CookTestCase(NachosTestCase):
                     self.assertTensorsAlmostEqual(
                         electrical_derivatives['XDDD'][fr], results['XDDD']['1064nm'], skip_frequency_test=True)
 
+    def test_stream_dalton_archive(self):
+        """Check that only the members of the Dalton archives that are needed are kept"""
+
+        path = os.path.join(self.working_directory, 'archive.tar.gz')
+        contents = {'DALTON.BAS': b'molecule', 'AOPROPER': b'x' * 100000, 'DALTON.PROP': b'properties'}
+
+        with tarfile.open(path, 'w:gz') as f:
+            for name, content in contents.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                f.addfile(info, io.BytesIO(content))
+
+        found = nachos.qcip_tools_ext.dalton.stream_archive_members(path, ['DALTON.BAS', 'DALTON.PROP'])
+        self.assertEqual(found, {'DALTON.BAS': contents['DALTON.BAS'], 'DALTON.PROP': contents['DALTON.PROP']})
+
+        fx = nachos.qcip_tools_ext.dalton.StreamedArchiveOutput(['DALTON.BAS', 'DALTON.HES'])
+        fx.streamed_members = nachos.qcip_tools_ext.dalton.stream_archive_members(path, fx.members)
+        self.assertEqual(list(fx.streamed_members), ['DALTON.BAS'])
+        self.assertEqual(fx.get_file('DALTON.BAS').read(), contents['DALTON.BAS'])
+
+        with self.assertRaises(FileNotFoundError):
+            fx.get_file('DALTON.HES')
+
+        # cook the archives of a calculation: the streamed path gives the same results as the full archive
+        directory, r, _ = self.unzip_calculation(self.zip_G_dalton, 'numdiff_G_dalton', self.working_directory)
+
+        c = cooking.Cooker(r, directory)
+        self.assertEqual(c.archive_members(), ['DALTON.BAS', 'DALTON.PROP'])
+
+        paths = glob.glob(os.path.join(directory, '*.tar.gz'))
+        self.assertNotEqual(len(paths), 0)
+
+        for path in random.sample(paths, min(5, len(paths))):
+            # the members are not searched in the whole archive
+            with unittest.mock.patch.object(
+                    dalton.ArchiveOutput, 'get_file', side_effect=AssertionError('archive not streamed')):
+                obtained, results = c.extract_from_path(path)
+
+            with open(path, 'rb') as f:
+                fx = dalton.ArchiveOutput()
+                fx.read(f)
+                obtained_full, results_full = c.extract_from_file(fx, path)
+
+            self.assertEqual(obtained, obtained_full)
+            self.assertEqual(
+                [(fields, d, allow_replace) for fields, d, _, allow_replace in results],
+                [(fields, d, allow_replace) for fields, d, _, allow_replace in results_full])
+
+            for (_, d, value, _), (_, _, value_full, _) in zip(results, results_full):
+                if d == '':
+                    self.assertArraysAlmostEqual(value.components, value_full.components)
+                elif isinstance(value, dict):
+                    self.assertEqual(list(value), list(value_full))
+                    for frequency in value:
+                        self.assertTensorsAlmostEqual(value[frequency], value_full[frequency])
+                else:
+                    self.assertTensorsAlmostEqual(value, value_full)
+
     def test_cook_F_qchem(self):
         self.unzip_it(self.zip_F_qchem, self.working_directory)
         directory = os.path.join(self.working_directory, 'numdiff_F_qchem')
@@ -290,6 +559,29 @@ class CookTestCase(NachosTestCase):
 
                 self.assertAlmostEqual(fx.property('computed_energies')['total'], results[''].components[0])
 
+    def test_reader_for(self):
+        """Check that the reader is selected from the flavor and the extension"""
+
+        directory, r, _ = self.unzip_calculation(self.zip_F_qchem, 'numdiff_F_qchem', self.working_directory)
+
+        c = cooking.Cooker(r, directory)
+        self.assertEqual(c.reader_for('a.log'), nachos.qcip_tools_ext.qchem.QChemLogFile)
+        self.assertIsNone(c.reader_for('a.fchk'))
+
+        r['flavor'] = 'gaussian'
+        self.assertEqual(c.reader_for('a.fchk'), gaussian.FCHK)
+        self.assertEqual(c.reader_for('a.log'), gaussian.Output)
+
+        r['flavor'] = 'dalton'
+        self.assertEqual(c.reader_for('a.tar.gz'), dalton.ArchiveOutput)
+        self.assertEqual(c.reader_for('a.out'), dalton.Output)
+
+        # identification of a QChem output only reads the beginning of the file
+        path = os.path.join(directory, r['name'] + '_0001.log')
+        with open(path) as f:
+            self.assertTrue(nachos.qcip_tools_ext.qchem.QChemLogFile.attempt_identification(f))
+            self.assertNotEqual(f.read(), '')
+
     def test_cook_F_scs_mp2(self):
         """Check that using SCS-MP2 is ok"""
 
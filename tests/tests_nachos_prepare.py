@@ -3,11 +3,11 @@ import random
 import subprocess
 import glob
 
-from qcip_tools import quantities, derivatives_e, numerical_differentiation
+from qcip_tools import quantities, derivatives, derivatives_e, numerical_differentiation
 from qcip_tools.chemistry_files import gaussian, dalton
 
 from tests import NachosTestCase
-from nachos.core import files, preparing
+from nachos.core import files, preparing, compute_numerical_derivative_of_tensor
 
 
 class PrepareTestCase(NachosTestCase):
@@ -40,6 +40,7 @@ class PrepareTestCase(NachosTestCase):
         r = files.Recipe(**opt_dict)
         self.assertEqual(len(preparing.fields_needed_by_recipe(r)), 137)
         self.assertEqual(preparing.fields_needed_by_recipe(r)[0], ([0, 0, 0], 1))  # zero field is the first one
+        self.assertEqual(preparing.count_fields_needed('F', r.dof, r['k_max'], 3, r['accuracy_level']), 137)
 
         r['k_max'] = 3
         self.assertEqual(len(preparing.fields_needed_by_recipe(r)), 85)
@@ -60,6 +61,22 @@ class PrepareTestCase(NachosTestCase):
         r._update(r.recipe)
         self.assertEqual(len(preparing.fields_needed_by_recipe(r)), (3 * len(r.geometry)) ** 2 * 2 * r['k_max'] + 1)
 
+        # generated fields match the ones used by a dry run of the differentiation (in the same order):
+        fields_used = [[0] * r.dof]
+
+        def collect_fields(fields, *args, **kwargs):
+            f = list(int(a) for a in fields)
+            if f not in fields_used:
+                fields_used.append(f)
+            return .0
+
+        for d in r.maximum_derivatives():
+            compute_numerical_derivative_of_tensor(r, derivatives.Derivative(''), d, collect_fields, dry_run=True)
+
+        self.assertEqual([f for f, _ in preparing.fields_needed_by_recipe(r)], fields_used)
+        self.assertEqual(
+            preparing.count_fields_needed('G', r.dof, r['k_max'], 2, r['accuracy_level']), len(fields_used))
+
     def test_deform_geometry(self):
         """Test geometry deformation"""
 
@@ -152,7 +169,23 @@ class PrepareTestCase(NachosTestCase):
         fields = preparing.fields_needed_by_recipe(r)
 
         preparer = preparing.Preparer(recipe=r, directory=self.working_directory)
-        preparer.prepare()
+        files_created = preparer.prepare()
+
+        # test manifest
+        path = os.path.join(self.working_directory, 'nachos_manifest.json')
+        self.assertTrue(os.path.exists(path))
+
+        manifest = preparing.Manifest()
+        with open(path) as f:
+            manifest.read(f)
+
+        self.assertEqual(len(manifest.entries), len(files_created))
+
+        for entry, (fields_n, bases, file_name) in zip(manifest.entries, files_created):
+            self.assertEqual(entry['fields'], fields_n)
+            self.assertEqual(entry['bases'], bases)
+            self.assertEqual(entry['inputs'], [os.path.basename(file_name)])
+            self.assertEqual(entry['outputs'][0], os.path.basename(file_name).replace('.com', '.fchk'))
 
         # test for base
         path = os.path.join(self.working_directory, name + '_0001.com')
@@ -1,4 +1,8 @@
+import io
 import subprocess
+import itertools
+import math
+import numpy
 
 from qcip_tools import derivatives, derivatives_e
 from qcip_tools.chemistry_files import chemistry_datafile
@@ -225,6 +229,277 @@ class ShakeTestCase(NachosTestCase):
                 'F_F_F_F__1_1', 'F_F_F_F__2_0', 'F_F_F_F__0_2'
             ], is_zpva=True)
 
+    def test_lambda_cache(self):
+        """Test the cache for the lambda quantities"""
+
+        df = self.read_datafile(self.datafile)
+
+        shaker = shaking.Shaker(datafile=df)
+        frequencies = numpy.array([0, 0.02, 0.04])
+        modes = shaker.mwh.included_modes
+        w = shaker.mwh.frequencies
+
+        l_1 = shaker.lambda_cache(-1, frequencies)
+        l_2 = shaker.lambda_cache(2, frequencies, 2)
+        self.assertIs(l_1, shaker.lambda_cache(-1, frequencies))  # reused
+        self.assertEqual(l_1.shape, (shaker.dof, 3))
+        self.assertEqual(l_2.shape, (shaker.dof, shaker.dof, 3))
+
+        for i, f in enumerate(frequencies):
+            for a in modes:
+                self.assertAlmostEqual(l_1[a, i], shaking.Shaker.lambda_(-f, w[a]))
+                for b in modes:
+                    self.assertAlmostEqual(l_2[a, b, i], shaking.Shaker.lambda_(2 * f, (w[a], w[b])))
+
+        self.assertEqual(shaker.lambda_cache.included(-1, frequencies).shape, (len(modes), 3))
+
+        # invalidation
+        excluded = modes.pop(0)
+        self.assertIsNot(l_1, shaker.lambda_cache(-1, frequencies))
+        self.assertEqual(shaker.lambda_cache(-1, frequencies)[excluded, 0], .0)
+        self.assertEqual(shaker.lambda_cache.included(-1, frequencies).shape, (len(modes), 3))
+
+    def test_get_iterator(self):
+        """Test that the (memoized) permutations are the unique ones"""
+
+        for input_fields in [(0, ), (1, ), (0, 0), (1, -1), (1, 1, -1), (1, -1, 0)]:
+            for coordinates in itertools.product(range(3), repeat=len(input_fields) + 1):
+                shuflable = [(coordinates[0], -sum(input_fields))] + list(zip(coordinates[1:], input_fields))
+                unique_elements = set(itertools.permutations(shuflable))
+
+                multiplier, elements = shaking.Shaker.get_iterator(coordinates, input_fields)
+                self.assertEqual(len(elements), len(unique_elements))
+                self.assertEqual(set(elements), unique_elements)
+                self.assertEqual(multiplier, math.factorial(len(coordinates)) / len(unique_elements))
+
+                # cached
+                self.assertIs(shaking.Shaker.get_iterator(list(coordinates), list(input_fields))[1], elements)
+
+    def test_intermediate_store(self):
+        """Test the store of intermediates"""
+
+        store = shaking.IntermediateStore(max_size=2 * 8 * 10)
+        a, b = numpy.ones(10), numpy.zeros(10)
+
+        x = store(('x', ), lambda: a * 2, a)
+        self.assertIs(store(('x', ), lambda: a * 3, a), x)  # not computed again
+        self.assertIsNot(store(('x', ), lambda: b * 2, b), x)  # another source
+        self.assertEqual((store.hits, store.misses, len(store)), (1, 2, 2))
+
+        store(('x', ), lambda: a * 2, a)  # so that the one of `b` is the least recently used
+        store(('y', ), lambda: a * 4, a)
+        self.assertEqual(len(store), 2)
+        self.assertLessEqual(store.size, store.max_size)
+        self.assertIs(store(('x', ), lambda: a * 2, a), x)
+
+        store(('x', ), lambda: b * 2, b)
+        self.assertEqual(store.misses, 4)
+
+        store.clear()
+        self.assertEqual((len(store), store.size), (0, 0))
+
+        # shared by the contributions, without changing the results
+        df = self.read_datafile(self.datafile)
+
+        shaker = shaking.Shaker(datafile=df)
+        only = [(derivatives.Derivative('FF'), 2), (derivatives.Derivative('dD'), 2)]
+
+        for engine in shaking.ENGINES:
+            vibs = shaker.shake(only=only, frequencies=[0.02, 0.04], engine=engine)
+            self.assertGreater(shaker.intermediates.hits, 0)
+
+            shaker.intermediates.max_size = 0  # nothing is stored
+            vibs_not_stored = shaker.shake(only=only, frequencies=[0.02, 0.04], engine=engine)
+            self.assertEqual(len(shaker.intermediates), 0)
+            shaker.intermediates.max_size = shaking.INTERMEDIATES_MAX_SIZE
+
+            for i in vibs:
+                for j in vibs[i].vibrational_contributions:
+                    for freq in vibs[i].vibrational_contributions[j]:
+                        self.assertTensorsAlmostEqual(
+                            vibs[i].vibrational_contributions[j][freq],
+                            vibs_not_stored[i].vibrational_contributions[j][freq], places=10)
+
+    def test_shaking_engines(self):
+        """Test that the tensor engine gives the same results as the loops one"""
+
+        for path, only, frequencies in [
+                (self.datafile, [('FF', 2), ('dD', 2), ('FFF', 2), ('dDF', 2)], [0.02, 0.04]),
+                (self.datafile_g, [('FFFF', 2), ('XDDD', 2)], [derivatives_e.convert_frequency_from_string('1500nm')])
+        ]:
+            df = self.read_datafile(path)
+
+            shaker = shaking.Shaker(datafile=df)
+            only = [(derivatives.Derivative(d[0]), d[1]) for d in only]
+
+            vibs_loops = shaker.shake(frequencies=frequencies, only=only, engine='loops')
+            vibs_tensor = shaker.shake(frequencies=frequencies, only=only, engine='tensor')
+
+            for i in vibs_loops:
+                self.assertIn(i, vibs_tensor)
+                c, cx = vibs_loops[i], vibs_tensor[i]
+
+                for j in c.vibrational_contributions:
+                    self.assertIn(j, cx.vibrational_contributions)
+                    for freq in c.vibrational_contributions[j]:
+                        self.assertTensorsAlmostEqual(
+                            c.vibrational_contributions[j][freq], cx.vibrational_contributions[j][freq], places=10)
+
+            # with the decomposition per mode, the additive contributions do not go through the engine, so compare
+            # them to the loops kernels (for another set of modes)
+            all_modes = list(shaker.mwh.included_modes)
+            shaker.mwh.included_modes = all_modes[1:]
+
+            try:
+                vibs_modes = shaker.shake(frequencies=frequencies, only=only, engine='tensor', previous={})
+
+                for base, _ in only:
+                    c = vibs_modes[base.representation()]
+                    to_check = [shaking.VibrationalContribution((base, ), 1, 0)] + [
+                        vc for vc in shaker.computable_pv.get(base.order(), []) if vc.is_additive()]
+
+                    for vc in filter(shaker.check_availability, to_check):
+                        self.assertIn(vc.to_string(), c.vibrational_contributions)
+                        values = c.vibrational_contributions[vc.to_string()]
+
+                        if vc.zpva:
+                            expected = shaker.compute_zpva(vc, base, list(values))
+                        else:
+                            expected = shaker._create_tensors(
+                                base, list(values), '_compute_{}_component'.format(vc.to_string()),
+                                **shaker._pv_kwargs(vc))
+
+                        for freq in values:
+                            self.assertTensorsAlmostEqual(values[freq], expected[freq], places=10)
+            finally:
+                shaker.mwh.included_modes = all_modes
+
+        with self.assertRaises(shaking.BadShaking):
+            shaker.shake(engine='whatever')
+
+    def test_shaking_screening(self):
+        """Test the screening of the anharmonic derivatives"""
+
+        df = self.read_datafile(self.datafile)
+
+        shaker = shaking.Shaker(datafile=df)
+        only = [(derivatives.Derivative('FF'), 2), (derivatives.Derivative('FFF'), 2)]
+
+        vibs = shaker.shake(only=only, engine='tensor')
+        t_nnn = shaker.get_tensor('NNN')
+
+        # nothing is neglected with tiny thresholds
+        vibs_screened = shaker.shake(only=only, screening=1e-30, screening_electrical=1e-30, engine='tensor')
+        self.assertEqual(shaker.screening.neglected['NNN'][0], 0)
+        self.assertEqual(shaker.screening.neglected['NNF'][0], 0)
+
+        for i in vibs:
+            for j in vibs[i].vibrational_contributions:
+                self.assertTensorsAlmostEqual(
+                    vibs[i].vibrational_contributions[j]['static'],
+                    vibs_screened[i].vibrational_contributions[j]['static'])
+
+        # neglect half of the cubic force field
+        threshold = numpy.median(numpy.abs(t_nnn[t_nnn != .0]))
+        shaking.SPARSE_CUBIC_FORCE_FIELD_DENSITY, density = 1.0, shaking.SPARSE_CUBIC_FORCE_FIELD_DENSITY
+
+        try:
+            vibs_tensor = shaker.shake(
+                only=only, screening=threshold, engine='tensor', verbosity_level=1, out=io.StringIO())
+        finally:
+            shaking.SPARSE_CUBIC_FORCE_FIELD_DENSITY = density
+
+        number, total, largest = shaker.screening.neglected['NNN']
+        self.assertGreater(number, 0)
+        self.assertLess(largest, threshold)
+        self.assertLessEqual(largest, total)
+        self.assertNotIn('NNF', shaker.screening.neglected)  # no electrical screening
+
+        screened = shaker.screening('NNN', t_nnn)
+        self.assertTrue(numpy.all(screened[numpy.abs(t_nnn) < threshold] == .0))
+        self.assertArraysAlmostEqual(screened[numpy.abs(t_nnn) >= threshold], t_nnn[numpy.abs(t_nnn) >= threshold])
+
+        # the cache depends on the included modes
+        all_modes = list(shaker.mwh.included_modes)
+        shaker.mwh.included_modes = all_modes[1:]
+
+        try:
+            shaker.screening('NNN', t_nnn)
+            self.assertEqual(len(shaker.screening.screened), 2)
+            self.assertLessEqual(shaker.screening.neglected['NNN'][0], number)
+        finally:
+            shaker.mwh.included_modes = all_modes
+
+        self.assertIs(shaker.screening('NNN', t_nnn), screened)
+
+        # the error made on each contribution is lower than the bound
+        self.assertIn(('FF', 'F_F__1_1'), shaker.screening.bounds)
+
+        for (b_repr, vc_representation), bound in shaker.screening.bounds.items():
+            exact = vibs[b_repr].vibrational_contributions[vc_representation]['static']
+            approximate = vibs_tensor[b_repr].vibrational_contributions[vc_representation]['static']
+            error = numpy.abs(exact.components - approximate.components)
+
+            self.assertLessEqual(numpy.max(error), bound * (1 + 1e-8))
+
+        with self.assertRaises(shaking.BadShaking):
+            shaker.shake(screening=-1, engine='tensor')
+
+        with self.assertRaises(shaking.BadShaking):
+            shaker.shake(screening=threshold)  # not with the loops engine
+
+    def test_shaking_workers(self):
+        """Test that computing in parallel gives the same results as computing in serial"""
+
+        for path, only, frequencies in [
+                (self.datafile, [('FF', 2), ('dD', 2), ('FFF', 2), ('dDF', 2)], [0.02, 0.04]),
+                (self.datafile_g, [('FFFF', 2), ('XDDD', 2)], [derivatives_e.convert_frequency_from_string('1500nm')])
+        ]:
+            df = self.read_datafile(path)
+
+            shaker = shaking.Shaker(datafile=df)
+            only = [(derivatives.Derivative(d[0]), d[1]) for d in only]
+
+            vibs_serial = shaker.shake(frequencies=frequencies, only=only)
+            vibs_parallel = shaker.shake(frequencies=frequencies, only=only, workers=2)
+
+            self.assertEqual(list(vibs_serial), list(vibs_parallel))
+
+            for i in vibs_serial:
+                c, cx = vibs_serial[i], vibs_parallel[i]
+                self.assertEqual(list(c.vibrational_contributions), list(cx.vibrational_contributions))
+
+                for j in c.vibrational_contributions:
+                    self.assertEqual(list(c.vibrational_contributions[j]), list(cx.vibrational_contributions[j]))
+                    for freq in c.vibrational_contributions[j]:
+                        self.assertTensorsAlmostEqual(
+                            c.vibrational_contributions[j][freq], cx.vibrational_contributions[j][freq], places=10)
+
+        with self.assertRaises(shaking.BadShaking):
+            shaker.shake(workers=0)
+
+    def test_shaking_many_frequencies(self):
+        """Test that computing many frequencies at once gives the same results as computing them one by one"""
+
+        df = self.read_datafile(self.datafile)
+
+        shaker = shaking.Shaker(datafile=df)
+        only = [(derivatives.Derivative('dDF'), 2)]
+        frequencies = [0.04, 0.01, 0.02]
+
+        vibs = shaker.shake(frequencies=frequencies, only=only)['dDF']
+
+        for frequency in frequencies:
+            vibs_one = shaker.shake(frequencies=[frequency], only=only)['dDF']
+            for j in vibs_one.vibrational_contributions:
+                if shaking.VibrationalContribution.from_representation(j).zpva:
+                    continue
+
+                self.assertTensorsAlmostEqual(
+                    vibs.vibrational_contributions[j][frequency],
+                    vibs_one.vibrational_contributions[j][frequency],
+                    places=10)
+
     def test_shaking_save_and_load(self):
         """Test that we are able to save and load vibrational contributions"""
 
@@ -272,6 +547,119 @@ class ShakeTestCase(NachosTestCase):
                     self.assertTensorsAlmostEqual(
                         c.total_vibrational[freq], cx.total_vibrational[freq])
 
+    def test_shaking_modify_modes(self):
+        """Test that the per-mode decompositions of a previous run are reused when the included modes change"""
+
+        df = self.read_datafile(self.datafile)
+
+        only = [(derivatives.Derivative('FF'), 2), (derivatives.Derivative('dD'), 2)]
+        frequencies = [0.02, 0.04]
+
+        shaker = shaking.Shaker(datafile=df)
+        all_modes = shaker.mwh.included_modes.copy()
+        vibs = shaker.shake(only=only, frequencies=frequencies, previous={})
+
+        # not decomposed if not requested
+        vibs_engine = shaker.shake(only=only, frequencies=frequencies)
+
+        for b_repr in vibs:
+            self.assertEqual(vibs_engine[b_repr].per_mode, {})
+            for j in vibs[b_repr].vibrational_contributions:
+                for freq in vibs[b_repr].vibrational_contributions[j]:
+                    self.assertTensorsAlmostEqual(
+                        vibs[b_repr].vibrational_contributions[j][freq],
+                        vibs_engine[b_repr].vibrational_contributions[j][freq])
+
+        # exclude a mode, first from scratch:
+        shaker.mwh.included_modes = all_modes[1:]
+        vibs_without = shaker.shake(only=only, frequencies=frequencies, previous={})
+
+        self.assertIn('F_F__0_0', vibs_without['FF'].per_mode)
+        self.assertIn('dD__1_0', vibs_without['dD'].per_mode)
+
+        for c in vibs_without.values():
+            for decomposition in c.per_mode.values():
+                for frequency in decomposition.available:
+                    self.assertFalse(decomposition.available[frequency][all_modes[0]])
+
+        # ... then from the (saved) full run:
+        shaking.save_vibrational_contributions(self.datafile, vibs)
+        previous = shaking.load_vibrational_contributions(self.datafile, df.spacial_dof)
+
+        for k in vibs['FF'].per_mode:
+            self.assertIn(k, previous['FF'].per_mode)
+
+        vibs_reused = shaker.shake(only=only, frequencies=frequencies, previous=previous)
+
+        for b_repr in vibs_without:
+            c = vibs_without[b_repr]
+            cx = vibs_reused[b_repr]
+            for j in c.vibrational_contributions:
+                for freq in c.vibrational_contributions[j]:
+                    self.assertTensorsAlmostEqual(
+                        c.vibrational_contributions[j][freq], cx.vibrational_contributions[j][freq])
+
+            # the parts of the excluded mode are kept, so that it can be included back
+            for j in cx.per_mode:
+                for frequency in cx.per_mode[j].available:
+                    self.assertTrue(cx.per_mode[j].available[frequency][all_modes[0]])
+
+        # include the mode back, starting from the run without it:
+        shaker.mwh.included_modes = all_modes.copy()
+        vibs_back = shaker.shake(only=only, frequencies=frequencies, previous=vibs_without)
+
+        for b_repr in vibs:
+            c = vibs[b_repr]
+            for j in c.per_mode:
+                for freq in c.vibrational_contributions[j]:
+                    self.assertTensorsAlmostEqual(
+                        c.vibrational_contributions[j][freq], vibs_back[b_repr].vibrational_contributions[j][freq])
+
+    def test_shaking_on_grid(self):
+        """Test the computation of the pv contributions on a grid of frequencies"""
+
+        df = self.read_datafile(self.datafile)
+
+        shaker = shaking.Shaker(datafile=df)
+        only = [(derivatives.Derivative('FF'), 2), (derivatives.Derivative('dD'), 2)]
+        grid = numpy.linspace(0, 0.04, 5)
+
+        vibs = shaker.shake(only=only, frequencies=[0.02, 0.04])
+
+        for engine in shaking.ENGINES:
+            curves = shaker.shake_on_grid(grid, only=only, engine=engine)
+
+            self.assertNotIn('FF', curves)  # static
+            self.assertIn('dD', curves)
+
+            c = curves['dD']
+            self.assertArraysAlmostEqual(c.grid, grid)
+
+            for j in vibs['dD'].vibrational_contributions:
+                vc = shaking.VibrationalContribution.from_representation(j)
+                if vc.zpva:
+                    self.assertNotIn(j, c.curves)
+                    continue
+
+                self.assertIn(j, c.curves)
+                self.assertEqual(c.curves[j].shape, (len(grid), 3, 3))
+                self.assertArraysAlmostEqual(c.curves[j][2], vibs['dD'].vibrational_contributions[j][0.02].components)
+                self.assertArraysAlmostEqual(c.curves[j][4], vibs['dD'].vibrational_contributions[j][0.04].components)
+
+            self.assertArraysAlmostEqual(c.total_pv[4], vibs['dD'].total_pv[0.04].components)
+
+        # save and load
+        shaking.save_dispersion_curves(self.datafile, curves)
+        shaking.save_dispersion_curves(self.datafile, curves)  # replaced
+
+        ncurves = shaking.load_dispersion_curves(self.datafile)
+        self.assertIn('dD', ncurves)
+        self.assertArraysAlmostEqual(ncurves['dD'].grid, grid)
+
+        for j in curves['dD'].curves:
+            self.assertIn(j, ncurves['dD'].curves)
+            self.assertArraysAlmostEqual(ncurves['dD'].curves[j], curves['dD'].curves[j])
+
     def test_nachos_shake(self):
         """Test the shake command"""
 
@@ -306,3 +694,22 @@ class ShakeTestCase(NachosTestCase):
                     self.assertIn('static', cx.vibrational_contributions[j])
         for i in notd:
             self.assertNotIn(i, nvibs)
+
+        # on a grid
+        process = self.run_python_script(
+            'nachos/shake.py', ['-d', self.datafile, '-O', ';'.join(d), '-g', '0;0.05;11'],
+            out_pipe=subprocess.PIPE,
+            err_pipe=subprocess.PIPE)
+
+        stdout_t, stderr_t = process.communicate()
+
+        self.assertEqual(len(stderr_t), 0, msg=stderr_t.decode())
+        self.assertEqual(len(stdout_t), 0, msg=stdout_t.decode())
+
+        curves = shaking.load_dispersion_curves(self.datafile)
+        self.assertIn('dD', curves)
+        self.assertNotIn('FF', curves)
+        self.assertEqual(len(curves['dD'].grid), 11)
+
+        for j in must_be_in:
+            self.assertIn(j, curves['dD'].curves)